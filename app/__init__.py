@@ -1,13 +1,39 @@
 from flask import Flask
 from flask.logging import create_logger
 from flask_socketio import SocketIO
+from app.modules.job_queue import JobQueue
 import logging
+import os
 
 socketio = SocketIO()
+job_queue = JobQueue()
 
-def create_app():
+def create_app(config=None):
     """Create and configure the Flask application."""
     app = Flask(__name__)
+    app.config['SCAN_WORKERS'] = int(os.environ.get('SCAN_WORKERS', 4))
+    app.config['PAYLOAD_CONCURRENCY'] = int(os.environ.get('PAYLOAD_CONCURRENCY', 5))
+    app.config['NMAP_SHARD_SIZE'] = int(os.environ.get('NMAP_SHARD_SIZE', 16))
+    app.config['NMAP_PARALLEL_SHARDS'] = int(os.environ.get('NMAP_PARALLEL_SHARDS', 4))
+    app.config['SCAN_BACKEND'] = os.environ.get('SCAN_BACKEND', 'nmap')
+    app.config['CONNECT_SCAN_CONCURRENCY'] = int(os.environ.get('CONNECT_SCAN_CONCURRENCY', 256))
+    app.config['CONNECT_SCAN_TIMEOUT'] = float(os.environ.get('CONNECT_SCAN_TIMEOUT', 1.0))
+    app.config['SCAN_DB_PATH'] = os.environ.get('SCAN_DB_PATH')
+    app.config['CHAIN_RETEST_TTL'] = float(os.environ.get('CHAIN_RETEST_TTL', 7 * 24 * 3600))
+    app.config['CRAWL_MAX_DEPTH'] = int(os.environ.get('CRAWL_MAX_DEPTH', 2))
+    app.config['CRAWL_MAX_PAGES'] = int(os.environ.get('CRAWL_MAX_PAGES', 30))
+    app.config['CRAWL_CONCURRENCY'] = int(os.environ.get('CRAWL_CONCURRENCY', 5))
+    app.config['PAYLOAD_CORPUS_DIR'] = os.environ.get('PAYLOAD_CORPUS_DIR')
+    app.config['AUDIT_WORKERS'] = int(os.environ.get('AUDIT_WORKERS', 8))
+    app.config['AUDIT_HOST_BUDGET'] = int(os.environ.get('AUDIT_HOST_BUDGET', 100))
+    app.config['AUDIT_MIN_SPACING'] = float(os.environ.get('AUDIT_MIN_SPACING', 0.5))
+    app.config['AUDIT_JITTER'] = float(os.environ.get('AUDIT_JITTER', 1.0))
+    app.config['AUDIT_LOCKOUT_THRESHOLD'] = int(os.environ.get('AUDIT_LOCKOUT_THRESHOLD', 10))
+    app.config['AUDIT_LOCKOUT_WINDOW'] = float(os.environ.get('AUDIT_LOCKOUT_WINDOW', 900))
+    app.config['HEALTH_FAILURE_THRESHOLD'] = int(os.environ.get('HEALTH_FAILURE_THRESHOLD', 3))
+    app.config['HEALTH_COOLDOWN'] = float(os.environ.get('HEALTH_COOLDOWN', 30))
+    if config:
+        app.config.update(config)
     
     # Configure logging
     logging.basicConfig(level=logging.INFO)
@@ -16,9 +42,43 @@ def create_app():
     # Initialize SocketIO with the app
     socketio.init_app(app)
     
+    # Scans run on a background worker pool instead of the request thread
+    job_queue.init_app(app)
+    
+    # Scanner log lines are batched before they reach Socket.IO
+    from app.modules.events import log_bus
+    log_bus.init_app(app)
+    
+    # Circuit breakers that stop every scanner connecting to unreachable hosts
+    from app.modules.health import host_health
+    host_health.init_app(app)
+    
+    # Pooled keep-alive HTTP sessions shared by the web testing modules
+    from app.modules.http_client import http_client
+    http_client.init_app(app)
+    
+    # Shared DNS and baseline response caches
+    from app.modules.cache import resolver, baseline_cache
+    resolver.init_app(app)
+    baseline_cache.init_app(app)
+    
+    # Payload and credential wordlists, streamed from disk
+    from app.modules.corpus import corpus_registry
+    corpus_registry.init_app(app)
+    
+    # Per-host pacing and lockout limits for SSH and FTP credential checks
+    from app.modules.credential_audit import credential_auditor
+    credential_auditor.init_app(app)
+    
+    # Finished scans are kept in an embedded SQLite history
+    from app.modules.store import scan_store
+    scan_store.init_app(app)
+    job_queue.add_listener(scan_store.save_job)
+    
     # Register blueprints
-    from app.routes import main_bp
+    from app.routes import main_bp, join_job
     app.register_blueprint(main_bp)
+    socketio.on_event('join_job', join_job)
     
     app.logger.info("999Security Diagnostics - Educational Security Testing Platform Initialized")
-    return app
\ No newline at end of file
+    return app
@@ -5,20 +5,38 @@ from .xss_simulator import XSSSimulator
 from .ssh_bruteforce import SSHBruteForceSimulator
 from .ftp_bruteforce import FTPBruteForceSimulator
 from .stealth import StealthScanner
+from .credential_audit import credential_auditor
 from .payload_manager import PayloadManager
-from typing import List, Dict, Tuple
-from app import socketio
+from .http_client import http_client as shared_http_client
+from .scheduler import PhaseScheduler
+from .registry import scanner_registry
+from .store import scan_store
+from .report_diff import diff_reports, host_fingerprints, port_fingerprints
+from .results import ScanReport
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+from app.modules.events import emit_event, LogEmitter
+import contextvars
+import queue
+import threading
 import time
-import re
 
-class ChainedAttackSimulator:
-    def __init__(self):
+class ChainedAttackSimulator(LogEmitter):
+    SERVICE_PHASES = ('web', 'ssh', 'ftp')
+    SSH_USERNAMES = ('admin', 'root', 'user')
+
+    def __init__(self, http_client=None, mode='sequential', concurrency=5, max_workers=4, store=None, crawler=None,
+                 discovery=None):
         self.logger = logging.getLogger(__name__)
-        self.vuln_scanner = VulnerabilityScanner()
-        self.sqli_simulator = SQLiSimulator()
-        self.xss_simulator = XSSSimulator()
-        self.ssh_simulator = SSHBruteForceSimulator()
-        self.ftp_simulator = FTPBruteForceSimulator()
+        self.store = store or scan_store
+        self.http = http_client or shared_http_client
+        self.max_workers = max_workers  # Global budget for concurrent phase tasks
+        # discovery: VulnerabilityScanner options, e.g. the port scan backend
+        self.vuln_scanner = VulnerabilityScanner(**(discovery or {}))
+        # One crawler for both web simulators, so each web port is crawled once
+        self.sqli_simulator = SQLiSimulator(http_client=self.http, mode=mode, concurrency=concurrency, crawler=crawler)
+        self.xss_simulator = XSSSimulator(http_client=self.http, mode=mode, concurrency=concurrency, crawler=crawler)
+        self.ssh_simulator = scanner_registry.shared(SSHBruteForceSimulator)
+        self.ftp_simulator = scanner_registry.shared(FTPBruteForceSimulator)
         self.stealth = StealthScanner()
         self.payload_manager = PayloadManager()
         self.chain_progress = 0
@@ -29,249 +47,247 @@ class ChainedAttackSimulator:
             'ftp': [],    # FTP ports
             'other': []   # Other services
         }
+        self._previous = None  # (scan row, report) of the last stored run, in incremental mode
+        self.retest_ttl = None
+        self._reuse: Dict[Tuple[str, int], List[ScanReport]] = {}
         
     def emit_log(self, message: str, progress: int = None) -> None:
         """Emit log message and progress to connected clients"""
-        try:
-            socketio.emit('log_message', {'message': message})
-            if progress is not None:
-                self.chain_progress = progress
-                socketio.emit('chain_progress', {'progress': progress})
-        except Exception as e:
-            self.logger.error(f"Error emitting log: {str(e)}")
+        super().emit_log(message)
+        if progress is not None:
+            self.chain_progress = progress
+            emit_event('chain_progress', {'progress': progress})
 
-    def _parse_services(self, scan_output: str) -> None:
-        """Parse discovered services from scan output"""
+    def _parse_services(self, scan_report: ScanReport) -> None:
+        """Classify the open ports found by the discovery scan"""
         # Reset services
         for key in self.services:
             self.services[key] = []
             
-        # Find all port/service combinations
-        port_matches = re.finditer(r'(\d+)/tcp\s+open\s+(\w+)', scan_output)
-        
-        for match in port_matches:
-            port = int(match.group(1))
-            service = match.group(2).lower()
-            
-            if service in ['http', 'https']:
-                self.services['web'].append(port)
-            elif service == 'ssh':
-                self.services['ssh'].append(port)
-            elif service == 'ftp':
-                self.services['ftp'].append(port)
-            elif service in ['mysql', 'postgresql', 'mongodb']:
-                self.services['db'].append(port)
-            else:
-                self.services['other'].append(port)
+        for host in scan_report.hosts:
+            for port_result in host.open_ports():
+                port = port_result.port
+                service = port_result.service.lower()
+                
+                if service in ['http', 'https']:
+                    self.services['web'].append(port)
+                elif service == 'ssh':
+                    self.services['ssh'].append(port)
+                elif service == 'ftp':
+                    self.services['ftp'].append(port)
+                elif service in ['mysql', 'postgresql', 'mongodb']:
+                    self.services['db'].append(port)
+                else:
+                    self.services['other'].append(port)
 
-    def _test_web_services(self, target: str, stealth_mode: bool = True) -> List[str]:
-        """Test discovered web services"""
-        results = []
-        
-        if not self.services['web']:
-            return ["No web services discovered to test"]
-            
+    def _web_service_tasks(self, target: str, stealth_mode: bool = True) -> List[Callable[[], List[ScanReport]]]:
+        """Build one SQLi and one XSS task per discovered web port"""
+        tasks = []
         for port in self.services['web']:
+            if ('web', port) in self._reuse:
+                tasks.append(self._reuse_task('web', port))
+                continue
             web_target = f"{target}:{port}" if port not in [80, 443] else target
-            
-            # SQL Injection Testing
-            self.emit_log(f"Testing SQL injection on {web_target}", 40)
-            sqli_results = self.sqli_simulator.test_endpoint(web_target)
-            results.extend([sqli_results, ""])
-            
-            if stealth_mode:
-                self.stealth.apply_scan_delay()
-            
-            # XSS Testing
-            self.emit_log(f"Testing XSS on {web_target}", 60)
-            xss_results = self.xss_simulator.test_xss(web_target)
-            results.extend([xss_results, ""])
-            
-            if stealth_mode:
-                self.stealth.apply_scan_delay()
-                
-        return results
+            tasks.append(lambda t=web_target, p=port: self._run_web_test(
+                f"Testing SQL injection on {t}", self.sqli_simulator.test_endpoint, t, p, stealth_mode))
+            tasks.append(lambda t=web_target, p=port: self._run_web_test(
+                f"Testing XSS on {t}", self.xss_simulator.test_xss, t, p, stealth_mode))
+        return tasks
 
-    def _test_ssh_services(self, target: str, stealth_mode: bool = True) -> List[str]:
-        """Test discovered SSH services"""
-        results = []
-        
-        if not self.services['ssh']:
-            return ["No SSH services discovered to test"]
-            
-        usernames = ['admin', 'root', 'user']
+    def _run_web_test(self, message: str, test: Callable[[str], ScanReport], web_target: str,
+                      port: int, stealth_mode: bool) -> List[ScanReport]:
+        self.emit_log(message)
+        report = test(web_target)
+        report.meta['port'] = port
+        if stealth_mode:
+            self.stealth.apply_scan_delay()
+        return [report]
+
+    def _audit_spacing(self, stealth_mode: bool) -> Optional[float]:
+        """Seconds between credential attempts on a host: the stealth delay, if longer than the policy's"""
+        if not stealth_mode:
+            return None
+        return max(self.stealth.delay_between_requests, credential_auditor.policy.min_spacing)
+
+    def _ssh_service_tasks(self, target: str, stealth_mode: bool = True) -> List[Callable[[], List[ScanReport]]]:
+        """Build one task per username per discovered SSH port.
+
+        The tasks run concurrently; the credential auditor keeps them to
+        one attempt at a time on the host, spaced and lockout-aware.
+        """
+        spacing = self._audit_spacing(stealth_mode)
+        tasks = []
         for port in self.services['ssh']:
-            ssh_target = f"{target}:{port}" if port != 22 else target
-            
-            for username in usernames:
-                self.emit_log(f"Testing SSH auth on {ssh_target} with username: {username}", 70)
-                ssh_results = self.ssh_simulator.simulate_bruteforce(ssh_target, username)
-                results.extend([ssh_results, ""])
-                
-                if stealth_mode:
-                    self.stealth.apply_scan_delay()
-                    
-        return results
+            if ('ssh', port) in self._reuse:
+                tasks.append(self._reuse_task('ssh', port))
+            else:
+                tasks.extend(lambda p=port, u=username: self._test_ssh_account(target, p, u, spacing)
+                             for username in self.SSH_USERNAMES)
+        return tasks
 
-    def _test_ftp_services(self, target: str, stealth_mode: bool = True) -> List[str]:
-        """Test discovered FTP services"""
-        results = []
+    def _test_ssh_account(self, target: str, port: int, username: str,
+                          spacing: Optional[float] = None) -> List[ScanReport]:
+        ssh_target = f"{target}:{port}" if port != 22 else target
+        self.emit_log(f"Testing SSH auth on {ssh_target} with username: {username}")
+        report = self.ssh_simulator.simulate_bruteforce(ssh_target, username, delay=spacing)
+        report.meta['port'] = port
+        return [report]
+
+    def _ftp_service_tasks(self, target: str, stealth_mode: bool = True) -> List[Callable[[], List[ScanReport]]]:
+        """Build one task per discovered FTP port"""
+        spacing = self._audit_spacing(stealth_mode)
+        return [
+            self._reuse_task('ftp', port) if ('ftp', port) in self._reuse
+            else (lambda p=port: self._test_ftp_port(target, p, spacing))
+            for port in self.services['ftp']
+        ]
+
+    def _test_ftp_port(self, target: str, port: int, spacing: Optional[float] = None) -> List[ScanReport]:
+        self.emit_log(f"Testing FTP auth on {target}:{port}")
+        return [self.ftp_simulator.simulate_bruteforce(target, port=port, delay=True if spacing is None else spacing)]
+
+    def _discover_services(self, target: str) -> List[ScanReport]:
+        """Run the initial port scan and classify the services found"""
+        self.emit_log(f"\nPhase 1: Service Discovery on {target}")
+        scan_report = self.vuln_scanner.scan_target(target)
+        self._parse_services(scan_report)
+        self._plan_reuse(scan_report)
+        return [scan_report]
+
+    def _plan_reuse(self, discovery: ScanReport) -> None:
+        """In incremental mode, pick the previous per-port results that are still valid.
+
+        A port's earlier results are reused when its port/product/version
+        fingerprint is unchanged, none of them failed and all were tested
+        within retest_ttl seconds.
+        """
+        self._reuse = {}
+        if self._previous is None:
+            return
+        scan, previous = self._previous
+        before = port_fingerprints(previous)
+        now = host_fingerprints(discovery)
         
-        if not self.services['ftp']:
-            return ["No FTP services discovered to test"]
-            
-        for port in self.services['ftp']:
-            ftp_target = target
-            self.emit_log(f"Testing FTP auth on {ftp_target}:{port}", 80)
-            ftp_results = self.ftp_simulator.simulate_bruteforce(ftp_target, port=port)
-            results.extend([ftp_results, ""])
-            
-            if stealth_mode:
-                self.stealth.apply_scan_delay()
-                    
-        return results
+        stale = set()
+        for child in previous.children:
+            port = child.meta.get('port')
+            if child.phase not in self.SERVICE_PHASES or port is None:
+                continue
+            tested_at = child.meta.get('tested_at', scan['finished_at'])
+            if (child.error or now.get(port) is None or before.get(port) != now[port]
+                    or (self.retest_ttl is not None and time.time() - tested_at > self.retest_ttl)):
+                stale.add((child.phase, port))
+            else:
+                self._reuse.setdefault((child.phase, port), []).append(child)
+        for key in stale:
+            self._reuse.pop(key, None)
+        
+        skipped = ', '.join(f"{phase}:{port}" for phase, port in sorted(self._reuse))
+        self.emit_log(f"Incremental mode: reusing unchanged services ({skipped or 'none'})")
+
+    def _reuse_task(self, phase: str, port: int) -> Callable[[], List[ScanReport]]:
+        def reuse() -> List[ScanReport]:
+            self.emit_log(f"Skipping {phase} tests on port {port}: fingerprint unchanged")
+            reports = self._reuse[(phase, port)]
+            for report in reports:
+                report.meta['reused_from'] = self._previous[0]['id']
+            return reports
+        return reuse
+
+    def _report_progress(self, done: int, total: int) -> None:
+        """Map completed scheduler tasks onto the 10-90% progress range"""
+        self.chain_progress = 10 + int(80 * done / max(total, 1))
+        emit_event('chain_progress', {'progress': self.chain_progress})
 
-    def run_chain(self, target: str, stealth_mode: bool = True) -> str:
-        """Run a complete chain of security tests"""
+    def run_chain(self, target: str, stealth_mode: bool = True, incremental: bool = False,
+                  retest_ttl: Optional[float] = None) -> ScanReport:
+        """Run a complete chain of security tests.
+
+        Discovery runs first; the web, SSH and FTP phases then run
+        concurrently, one task per port, sharing max_workers threads.
+        With incremental=True only services whose fingerprint changed since
+        the last stored run (or whose results are older than retest_ttl
+        seconds) are re-tested, and meta['diff'] lists what changed.
+        """
+        report = ScanReport('attack_chain', target)
+        for record in self.iter_chain(report, target, stealth_mode, incremental, retest_ttl):
+            report.add(record)
+        return report
+
+    def iter_chain(self, report: ScanReport, target: str, stealth_mode: bool = True,
+                   incremental: bool = False, retest_ttl: Optional[float] = None) -> Iterator[ScanReport]:
+        """Yield each sub-report (tagged with its phase) as soon as its task finishes"""
         self.emit_log("Initializing chained security test", 0)
-        results = []
+        self.retest_ttl = retest_ttl
         
         try:
-            # Phase 1: Initial Scan
-            self.emit_log(f"\nPhase 1: Service Discovery on {target}", 10)
-            results.extend([
-                f"Chained Security Test on {target}",
-                "=" * 50,
-                "\nPhase 1: Service Discovery",
-                "-" * 40
-            ])
+            self._previous = self.store.latest(target, 'attack_chain') if incremental else None
+            if incremental:
+                report.meta['incremental'] = True
+                if self._previous is None:
+                    self.emit_log("Incremental mode: no previous run stored, testing every service")
             
             if stealth_mode:
                 self.stealth.set_scan_delay(1.0, 3.0)
                 self.emit_log("Stealth mode enabled - Using random delays")
             
-            # Run initial scan
-            scan_results = self.vuln_scanner.scan_target(target)
-            self._parse_services(scan_results)
-            results.extend([scan_results, ""])
+            completed = queue.Queue()
+            stop = threading.Event()
+            scheduler = PhaseScheduler(
+                self.max_workers,
+                on_progress=self._report_progress,
+                on_result=lambda phase, output: completed.put((phase, output))
+            )
+            scheduler.add_phase('discovery', lambda: [lambda: self._discover_services(target)])
+            scheduler.add_phase('web', lambda: self._web_service_tasks(target, stealth_mode), depends_on=['discovery'])
+            scheduler.add_phase('ssh', lambda: self._ssh_service_tasks(target, stealth_mode), depends_on=['discovery'])
+            scheduler.add_phase('ftp', lambda: self._ftp_service_tasks(target, stealth_mode), depends_on=['discovery'])
+            self.emit_log(f"Running service phases with up to {self.max_workers} concurrent tasks", 10)
             
-            # Phase 2: Web Testing
-            self.emit_log("\nPhase 2: Web Vulnerability Testing", 30)
-            results.extend([
-                "\nPhase 2: Web Vulnerability Testing",
-                "-" * 40
-            ])
-            web_results = self._test_web_services(target, stealth_mode)
-            results.extend(web_results)
+            def run_phases():
+                try:
+                    scheduler.run(stop)
+                except Exception as e:
+                    completed.put(('scheduler', e))
+                finally:
+                    completed.put(None)
             
-            # Phase 3: SSH Testing
-            self.emit_log("\nPhase 3: SSH Security Testing", 50)
-            results.extend([
-                "\nPhase 3: SSH Security Testing",
-                "-" * 40
-            ])
-            ssh_results = self._test_ssh_services(target, stealth_mode)
-            results.extend(ssh_results)
-
-            # Phase 4: FTP Testing
-            self.emit_log("\nPhase 4: FTP Security Testing", 70)
-            results.extend([
-                "\nPhase 4: FTP Security Testing",
-                "-" * 40
-            ])
-            ftp_results = self._test_ftp_services(target, stealth_mode)
-            results.extend(ftp_results)
+            # The scheduler runs on its own thread so sub-reports can be
+            # yielded while the remaining phases are still in progress
+            threading.Thread(target=contextvars.copy_context().run, args=(run_phases,), daemon=True).start()
+            
+            children = []  # Kept for the incremental diff only
+            try:
+                while (item := completed.get()) is not None:
+                    phase, output = item
+                    if isinstance(output, Exception):
+                        if phase in ('discovery', 'scheduler'):
+                            raise output
+                        output = [ScanReport('error', target).fail(f"Error: {str(output)}")]
+                    if phase == 'discovery':
+                        report.meta['services'] = {key: list(ports) for key, ports in self.services.items()}
+                    for child in output:
+                        child.phase = phase
+                        child.meta.setdefault('tested_at', time.time())
+                        if self._previous is not None:
+                            children.append(child)
+                        yield child
+            finally:
+                # No further tasks start once the caller stops iterating (e.g. a stream client left)
+                stop.set()
+            
+            if self._previous is not None:
+                scan, previous = self._previous
+                current = ScanReport('attack_chain', target, children=children)
+                report.meta['diff'] = diff_reports(previous, current, scan['id'])
             
             # Phase 5: Service Summary
             self.emit_log("\nPhase 5: Security Analysis", 90)
-            results.extend([
-                "\nSecurity Analysis",
-                "=" * 50,
-                f"Web Services: {len(self.services['web'])} ports",
-                f"SSH Services: {len(self.services['ssh'])} ports",
-                f"FTP Services: {len(self.services['ftp'])} ports",
-                f"Database Services: {len(self.services['db'])} ports",
-                f"Other Services: {len(self.services['other'])} ports",
-                "\nRecommendations:",
-                "1. Minimize exposed services",
-                "2. Implement strong access controls",
-                "3. Keep all services updated",
-                "4. Monitor for suspicious activity",
-                "5. Use WAF for web services",
-                "6. Enable fail2ban for SSH and FTP",
-                "\nReminder: Only test authorized systems!"
-            ])
-            
             self.emit_log("Chained security test completed", 100)
-            socketio.emit('scan_complete', {'message': 'Chained security test completed'})
-            return "\n".join(results)
+            emit_event('scan_complete', {'message': 'Chained security test completed'})
             
         except Exception as e:
             error_msg = f"Error in security test chain: {str(e)}"
             self.logger.error(error_msg)
             self.emit_log(error_msg)
-            return error_msg
-
-from flask import Blueprint, render_template, request
-from app.modules.vulnerability_scanner import VulnerabilityScanner
-from app.modules.sqli_simulator import SQLiSimulator
-from app.modules.ssh_bruteforce import SSHBruteForceSimulator
-from app.modules.ftp_bruteforce import FTPBruteForceSimulator
-from app.modules.xss_simulator import XSSSimulator
-from app.modules.attack_chain import ChainedAttackSimulator
-
-main_bp = Blueprint('main', __name__)
-
-@main_bp.route("/", methods=["GET"])
-def home():
-    return render_template("index.html")
-
-@main_bp.route("/scan", methods=["POST"])
-def scan():
-    scan_type = request.form.get("scan_type")
-    target = request.form.get("target")
-    ssh_user = request.form.get("ssh_user")
-    ssh_pass = request.form.get("ssh_pass")
-    custom_payload = request.form.get("custom_payload")
-    
-    results = "No results available."
-    
-    try:
-        if scan_type == "vuln_scan":
-            scanner = VulnerabilityScanner()
-            results = scanner.scan_target(target)
-        elif scan_type == "sqli":
-            scanner = SQLiSimulator()
-            results = scanner.test_endpoint(target)
-        elif scan_type == "ssh_brute":
-            if not ssh_user:  # Require username for SSH testing
-                results = "Error: SSH username required"
-            else:
-                scanner = SSHBruteForceSimulator()
-                custom_pass_list = [ssh_pass] if ssh_pass else None
-                results = scanner.simulate_bruteforce(target, ssh_user, custom_pass_list)
-        elif scan_type == "ftp_brute":
-            scanner = FTPBruteForceSimulator()
-            results = scanner.simulate_bruteforce(target)
-        elif scan_type == "xss":
-            scanner = XSSSimulator()
-            results = scanner.test_xss(target)
-        elif scan_type == "attack_chain":
-            scanner = ChainedAttackSimulator()
-            results = scanner.run_chain(target)
-        elif scan_type == "community":
-            if not custom_payload:
-                results = "Error: Custom payload required"
-            elif scan_type == "sqli":
-                scanner = SQLiSimulator()
-                results = scanner.test_endpoint(target, custom_payload)
-            elif scan_type == "xss":
-                scanner = XSSSimulator()
-                # Add custom payload to XSS test
-                scanner.payloads.append(custom_payload)
-                results = scanner.test_xss(target)
-                
-    except Exception as e:
-        results = f"Error during scan: {str(e)}"
-    
-    return render_template("results.html", scan_type=scan_type, target=target, results=results)
\ No newline at end of file
+            report.fail(error_msg)
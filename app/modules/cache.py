@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self._counts['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._counts['expired'] += 1
+            self._counts['misses'] += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._counts['evictions'] += 1
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value, computing and storing it on a miss.
+
+        factory runs outside the lock, so two threads missing the same key
+        at once may both compute it; the later result wins.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counts['hits'] + self._counts['misses']
+            return dict(self._counts, size=len(self._entries), maxsize=self.maxsize,
+                        hit_rate=round(self._counts['hits'] / lookups, 3) if lookups else 0.0)
+
+
+class HostResolver:
+    """Cached getaddrinfo lookups for IPv4 and IPv6.
+
+    Failed lookups are cached too, for negative_ttl seconds, so a chain
+    against a dead name does not hit the resolver once per phase.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, negative_ttl: float = 30):
+        self.logger = logging.getLogger(__name__)
+        self.negative_ttl = negative_ttl
+        self.cache = TTLCache(maxsize, ttl)
+
+    def init_app(self, app):
+        """Read cache sizing from the Flask config"""
+        self.cache = TTLCache(app.config.get('DNS_CACHE_SIZE', self.cache.maxsize),
+                              app.config.get('DNS_CACHE_TTL', self.cache.ttl))
+        self.negative_ttl = app.config.get('DNS_NEGATIVE_TTL', self.negative_ttl)
+
+    def resolve(self, host: str) -> List[str]:
+        """Addresses for host, IPv4 first; raises socket.gaierror if it does not resolve"""
+        key = host.lower()
+        addresses = self.cache.get(key, _MISSING)
+        if addresses is _MISSING:
+            try:
+                infos = socket.getaddrinfo(host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+            except socket.gaierror as e:
+                self.cache.set(key, e, self.negative_ttl)
+                raise
+            # Keep resolver order within each family, IPv4 first
+            addresses = list(dict.fromkeys(
+                info[4][0] for family in (socket.AF_INET, socket.AF_INET6)
+                for info in infos if info[0] == family
+            ))
+            self.cache.set(key, addresses)
+        if isinstance(addresses, socket.gaierror):
+            raise addresses
+        return addresses
+
+    def resolve_one(self, host: str) -> str:
+        return self.resolve(host)[0]
+
+
+@dataclass(slots=True)
+class Baseline:
+    """Fingerprint of an unmodified page, used to compare payload responses against"""
+    url: str
+    status: int
+    length: int
+    digest: str
+    elapsed: float
+    text: str
+
+
+class BaselineCache:
+    """Per-URL baseline responses shared by the web tests of a chain"""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60):
+        self.cache = TTLCache(maxsize, ttl)
+
+    def init_app(self, app):
+        """Read cache sizing from the Flask config"""
+        self.cache = TTLCache(app.config.get('BASELINE_CACHE_SIZE', self.cache.maxsize),
+                              app.config.get('BASELINE_CACHE_TTL', self.cache.ttl))
+
+    def fetch(self, url: str, http) -> Baseline:
+        """Return the cached baseline for url, fetching it with http on a miss"""
+        def load() -> Baseline:
+            start = time.perf_counter()
+            response = http.get(url)
+            elapsed = time.perf_counter() - start
+            return Baseline(url, response.status_code, len(response.text),
+                            hashlib.sha256(response.content).hexdigest(), elapsed, response.text)
+        return self.cache.get_or_set(url, load)
+
+
+resolver = HostResolver()
+baseline_cache = BaselineCache()
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import queue
+import re
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.modules.results import PortResult
+
+# Service names by port, as nmap reports them, for ports whose banner names nothing
+PORT_SERVICES = {
+    21: 'ftp', 22: 'ssh', 23: 'telnet', 25: 'smtp', 53: 'domain', 80: 'http', 110: 'pop3', 143: 'imap',
+    443: 'https', 445: 'microsoft-ds', 3306: 'mysql', 5432: 'postgresql', 6379: 'redis', 8000: 'http',
+    8080: 'http', 8443: 'https', 8888: 'http', 27017: 'mongodb'
+}
+
+# Ports sent an HTTP request straight away; any other port gets one only if its server
+# sends no greeting of its own within the banner timeout
+HTTP_PORTS = frozenset({80, 8000, 8080, 8888})
+# Spoken over TLS, so their service comes from the port number alone
+TLS_PORTS = frozenset({443, 8443})
+
+BANNER_BYTES = 1024
+
+_SSH = re.compile(r'^SSH-[\d.]+-([^\s_]+)(?:_(\S+))?')                       # SSH-2.0-OpenSSH_9.6p1
+_SERVER = re.compile(r'^Server:[ \t]*([^/\s]+)(?:/(\S+))?', re.I | re.M)     # Server: nginx/1.24.0
+_FTP = re.compile(r'(vsFTPd|ProFTPD|Pure-FTPd|FileZilla Server|Microsoft FTP Service)[ /]?(\d[\w.\-]*)?', re.I)
+_SMTP = re.compile(r'ESMTP\s+([A-Za-z][\w\-]*)(?:\s+(\d[\w.\-]*))?')        # 220 mx ESMTP Exim 4.96
+
+
+def parse_ports(spec: str) -> List[int]:
+    """'21-25,80,443' as a sorted list of port numbers"""
+    ports = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        start, end = int(first), int(last or first)
+        if not 0 < start <= end <= 65535:
+            raise ValueError(f"Invalid port range: {part}")
+        ports.update(range(start, end + 1))
+    return sorted(ports)
+
+
+def _groups(match) -> Tuple[str, str]:
+    return (match.group(1), match.group(2) or '') if match else ('', '')
+
+
+def identify(port: int, banner: str) -> Tuple[str, str, str]:
+    """(service, product, version) from what the server on port sent"""
+    service = PORT_SERVICES.get(port, 'unknown')
+    if banner.startswith('SSH-'):
+        return ('ssh',) + _groups(_SSH.match(banner))
+    if banner.startswith('HTTP/'):
+        return (service if service in ('http', 'https') else 'http',) + _groups(_SERVER.search(banner))
+    if banner.startswith('220'):
+        match = _FTP.search(banner)
+        if match or 'ftp' in banner.lower():
+            return ('ftp',) + _groups(match)
+        match = _SMTP.search(banner)
+        if match or 'smtp' in banner.lower():
+            return ('smtp',) + _groups(match)
+    if banner.startswith('\xff'):
+        # Telnet option negotiation
+        return 'telnet', '', ''
+    return service, '', ''
+
+
+class ConnectScanner:
+    """Asyncio TCP connect scanner with light banner grabbing.
+
+    Up to concurrency connections are attempted at once across every
+    host and port pair, each given timeout seconds to connect. Open ports
+    are then read for the server's greeting, or sent an HTTP HEAD request
+    if it has none, for up to banner_timeout seconds each. The answer
+    names the service and often its product and version. Closed and
+    filtered ports are not reported. No nmap binary or privileges are
+    needed.
+    """
+
+    def __init__(self, concurrency: int = 256, timeout: float = 1.0, banner_timeout: float = 1.0,
+                 grab_banners: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.banner_timeout = banner_timeout
+        self.grab_banners = grab_banners
+
+    def scan(self, hosts: List[str], ports: List[int]) -> Dict[str, List[PortResult]]:
+        """Open ports of every host"""
+        return dict(self.iter_hosts(hosts, ports))
+
+    def iter_hosts(self, hosts: List[str], ports: List[int]) -> Iterator[Tuple[str, List[PortResult]]]:
+        """Yield each host with its open ports as soon as all of its ports are probed.
+
+        Pairs are probed host by host, so hosts finish roughly in order.
+        The event loop runs on its own thread; it stops early if the
+        caller stops iterating.
+        """
+        completed = queue.Queue()
+        stop = threading.Event()
+
+        def run() -> None:
+            try:
+                asyncio.run(self._run(hosts, ports, completed.put, stop))
+            except BaseException as e:
+                completed.put(e)
+            else:
+                completed.put(None)
+
+        threading.Thread(target=run, name='connect-scan-loop', daemon=True).start()
+        try:
+            while True:
+                item = completed.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    async def _run(self, hosts: List[str], ports: List[int],
+                   on_host: Callable[[Tuple[str, List[PortResult]]], None], stop: threading.Event) -> None:
+        remaining = {host: len(ports) for host in hosts}
+        found: Dict[str, List[PortResult]] = {host: [] for host in hosts}
+        if not ports:
+            for host in hosts:
+                on_host((host, []))
+            return
+        # Workers share one iterator of pairs, so memory does not grow with hosts x ports
+        pairs = ((host, port) for host in hosts for port in ports)
+
+        async def worker() -> None:
+            for host, port in pairs:
+                if stop.is_set():
+                    return
+                result = await self._probe(host, port)
+                if result is not None:
+                    found[host].append(result)
+                remaining[host] -= 1
+                if not remaining[host]:
+                    on_host((host, sorted(found.pop(host), key=lambda port_result: port_result.port)))
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(hosts) * len(ports)))))
+
+    async def _probe(self, host: str, port: int) -> Optional[PortResult]:
+        """The open port with its service, or None if it is closed or filtered"""
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        try:
+            banner = await self._grab(reader, writer, host, port) if self.grab_banners else ''
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        service, product, version = identify(port, banner)
+        return PortResult(port, 'open', service, product, version)
+
+    async def _grab(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, port: int) -> str:
+        """What the server says first, or how it answers an HTTP request if it stays silent"""
+        if port in TLS_PORTS:
+            return ''
+        try:
+            data = b''
+            if port not in HTTP_PORTS:
+                data = await self._read(reader)
+            if not data and not reader.at_eof():
+                name = f"[{host}]" if ':' in host else host
+                writer.write(f"HEAD / HTTP/1.0\r\nHost: {name}\r\n\r\n".encode())
+                await writer.drain()
+                data = await self._read(reader)
+        except OSError:
+            return ''
+        # latin-1 keeps every byte, including telnet's 0xff
+        return data.decode('latin-1')
+
+    async def _read(self, reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await asyncio.wait_for(reader.read(BANNER_BYTES), self.banner_timeout)
+        except asyncio.TimeoutError:
+            return b''
@@ -0,0 +1,195 @@
+import logging
+import mmap
+import os
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional
+
+# Corpora shipped with the app, one <kind>.txt per corpus
+BUILTIN_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'payloads')
+
+# "#% tags: mysql, error-based" tags every entry below it, until the next such line
+TAG_DIRECTIVE = b'#% tags:'
+
+# Bytes of the memory map split into lines at a time
+CHUNK_SIZE = 1 << 18
+
+
+@dataclass(slots=True)
+class CorpusEntry:
+    text: str
+    tags: FrozenSet[str] = field(default_factory=frozenset)
+
+
+class FingerprintSet:
+    """Set of 64-bit entry fingerprints in one preallocated open-addressing table.
+
+    About 13 bytes per entry, against 60-100 for a set of the entries
+    themselves, and sized once from the line count of the files. Two
+    distinct entries share a fingerprint with probability 2**-64, so a
+    unique entry is practically never dropped.
+    """
+
+    LOAD = 0.6  # Fullest the table gets before it is doubled
+
+    def __init__(self, capacity: int):
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity: int) -> None:
+        self.slots = int(capacity / self.LOAD) + 1
+        self.table = array('Q', [0]) * self.slots  # 0 marks an empty slot
+        self.count, self.capacity = 0, capacity
+
+    def add(self, item: str) -> bool:
+        """Add item; False if it was present already"""
+        return self._insert(hash(item) & 0xFFFF_FFFF_FFFF_FFFF or 1)
+
+    def _insert(self, fingerprint: int) -> bool:
+        table, slots = self.table, self.slots
+        index = fingerprint % slots
+        while True:
+            slot = table[index]
+            if slot == fingerprint:
+                return False
+            if not slot:
+                break
+            index += 1
+            if index == slots:
+                index = 0
+        table[index] = fingerprint
+        self.count += 1
+        if self.count >= self.capacity:
+            # Only if a file grew after it was counted
+            fingerprints = [slot for slot in table if slot]
+            self._allocate(self.capacity * 2)
+            for fingerprint in fingerprints:
+                self._insert(fingerprint)
+        return True
+
+
+def count_lines(path: str) -> int:
+    """Number of lines in path, counted in fixed-size chunks"""
+    lines = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+    return lines + 1
+
+
+def iter_file(path: str) -> Iterator[CorpusEntry]:
+    """Stream the entries of a corpus file through a read-only memory map.
+
+    Only the pages being read are loaded, and they stay reclaimable page
+    cache rather than worker heap. Blank lines and # comments are
+    skipped; a payload that starts with # is written as \\#.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if hasattr(data, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+            tags: FrozenSet[str] = frozenset()
+            position, end_of_file = 0, len(data)
+            while position < end_of_file:
+                # Whole lines, about CHUNK_SIZE bytes at a time
+                end = data.find(b'\n', min(position + CHUNK_SIZE, end_of_file - 1))
+                if end == -1:
+                    end = end_of_file
+                chunk = data[position:end]
+                position = end + 1
+                for line in chunk.split(b'\n'):
+                    line = line.rstrip(b'\r')
+                    if not line.strip():
+                        continue
+                    if line.startswith(TAG_DIRECTIVE):
+                        names = line[len(TAG_DIRECTIVE):].decode('utf-8', 'replace').split(',')
+                        tags = frozenset(name.strip().lower() for name in names if name.strip())
+                        continue
+                    if line.startswith(b'#'):
+                        continue
+                    if line.startswith(b'\\#'):
+                        line = line[1:]
+                    yield CorpusEntry(line.decode('utf-8', 'replace'), tags)
+
+
+class CorpusView:
+    """A lazily streamed corpus that can be iterated any number of times"""
+
+    def __init__(self, registry: 'CorpusRegistry', kind: str, tags: Iterable[str] = (),
+                 parse: Optional[Callable[[str], object]] = None):
+        self.registry = registry
+        self.kind = kind
+        self.tags = frozenset(tags)
+        self.parse = parse
+
+    def __iter__(self) -> Iterator:
+        entries = self.registry.iter(self.kind, self.tags)
+        return map(self.parse, entries) if self.parse else entries
+
+    def __len__(self) -> int:
+        # Counted by streaming; nothing is kept
+        return sum(1 for _ in self.registry.iter(self.kind, self.tags))
+
+
+class CorpusRegistry:
+    """Payload and credential corpora by kind ('sqli', 'xss', 'ssh_passwords', ...).
+
+    A kind is the built-in <kind>.txt followed by every <kind>*.txt in the
+    PAYLOAD_CORPUS_DIR directory, so large wordlists can be dropped in
+    without code changes. Entries are streamed, filtered by tags and
+    deduplicated across all files of a kind.
+    """
+
+    def __init__(self, builtin_dir: str = BUILTIN_DIR, extra_dir: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.builtin_dir = builtin_dir
+        self.extra_dir = extra_dir
+        self._line_counts: Dict[tuple, int] = {}
+
+    def init_app(self, app):
+        """Read the directory of additional corpora from the Flask config"""
+        self.extra_dir = app.config.get('PAYLOAD_CORPUS_DIR', self.extra_dir)
+
+    def files(self, kind: str) -> List[str]:
+        paths = []
+        builtin = os.path.join(self.builtin_dir, f"{kind}.txt")
+        if os.path.isfile(builtin):
+            paths.append(builtin)
+        if self.extra_dir and os.path.isdir(self.extra_dir):
+            paths.extend(os.path.join(self.extra_dir, name) for name in sorted(os.listdir(self.extra_dir))
+                         if name.startswith(kind) and name.endswith('.txt'))
+        return paths
+
+    def iter_entries(self, kind: str, tags: Iterable[str] = (), dedup: bool = True) -> Iterator[CorpusEntry]:
+        """Entries of kind carrying every tag in tags, first occurrence only"""
+        paths = self.files(kind)
+        if not paths:
+            raise KeyError(f"Unknown corpus: {kind}")
+        wanted = frozenset(tag.lower() for tag in tags)
+        seen = FingerprintSet(sum(self._line_count(path) for path in paths)) if dedup else None
+        for path in paths:
+            for entry in iter_file(path):
+                if wanted <= entry.tags and (seen is None or seen.add(entry.text)):
+                    yield entry
+
+    def _line_count(self, path: str) -> int:
+        # Sizes the dedup table; recounted only when the file changes
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        if key not in self._line_counts:
+            self._line_counts[key] = count_lines(path)
+        return self._line_counts[key]
+
+    def iter(self, kind: str, tags: Iterable[str] = (), dedup: bool = True) -> Iterator[str]:
+        return (entry.text for entry in self.iter_entries(kind, tags, dedup))
+
+    def load(self, kind: str, tags: Iterable[str] = ()) -> List[str]:
+        """Entries as a list, for the small corpora that are reused many times per scan"""
+        return list(self.iter(kind, tags))
+
+    def view(self, kind: str, tags: Iterable[str] = (), parse: Optional[Callable[[str], object]] = None) -> CorpusView:
+        return CorpusView(self, kind, tags, parse)
+
+
+corpus_registry = CorpusRegistry()
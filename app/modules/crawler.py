@@ -0,0 +1,225 @@
+import contextvars
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+import requests
+from app.modules.events import LogEmitter
+from app.modules.http_client import http_client as shared_http_client
+from app.modules.page_parser import PageInfo, parse_page
+from app.modules.request_template import RequestBuilder, RequestTemplate
+
+# Links to these are never fetched; they cannot hold forms or endpoints
+SKIP_EXTENSIONS = (
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.bmp', '.css', '.woff', '.woff2',
+    '.ttf', '.eot', '.pdf', '.zip', '.gz', '.tar', '.rar', '.7z', '.mp3', '.mp4', '.avi', '.mov',
+    '.exe', '.dmg', '.iso', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx'
+)
+
+# Quoted same-origin paths and absolute URLs in JavaScript, e.g. fetch('/api/items?id=1')
+_JS_ENDPOINT = re.compile(r"""["'`](/(?![/*])[\w\-./~%]*(?:\?[\w\-.~%&=+]*)?|https?://[^\s"'`<>]+)["'`]""")
+
+# Form fields that submit a fixed value rather than user input
+_FIXED_TYPES = ('submit', 'button', 'image', 'reset', 'file')
+
+
+@dataclass(slots=True)
+class InjectionPoint:
+    """A request whose parameters can carry a payload"""
+    method: str                   # 'get' or 'post'
+    url: str                      # Absolute action URL without query string
+    params: Tuple[str, ...]       # Injectable parameter names, sorted
+    defaults: Dict[str, str] = field(default_factory=dict)  # Benign values for every field sent
+    source: str = 'form'          # 'form', 'query' or 'script'
+    found_on: str = ''
+
+    @property
+    def key(self) -> Tuple[str, str, Tuple[str, ...]]:
+        return (self.method, self.url, self.params)
+
+    def location(self, param: str) -> str:
+        return f"{param} ({self.method.upper()} {self.url})"
+
+    def template(self, param: str, encoding: Optional[str] = None) -> RequestTemplate:
+        """Request template injecting into param, with every other field at its default"""
+        if self.method == 'post':
+            builder = RequestBuilder(self.url, 'POST', data=self.defaults)
+            return builder.template('form', param, encoding)
+        return RequestBuilder(f"{self.url}?{urlencode(self.defaults)}").template('query', param, encoding)
+
+    def to_dict(self) -> dict:
+        return {'method': self.method, 'url': self.url, 'params': list(self.params),
+                'source': self.source, 'found_on': self.found_on}
+
+
+@dataclass(slots=True)
+class CrawlResult:
+    start_url: str
+    pages: List[str] = field(default_factory=list)
+    points: List[InjectionPoint] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    depth: int = 0
+    truncated: bool = False  # True if the page budget stopped the crawl
+
+    def summary(self) -> dict:
+        return {'start_url': self.start_url, 'pages': len(self.pages), 'points': len(self.points),
+                'depth': self.depth, 'errors': len(self.errors), 'truncated': self.truncated}
+
+
+def same_origin(a: str, b: str) -> bool:
+    a, b = urlsplit(a), urlsplit(b)
+    return (a.scheme, a.netloc.lower()) == (b.scheme, b.netloc.lower())
+
+
+def page_key(url: str) -> Tuple[str, str, Tuple[str, ...]]:
+    """Pages differing only in query values are the same page (?page=1, ?page=2 ...)"""
+    parts = urlsplit(url)
+    names = tuple(sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)}))
+    return (parts.netloc.lower(), parts.path or '/', names)
+
+
+def query_point(url: str, found_on: str, source: str = 'query') -> Optional[InjectionPoint]:
+    """The GET parameters of url as an injection point, if it has any"""
+    parts = urlsplit(url)
+    values = dict(parse_qsl(parts.query, keep_blank_values=True))
+    if not values:
+        return None
+    action = urlunsplit((parts.scheme, parts.netloc, parts.path or '/', '', ''))
+    return InjectionPoint('get', action, tuple(sorted(values)), values, source, found_on)
+
+
+def extract_forms(page_url: str, page: PageInfo) -> List[InjectionPoint]:
+    """Every form on the page with at least one named user-editable field"""
+    points = []
+    for form in page.forms:
+        action = urldefrag(urljoin(page_url, form.action or page_url))[0]
+        method = form.method
+        parts = urlsplit(action)
+        # A GET form replaces the action's query string; a POST form keeps it in the URL
+        if method != 'post':
+            method, action = 'get', urlunsplit((parts.scheme, parts.netloc, parts.path or '/', '', ''))
+        defaults = {form_field.name: form_field.value for form_field in form.fields}
+        params = {form_field.name for form_field in form.fields if form_field.type not in _FIXED_TYPES}
+        if params:
+            points.append(InjectionPoint(method, action, tuple(sorted(params)), defaults, 'form', page_url))
+    return points
+
+
+def extract_links(page_url: str, page: PageInfo) -> Tuple[List[str], List[str], List[str]]:
+    """(links, script URLs, endpoints quoted in inline scripts) of the page, made absolute"""
+    endpoints = [endpoint for source in page.inline_scripts for endpoint in script_endpoints(source)]
+    absolute = lambda refs: [urldefrag(urljoin(page_url, ref.strip()))[0] for ref in refs
+                             if not ref.strip().lower().startswith(('javascript:', 'mailto:', 'tel:', 'data:'))]
+    return absolute(page.links), absolute(page.scripts), absolute(endpoints)
+
+
+def script_endpoints(source: str) -> List[str]:
+    """URLs and absolute paths quoted in JavaScript source"""
+    return [match.group(1) for match in _JS_ENDPOINT.finditer(source)]
+
+
+class Crawler(LogEmitter):
+    """Bounded same-origin crawler that collects injection points.
+
+    Pages are fetched breadth first, one depth level at a time, with up to
+    `concurrency` requests in flight through the shared HTTP client. The
+    crawl stops at max_depth links from the start page or after max_pages
+    fetches. Forms, query strings of links and endpoints quoted in inline
+    or same-origin scripts become injection points, deduplicated by
+    (method, action, parameter names). Results are kept per start URL, so
+    simulators sharing a crawler crawl a site once.
+    """
+
+    def __init__(self, http_client=None, max_depth: int = 2, max_pages: int = 30, concurrency: int = 5):
+        self.logger = logging.getLogger(__name__)
+        self.http = http_client or shared_http_client
+        self.max_depth = max(0, max_depth)
+        self.max_pages = max(1, max_pages)
+        self.concurrency = max(1, concurrency)
+        self._results: Dict[str, CrawlResult] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def crawl(self, start_url: str) -> CrawlResult:
+        """Crawl from start_url, or return the result of an earlier crawl of it"""
+        # Concurrent callers for one site wait for a single crawl; other sites proceed
+        with self._lock:
+            site_lock = self._locks.setdefault(start_url, threading.Lock())
+        with site_lock:
+            if start_url not in self._results:
+                self._results[start_url] = self._crawl(start_url)
+            return self._results[start_url]
+
+    def _fetch(self, url: str) -> Tuple[str, str, str]:
+        """(final URL, content type, body) of url"""
+        response = self.http.get(url)
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        return response.url or url, content_type, response.text
+
+    def _crawl(self, start_url: str) -> CrawlResult:
+        result = CrawlResult(start_url)
+        points: Dict[tuple, InjectionPoint] = {}
+        seen = {page_key(start_url)}
+        frontier = [start_url]
+        self.emit_log(f"Crawling {start_url} (depth {self.max_depth}, up to {self.max_pages} pages)")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='crawler') as executor:
+            for depth in range(self.max_depth + 1):
+                budget = self.max_pages - len(result.pages)
+                if not frontier or budget <= 0:
+                    break
+                if len(frontier) > budget:
+                    frontier, result.truncated = frontier[:budget], True
+                result.depth = depth
+                # Each fetch gets its own context copy so its logs reach the job's room
+                futures = [(url, executor.submit(contextvars.copy_context().run, self._fetch, url))
+                           for url in frontier]
+                next_frontier = []
+                for url, future in futures:
+                    result.pages.append(url)
+                    try:
+                        final_url, content_type, body = future.result()
+                    except requests.exceptions.RequestException as e:
+                        result.errors[url] = str(e)
+                        continue
+                    for link, point in self._parse(final_url, content_type, body):
+                        if point is not None:
+                            points.setdefault(point.key, point)
+                        if link is None or not same_origin(start_url, link) or depth == self.max_depth:
+                            continue
+                        if urlsplit(link).path.lower().endswith(SKIP_EXTENSIONS):
+                            continue
+                        key = page_key(link)
+                        if key not in seen:
+                            seen.add(key)
+                            next_frontier.append(link)
+                frontier = next_frontier
+        # Links were only queued below max_depth, so any left over were cut by the budget
+        result.truncated = result.truncated or bool(frontier)
+
+        result.points = [point for point in points.values() if same_origin(start_url, point.url)]
+        self.emit_log(f"Crawled {len(result.pages)} pages, found {len(result.points)} injection points")
+        return result
+
+    def _parse(self, url: str, content_type: str, body: str) -> Iterator[Tuple[Optional[str], Optional[InjectionPoint]]]:
+        """(link to follow, injection point) pairs found in one response"""
+        if 'javascript' in content_type or url.lower().endswith('.js'):
+            for endpoint in script_endpoints(body):
+                link = urldefrag(urljoin(url, endpoint))[0]
+                yield link, query_point(link, url, 'script')
+            return
+        if content_type and 'html' not in content_type:
+            return
+        page = parse_page(body)
+        for point in extract_forms(url, page):
+            yield None, point
+        links, scripts, endpoints = extract_links(url, page)
+        for link in links:
+            yield link, query_point(link, url)
+        for endpoint in endpoints:
+            yield endpoint, query_point(endpoint, url, 'script')
+        for script in scripts:
+            yield script, None
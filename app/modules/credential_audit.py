@@ -0,0 +1,247 @@
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+from app.modules.health import HostUnreachable
+from app.modules.results import AuthAttempt
+
+# Outcomes of asking for an attempt slot on a host
+_READY, _WAIT, _BUDGET, _LOCKED, _DONE = 'ready', 'wait', 'budget', 'locked', 'done'
+
+
+@dataclass(slots=True)
+class AuditPolicy:
+    """Limits every credential audit keeps to on each target host"""
+    host_budget: int = 100          # Attempts per host within lockout_window
+    min_spacing: float = 0.5        # Seconds between the starts of two attempts on a host
+    jitter: float = 1.0             # Up to this many seconds added at random to the spacing
+    lockout_threshold: int = 10     # Failures that lock an account; audits stop one short of it
+    lockout_window: float = 900.0   # Seconds a failure counts towards the threshold
+
+
+@dataclass(slots=True, eq=False)
+class AuditJob:
+    """Credentials to try against one service of one host"""
+    host: str
+    service: str                    # 'ssh' or 'ftp'
+    port: int
+    credentials: Iterator[Tuple[str, str]]
+    check: Callable[[str, str], Tuple[bool, str]]
+    spacing: Optional[float] = None  # Overrides the policy spacing (0 disables it)
+    close: Optional[Callable[[], None]] = None
+    stats: Optional[Callable[[], Dict[str, Any]]] = None  # Connection stats of the job's session
+    attempts: int = 0
+    skipped: int = 0                # Credentials not tried to stay under the lockout threshold
+    stopped: Optional[str] = None   # Why the job ended before its credentials did
+    pending: Optional[Tuple[str, str]] = None
+
+    def next_credential(self) -> Optional[Tuple[str, str]]:
+        if self.pending is None:
+            self.pending = next(self.credentials, None)
+        return self.pending
+
+    def report_meta(self) -> Dict[str, Any]:
+        """What a report records about the finished job"""
+        meta = {'audit': {'attempts': self.attempts, 'skipped': self.skipped, 'stopped': self.stopped}}
+        if self.stats is not None:
+            meta['connections'] = self.stats()
+        return meta
+
+
+@dataclass(slots=True)
+class _HostState:
+    busy: bool = False
+    next_time: float = 0.0
+    attempts: Deque[float] = field(default_factory=deque)            # Start times within the window
+    failures: Dict[str, Deque[float]] = field(default_factory=dict)  # Failure times per account
+
+
+def _expire(times: Deque[float], before: float) -> None:
+    while times and times[0] <= before:
+        times.popleft()
+
+
+class CredentialAuditor:
+    """Runs credential checks for many hosts in parallel within per-host limits.
+
+    A host has at most one attempt in flight; attempts on it start at
+    least min_spacing apart and it gets at most host_budget of them per
+    lockout window. An account is never sent the failure that would reach
+    lockout_threshold; its remaining credentials are skipped. A job
+    waiting for its host holds no worker, so wall time grows with hosts
+    divided by max_workers instead of with the sum of every delay.
+
+    Host state is kept across runs, so concurrent scans of one host (the
+    chain's SSH and FTP phases, or two users' jobs) share its limits.
+    """
+
+    POLL = 0.05  # Seconds between checks on a host busy with another run's attempt
+    MAX_HOSTS = 4096  # Host histories kept before idle ones are dropped
+
+    def __init__(self, policy: Optional[AuditPolicy] = None, max_workers: int = 8,
+                 clock: Callable[[], float] = time.monotonic):
+        self.logger = logging.getLogger(__name__)
+        self.policy = policy or AuditPolicy()
+        self.max_workers = max(1, max_workers)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+
+    def init_app(self, app):
+        """Read the audit limits from the Flask config"""
+        policy = self.policy
+        self.policy = AuditPolicy(
+            app.config.get('AUDIT_HOST_BUDGET', policy.host_budget),
+            app.config.get('AUDIT_MIN_SPACING', policy.min_spacing),
+            app.config.get('AUDIT_JITTER', policy.jitter),
+            app.config.get('AUDIT_LOCKOUT_THRESHOLD', policy.lockout_threshold),
+            app.config.get('AUDIT_LOCKOUT_WINDOW', policy.lockout_window)
+        )
+        self.max_workers = max(1, app.config.get('AUDIT_WORKERS', self.max_workers))
+
+    def run(self, jobs: Iterable[AuditJob]) -> Iterator[Tuple[AuditJob, Optional[AuthAttempt]]]:
+        """Yield (job, attempt) as each check completes, and (job, None) when a job is done.
+
+        A job ends when its credentials run out, a check succeeds, its
+        host budget is spent or a check raises HostUnreachable. Every job is closed before run returns.
+        """
+        active = list(jobs)
+        in_flight: Dict[Any, Tuple[AuditJob, Tuple[str, str]]] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cred-audit') as executor:
+                while active or in_flight:
+                    busy = {job for job, _ in in_flight.values()}
+                    next_wake = None
+                    finished = []
+                    for job in active:
+                        if job in busy or len(in_flight) >= self.max_workers:
+                            continue
+                        status, delay = self._next_attempt(job)
+                        if status == _WAIT:
+                            next_wake = delay if next_wake is None else min(next_wake, delay)
+                        elif status == _READY:
+                            credential, job.pending = job.pending, None
+                            # Copy the context so checks keep the job's event room
+                            future = executor.submit(contextvars.copy_context().run, job.check, *credential)
+                            in_flight[future] = (job, credential)
+                        else:
+                            finished.append(job)
+                    for job in finished:
+                        active.remove(job)
+                        yield self._finish(job)
+
+                    if not in_flight:
+                        if next_wake is not None:
+                            time.sleep(next_wake)
+                        continue
+                    done, _ = wait(in_flight, timeout=next_wake, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job, (username, password) = in_flight.pop(future)
+                        try:
+                            success, message = future.result()
+                        except HostUnreachable as e:
+                            # Not an answer from the account, so no failure is counted
+                            self._release(job.host, username, None)
+                            job.stopped = str(e)
+                            active.remove(job)
+                            yield self._finish(job)
+                            continue
+                        except Exception as e:
+                            success, message = False, f"Error testing {username}:{password} - {str(e)}"
+                        self._release(job.host, username, success)
+                        job.attempts += 1
+                        yield job, AuthAttempt(job.service, username, password, success, message, job.port)
+                        if success:
+                            active.remove(job)
+                            yield self._finish(job)
+        finally:
+            # Reached early when the caller stops iterating; the executor has
+            # let in-flight checks finish, and their unknown outcome counts as failed
+            for job, (username, _) in in_flight.values():
+                self._release(job.host, username, False)
+            for job in active:
+                self._close(job)
+
+    def _next_attempt(self, job: AuditJob) -> Tuple[str, float]:
+        """Reserve the host for job's next credential, skipping locked accounts"""
+        while True:
+            credential = job.next_credential()
+            if credential is None:
+                return _DONE, 0.0
+            status, delay = self._reserve(job, credential[0])
+            if status == _LOCKED:
+                job.pending = None
+                job.skipped += 1
+                continue
+            if status == _BUDGET:
+                job.stopped = f"host budget of {self.policy.host_budget} attempts reached"
+            return status, delay
+
+    def _reserve(self, job: AuditJob, username: str) -> Tuple[str, float]:
+        policy = self.policy
+        with self._lock:
+            now = self.clock()
+            if job.host not in self._hosts and len(self._hosts) >= self.MAX_HOSTS:
+                self._prune(now)
+            state = self._hosts.setdefault(job.host, _HostState())
+            _expire(state.attempts, now - policy.lockout_window)
+            failures = state.failures.get(username)
+            if failures is not None:
+                _expire(failures, now - policy.lockout_window)
+                if policy.lockout_threshold > 1 and len(failures) >= policy.lockout_threshold - 1:
+                    return _LOCKED, 0.0
+            if len(state.attempts) >= policy.host_budget:
+                return _BUDGET, 0.0
+            if state.busy:
+                return _WAIT, max(state.next_time - now, self.POLL)
+            if state.next_time > now:
+                return _WAIT, state.next_time - now
+            spacing = policy.min_spacing if job.spacing is None else job.spacing
+            state.busy = True
+            state.attempts.append(now)
+            state.next_time = now + spacing + (random.uniform(0, policy.jitter) if spacing else 0.0)
+            return _READY, 0.0
+
+    def _prune(self, now: float) -> None:
+        # Hosts with nothing left inside the lockout window hold no limits
+        before = now - self.policy.lockout_window
+        for host, state in list(self._hosts.items()):
+            if not state.busy and (not state.attempts or state.attempts[-1] <= before):
+                del self._hosts[host]
+
+    def _release(self, host: str, username: str, success: Optional[bool]) -> None:
+        with self._lock:
+            state = self._hosts[host]
+            state.busy = False
+            if success is None:
+                return
+            if success:
+                # A successful login resets the account's failure count
+                state.failures.pop(username, None)
+            else:
+                state.failures.setdefault(username, deque()).append(self.clock())
+
+    def _finish(self, job: AuditJob) -> Tuple[AuditJob, None]:
+        if job.skipped:
+            self.logger.info(f"Skipped {job.skipped} credentials on {job.host} to avoid account lockout")
+        self._close(job)
+        return job, None
+
+    @staticmethod
+    def _close(job: AuditJob) -> None:
+        if job.close is not None:
+            job.close()
+            job.close = None
+
+    def reset(self) -> None:
+        """Forget every host's attempt history"""
+        with self._lock:
+            self._hosts.clear()
+
+
+credential_auditor = CredentialAuditor()
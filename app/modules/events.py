@@ -0,0 +1,114 @@
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from app import socketio
+from app.modules.job_queue import current_job
+
+
+def job_room(job_id: str) -> str:
+    """Socket.IO room that receives the events of a single scan job"""
+    return f"job:{job_id}"
+
+
+class LogBus:
+    """Buffers scanner events and flushes them to Socket.IO in batches.
+
+    Log lines are coalesced per room into one 'log_batch' event every
+    flush_interval seconds or batch_size messages, whichever comes first.
+    Publishing never waits on socket I/O; once max_queue log lines are
+    pending further lines are dropped and reported as a count in the next
+    batch. Other events (scan_complete, chain_progress) are never dropped
+    and are delivered in order after the log lines queued before them.
+    """
+
+    def __init__(self, flush_interval: float = 0.25, batch_size: int = 50,
+                 max_queue: int = 10000, emit: Optional[Callable] = None):
+        self.logger = logging.getLogger(__name__)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self._emit = emit or socketio.emit
+        self._queue = deque()
+        self._pending_logs = 0
+        self._dropped: Dict[Optional[str], int] = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self.stats = {'published': 0, 'dropped': 0, 'batches': 0}
+
+    def init_app(self, app):
+        """Read batching limits from the Flask config"""
+        self.flush_interval = app.config.get('LOG_FLUSH_INTERVAL_MS', self.flush_interval * 1000) / 1000
+        self.batch_size = app.config.get('LOG_BATCH_SIZE', self.batch_size)
+        self.max_queue = app.config.get('LOG_QUEUE_SIZE', self.max_queue)
+
+    def publish(self, event: str, data: dict, room: Optional[str] = None) -> None:
+        """Queue an event for the next flush without blocking the caller"""
+        with self._cond:
+            if event == 'log_message':
+                if self._pending_logs >= self.max_queue:
+                    self._dropped[room] = self._dropped.get(room, 0) + 1
+                    self.stats['dropped'] += 1
+                    return
+                self._pending_logs += 1
+            self._queue.append((room, event, data))
+            self.stats['published'] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='log-bus', daemon=True)
+                self._thread.start()
+            if self._pending_logs >= self.batch_size or event != 'log_message':
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Emit everything queued so far"""
+        with self._cond:
+            items = list(self._queue)
+            self._queue.clear()
+            self._pending_logs = 0
+            dropped, self._dropped = self._dropped, {}
+
+        pending: Dict[Optional[str], List[str]] = {}
+        try:
+            for room, event, data in items:
+                if event == 'log_message':
+                    pending.setdefault(room, []).append(data['message'])
+                else:
+                    self._emit_batch(room, pending.pop(room, []), dropped.pop(room, 0))
+                    self._emit(event, data, to=room)
+            for room in set(pending) | set(dropped):
+                self._emit_batch(room, pending.get(room, []), dropped.get(room, 0))
+        except Exception as e:
+            self.logger.error(f"Error emitting log batch: {str(e)}")
+
+    def _emit_batch(self, room: Optional[str], messages: List[str], dropped: int) -> None:
+        if not messages and not dropped:
+            return
+        self._emit('log_batch', {'messages': messages, 'dropped': dropped}, to=room)
+        self.stats['batches'] += 1
+
+
+log_bus = LogBus()
+
+
+def emit_event(event: str, data: dict) -> None:
+    """Queue an event for the room of the job running in this context.
+
+    Outside of a job (e.g. a scanner used directly) the event is broadcast.
+    """
+    job = current_job.get()
+    room = job_room(job.id) if job is not None else None
+    log_bus.publish(event, data, room)
+
+
+class LogEmitter:
+    """Mixin giving scanner modules a shared emit_log() backed by the log bus"""
+
+    def emit_log(self, message: str) -> None:
+        """Emit log message to connected clients"""
+        emit_event('log_message', {'message': message})
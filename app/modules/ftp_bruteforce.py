@@ -6,26 +6,128 @@ Only use for authorized security audits with explicit permission.
 
 import ftplib
 import logging
-from typing import Tuple, List, Optional
-from time import sleep
-import random
+from typing import Dict, Iterable, Iterator, Tuple, List, Optional, Union
+from app.modules.corpus import corpus_registry
+from app.modules.credential_audit import AuditJob, credential_auditor
+from app.modules.health import HostUnreachable, host_health
+from app.modules.results import ScanReport, AuthAttempt, connection_stats
+
+
+def split_credential(line: str) -> Tuple[str, str]:
+    """'username:password' as a (username, password) tuple"""
+    username, _, password = line.partition(':')
+    return username, password
+
+
+def _spacing(delay: Union[bool, float]) -> Optional[float]:
+    """Auditor spacing for delay: True keeps the policy's, False disables it, a number replaces it"""
+    if isinstance(delay, bool):
+        return None if delay else 0
+    return delay
+
+
+# Bounds on the directory listing captured after a successful login
+LISTING_MAX_ENTRIES = 20
+LISTING_MAX_BYTES = 8192
+
+
+class _ListingFull(Exception):
+    """Stops a LIST transfer once the capture is full"""
+
+
+def capture_listing(ftp: ftplib.FTP, max_entries: int = LISTING_MAX_ENTRIES,
+                    max_bytes: int = LISTING_MAX_BYTES) -> Tuple[List[str], bool]:
+    """The first entries of the current directory, and whether the listing was cut short.
+
+    Lines are kept in memory up to the bounds instead of printed to
+    stdout, and the transfer is abandoned as soon as a bound is hit.
+    """
+    entries: List[str] = []
+    size = 0
+
+    def collect(line: str) -> None:
+        nonlocal size
+        if len(entries) >= max_entries or size + len(line) > max_bytes:
+            raise _ListingFull
+        entries.append(line)
+        size += len(line)
+
+    try:
+        ftp.retrlines('LIST', collect)
+    except _ListingFull:
+        return entries, True
+    return entries, False
+
+
+class FTPAuthSession:
+    """One FTP control connection reused for successive USER/PASS attempts.
+
+    A rejected login leaves the connection open for the next USER, so the
+    TCP connect and welcome banner are paid once. Servers that hang up
+    after a number of failures (vsftpd's max_login_fails) are reconnected.
+    """
+
+    def __init__(self, target: str, port: int = 21, timeout: float = 5):
+        self.target = target
+        self.port = port
+        self.timeout = timeout
+        self.ftp: Optional[ftplib.FTP] = None
+        self.per_connection: List[int] = []  # Attempts made on each connection
+        self.passwords_tried = 0
+
+    def _connect(self) -> None:
+        ftp = ftplib.FTP()
+        with host_health.guard(self.target, self.port):
+            ftp.connect(self.target, self.port, timeout=self.timeout)
+        self.ftp = ftp
+        self.per_connection.append(0)
+
+    def login(self, username: str, password: str) -> Optional[ftplib.FTP]:
+        """The logged-in connection, or None if the credentials were rejected.
+
+        A logged-in connection is handed over to the caller, who closes it.
+        Connection errors are raised, HostUnreachable once the host's
+        circuit is open.
+        """
+        self.passwords_tried += 1
+        for retry in range(2):
+            if self.ftp is None:
+                self._connect()
+            try:
+                self.ftp.login(username, password)
+            except ftplib.error_perm:
+                self.per_connection[-1] += 1
+                return None
+            except (ftplib.error_temp, EOFError, OSError):
+                # 421 or a closed socket: a session dropped between attempts is retried once
+                reused = self.per_connection[-1] > 0
+                self.close()
+                if retry == 0 and reused:
+                    continue
+                raise
+            self.per_connection[-1] += 1
+            ftp, self.ftp = self.ftp, None
+            return ftp
+
+    def close(self) -> None:
+        if self.ftp is not None:
+            self.ftp.close()
+            self.ftp = None
+
+    def stats(self) -> Dict[str, float]:
+        return connection_stats(self.per_connection, self.passwords_tried)
+
 
 class FTPBruteForceSimulator:
-    def __init__(self):
+    def __init__(self, reuse_connection: bool = True):
         self.logger = logging.getLogger(__name__)
-        # Default wordlist with common username:password pairs
-        self.default_wordlist = [
-            ('admin', 'admin'),
-            ('ftp', 'ftp'),
-            ('anonymous', 'anonymous'),
-            ('user', 'password'),
-            ('test', 'test'),
-            ('admin', 'password'),
-            ('administrator', 'password123'),
-            ('root', 'root')
-        ]
+        # Default wordlist with common username:password pairs, streamed from the corpus
+        self.default_wordlist = corpus_registry.view('ftp_credentials', parse=split_credential)
+        # Try successive credentials on one control connection
+        self.reuse_connection = reuse_connection
     
-    def test_credentials(self, target: str, username: str, password: str, port: int = 21) -> Tuple[bool, str]:
+    def test_credentials(self, target: str, username: str, password: str, port: int = 21,
+                         session: Optional[FTPAuthSession] = None) -> Tuple[bool, str]:
         """Test a single set of FTP credentials.
         
         Args:
@@ -33,94 +135,141 @@ class FTPBruteForceSimulator:
             username: FTP username to test
             password: FTP password to test
             port: FTP port (default: 21)
+            session: Control connection to reuse (default: a new one for this check)
             
         Returns:
             Tuple[bool, str]: (success status, result message)
+            
+        Raises:
+            HostUnreachable: The target's circuit in the health tracker is open
         """
+        own_session = session is None
+        session = session or FTPAuthSession(target, port)
+        try:
+            ftp = session.login(username, password)
+            if ftp is None:
+                return False, f"[-] Failed login attempt - {username}:{password} - Permission denied"
+            try:
+                return True, self._describe_login(ftp, username, password)
+            finally:
+                self._quit(ftp)
+        except HostUnreachable:
+            raise
+        except Exception as e:
+            return False, f"[-] Error testing {username}:{password} - {str(e)}"
+        finally:
+            if own_session:
+                session.close()
+
+    def _describe_login(self, ftp: ftplib.FTP, username: str, password: str) -> str:
+        # Check for anonymous access
+        is_anonymous = username.lower() in ['anonymous', 'ftp'] and (not password or password == 'anonymous')
+        
+        # Get welcome message and system info
+        welcome_msg = ftp.getwelcome()
+        system_info = ""
         try:
-            ftp = ftplib.FTP()
-            ftp.connect(target, port, timeout=5)
-            ftp.login(username, password)
+            system_info = ftp.sendcmd("SYST")
+        except ftplib.all_errors:
+            pass
             
-            # Check for anonymous access
-            is_anonymous = username.lower() in ['anonymous', 'ftp'] and (not password or password == 'anonymous')
+        # Try to get a bounded directory listing
+        entries, truncated = None, False
+        try:
+            entries, truncated = capture_listing(ftp)
+        except ftplib.all_errors:
+            pass
             
-            # Get welcome message and system info
-            welcome_msg = ftp.getwelcome()
-            system_info = ""
-            try:
-                system_info = ftp.sendcmd("SYST")
-            except:
-                pass
-                
-            # Try to get directory listing
-            dir_access = False
-            try:
-                ftp.dir()
-                dir_access = True
-            except:
-                pass
-                
-            # Build result message
-            msg_parts = [
-                f"[+] Successful login - {username}:{password}",
-                f"[i] Welcome message: {welcome_msg}",
-            ]
+        # Build result message
+        msg_parts = [
+            f"[+] Successful login - {username}:{password}",
+            f"[i] Welcome message: {welcome_msg}",
+        ]
+        
+        if system_info:
+            msg_parts.append(f"[i] System info: {system_info}")
+        
+        if is_anonymous:
+            msg_parts.append("[!] WARNING: Anonymous access enabled!")
             
-            if system_info:
-                msg_parts.append(f"[i] System info: {system_info}")
+        if entries is not None:
+            shown = f"first {len(entries)} entries" if truncated else f"{len(entries)} entries"
+            msg_parts.append(f"[i] Directory listing access confirmed ({shown})")
+            msg_parts.extend(f"    {entry}" for entry in entries)
             
-            if is_anonymous:
-                msg_parts.append("[!] WARNING: Anonymous access enabled!")
-                
-            if dir_access:
-                msg_parts.append("[i] Directory listing access confirmed")
-                
-            # If login succeeds, properly close the connection
+        return "\n".join(msg_parts)
+
+    @staticmethod
+    def _quit(ftp: ftplib.FTP) -> None:
+        # An abandoned listing can leave a transfer reply pending, so QUIT may fail
+        try:
             ftp.quit()
-            return True, "\n".join(msg_parts)
-            
-        except ftplib.error_perm as e:
-            return False, f"[-] Failed login attempt - {username}:{password} - Permission denied"
-        except Exception as e:
-            return False, f"[-] Error testing {username}:{password} - {str(e)}"
+        except ftplib.all_errors:
+            pass
+        ftp.close()
     
+    def audit_job(self, target: str, port: int = 21, wordlist: Optional[Iterable[Tuple[str, str]]] = None,
+                  spacing: Optional[float] = None) -> AuditJob:
+        """The credential pairs to try on target, for the credential auditor"""
+        wordlist = wordlist if wordlist else self.default_wordlist
+        session = FTPAuthSession(target, port) if self.reuse_connection else None
+        return AuditJob(target, 'ftp', port, iter(wordlist),
+                        lambda username, password: self.test_credentials(target, username, password, port, session),
+                        spacing, close=session.close if session else None,
+                        stats=session.stats if session else None)
+
     def simulate_bruteforce(self, target: str, port: int = 21, custom_wordlist: Optional[List[Tuple[str, str]]] = None,
-                          delay: bool = True) -> str:
+                          delay: Union[bool, float] = True) -> ScanReport:
         """Simulate FTP bruteforce attempt for security testing.
         
         Args:
             target: The target FTP server IP/hostname
             port: FTP port (default: 21)
             custom_wordlist: Optional custom list of (username, password) tuples
-            delay: Whether to add random delays between attempts (default: True)
+            delay: Whether to space attempts by the credential auditor's policy (default: True),
+                or the seconds to space them by instead
             
         Returns:
-            str: Test results summary
+            ScanReport: One AuthAttempt per credential pair tried
         """
-        wordlist = custom_wordlist if custom_wordlist else self.default_wordlist
-        results = []
+        report = ScanReport('ftp_brute', target, meta={'port': port})
+        for record in self.iter_bruteforce(report, target, port, custom_wordlist, delay):
+            report.add(record)
+        return report
+    
+    def iter_bruteforce(self, report: ScanReport, target: str, port: int = 21,
+                        custom_wordlist: Optional[List[Tuple[str, str]]] = None,
+                        delay: Union[bool, float] = True) -> Iterator[AuthAttempt]:
+        """Yield each credential attempt as soon as it completes (see simulate_bruteforce)"""
+        job = self.audit_job(target, port, custom_wordlist, _spacing(delay))
         
         self.logger.info(f"Starting FTP security test on {target}:{port}")
-        results.append(f"\nFTP Security Test - {target}:{port}")
-        results.append("-" * 40)
         
-        for username, password in wordlist:
-            if delay:
-                # Add random delay between attempts to avoid overwhelming the server
-                sleep(random.uniform(0.5, 2.0))
-            
-            success, message = self.test_credentials(target, username, password, port)
-            results.append(message)
-            
-            # If successful login found, stop testing
-            if success:
-                self.logger.warning(f"Weak FTP credentials found: {username}:{password}")
-                results.append("\n[!] WARNING: Weak FTP credentials identified!")
-                results.append("[!] Recommendation: Change default/weak passwords")
-                break
+        try:
+            for _, attempt in credential_auditor.run([job]):
+                if attempt is None:
+                    continue
+                yield attempt
+                # The auditor stops the job at the first successful login
+                if attempt.success:
+                    self.logger.warning(f"Weak FTP credentials found: {attempt.username}:{attempt.password}")
+        finally:
+            report.meta.update(job.report_meta())
+
+    def iter_batch(self, report: ScanReport, targets: List[str], port: int = 21,
+                   custom_wordlist: Optional[List[Tuple[str, str]]] = None,
+                   delay: Union[bool, float] = True) -> Iterator[ScanReport]:
+        """Test every target at once, yielding each host's report when its attempts are done"""
+        self.logger.info(f"Starting FTP security test on {len(targets)} hosts")
+        report.meta.update(port=port, targets=len(targets))
+        jobs = {self.audit_job(target, port, custom_wordlist, _spacing(delay)): target for target in targets}
+        children = {job: ScanReport('ftp_brute', target, meta={'port': port}) for job, target in jobs.items()}
         
-        if not any(msg.startswith("[+]") for msg in results):
-            results.append("\n[✓] No weak FTP credentials found")
-            
-        return "\n".join(results)
+        for job, attempt in credential_auditor.run(jobs):
+            child = children[job]
+            if attempt is None:
+                child.meta.update(job.report_meta())
+                yield child
+            elif child.add(attempt).success:
+                self.logger.warning(f"Weak FTP credentials found on {child.target}: "
+                                    f"{attempt.username}:{attempt.password}")
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+import requests
+
+# Circuit states
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class HostUnreachable(requests.exceptions.ConnectionError):
+    """Raised instead of connecting to an endpoint whose circuit is open.
+
+    It is a requests ConnectionError, and so an OSError, which the HTTP,
+    SSH and FTP error paths already treat as a failed connection.
+    """
+
+    def __init__(self, endpoint: str, failures: int, last_error: str):
+        super().__init__(f"{endpoint} unreachable after {failures} consecutive connection failures")
+        self.endpoint = endpoint
+        self.last_error = last_error
+
+
+@dataclass(slots=True)
+class _Circuit:
+    failures: int = 0                  # Consecutive connection failures
+    opened_at: Optional[float] = None
+    trial: bool = False                # A half-open trial connection is in flight
+    last_error: str = ''
+
+
+def endpoint_key(host: str, port: int) -> str:
+    host = host.lower()
+    return f"[{host}]:{port}" if ':' in host else f"{host}:{port}"
+
+
+class HealthTracker:
+    """Circuit breaker per endpoint (host and port), shared by every scanner.
+
+    After failure_threshold consecutive connection failures the circuit
+    opens and further connections fail at once with HostUnreachable.
+    Once cooldown seconds have passed one trial connection is let
+    through: if it connects the circuit closes, otherwise it stays open
+    for another cooldown. Any answer counts as reachable, even an error
+    page or a rejected login.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.logger = logging.getLogger(__name__)
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def init_app(self, app):
+        """Read the breaker threshold and cooldown from the Flask config"""
+        self.failure_threshold = max(1, app.config.get('HEALTH_FAILURE_THRESHOLD', self.failure_threshold))
+        self.cooldown = app.config.get('HEALTH_COOLDOWN', self.cooldown)
+        self.reset()
+
+    def state(self, host: str, port: int) -> str:
+        with self._lock:
+            circuit = self._circuits.get(endpoint_key(host, port))
+            if circuit is None or circuit.opened_at is None:
+                return CLOSED
+            if circuit.trial or self.clock() - circuit.opened_at >= self.cooldown:
+                return HALF_OPEN
+            return OPEN
+
+    def before_connect(self, host: str, port: int) -> None:
+        """Raise HostUnreachable unless a connection to the endpoint may be tried"""
+        endpoint = endpoint_key(host, port)
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None or circuit.opened_at is None:
+                return
+            if not circuit.trial and self.clock() - circuit.opened_at >= self.cooldown:
+                circuit.trial = True
+                return
+            raise HostUnreachable(endpoint, circuit.failures, circuit.last_error)
+
+    def record_success(self, host: str, port: int) -> None:
+        with self._lock:
+            circuit = self._circuits.pop(endpoint_key(host, port), None)
+        if circuit is not None and circuit.opened_at is not None:
+            self.logger.info(f"{endpoint_key(host, port)} is reachable again")
+
+    def record_failure(self, host: str, port: int, error: BaseException) -> None:
+        endpoint = endpoint_key(host, port)
+        with self._lock:
+            circuit = self._circuits.setdefault(endpoint, _Circuit())
+            circuit.failures += 1
+            circuit.last_error = str(error)
+            if circuit.trial or circuit.failures >= self.failure_threshold:
+                if circuit.opened_at is None:
+                    self.logger.warning(f"{endpoint} unreachable after {circuit.failures} connection failures")
+                circuit.opened_at = self.clock()
+                circuit.trial = False
+
+    @contextmanager
+    def guard(self, host: str, port: int,
+              is_failure: Callable[[BaseException], bool] = lambda e: isinstance(e, OSError)) -> Iterator[None]:
+        """Connect to host:port inside the block, recording whether it was reachable.
+
+        Exceptions for which is_failure is true count as connection
+        failures; any other outcome means the endpoint answered.
+        """
+        self.before_connect(host, port)
+        try:
+            yield
+        except BaseException as e:
+            if is_failure(e):
+                self.record_failure(host, port, e)
+            else:
+                self.record_success(host, port)
+            raise
+        self.record_success(host, port)
+
+    def reset(self) -> None:
+        """Close every circuit"""
+        with self._lock:
+            self._circuits.clear()
+
+
+host_health = HealthTracker()
@@ -0,0 +1,102 @@
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.retry import Retry
+from app.modules.health import host_health
+
+
+def connect_failed(error: BaseException) -> bool:
+    """Whether error means no connection could be made, rather than one was dropped"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or not error.args:
+        return False
+    # Refused, unresolvable and timed-out connects; NewConnectionError is a ConnectTimeoutError
+    return isinstance(getattr(error.args[0], 'reason', None), ConnectTimeoutError)
+
+
+class HTTPClient:
+    """Shared HTTP client keeping one pooled keep-alive session per host.
+
+    Connection errors and 502/503/504 responses are retried with backoff.
+    Read timeouts are never retried, so time-based checks still see them.
+    Sessions are shared by every job, so they never store cookies; pass
+    cookies= on the request that needs them.
+    Requests to a host that keeps refusing or timing out connections fail
+    fast with HostUnreachable once its circuit in the health tracker opens.
+    """
+
+    def __init__(self, pool_maxsize: int = 10, retries: int = 2,
+                 backoff_factor: float = 0.2, timeout: float = 5, health=None):
+        self.logger = logging.getLogger(__name__)
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.health = health or host_health
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read pool, retry and timeout settings from the Flask config"""
+        self.pool_maxsize = app.config.get('HTTP_POOL_SIZE', self.pool_maxsize)
+        self.retries = app.config.get('HTTP_RETRIES', self.retries)
+        self.backoff_factor = app.config.get('HTTP_BACKOFF', self.backoff_factor)
+        self.timeout = app.config.get('HTTP_TIMEOUT', self.timeout)
+        self.close()
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=False,
+            status=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        # No domain is allowed, so Set-Cookie never reaches the shared jar
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        """Return the pooled session for the scheme and host of url"""
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}".lower()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._build_session()
+            return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        with self.health.guard(parts.hostname or '', port, connect_failed):
+            return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+
+http_client = HTTPClient()
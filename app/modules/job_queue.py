@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+# Job executing in the current worker context, used to route its events
+current_job: ContextVar[Optional['Job']] = ContextVar('current_job', default=None)
+
+
+class Job:
+    """A single scan submitted to the job queue"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    FAILED = 'failed'
+
+    def __init__(self, scan_type: str, target: str):
+        self.id = uuid.uuid4().hex
+        self.scan_type = scan_type
+        self.target = target
+        self.status = Job.QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (Job.FINISHED, Job.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize job state for status polling (the result is rendered by the caller)"""
+        return {
+            'id': self.id,
+            'scan_type': self.scan_type,
+            'target': self.target,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobQueue:
+    """In-process worker pool that runs scans outside the request thread"""
+
+    def __init__(self, max_workers: int = 4, max_jobs: int = 500):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, Job] = {}
+        self.listeners: List[Callable[[Job], None]] = []
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read pool sizing from the Flask config"""
+        self.max_workers = app.config.get('SCAN_WORKERS', self.max_workers)
+        self.max_jobs = app.config.get('SCAN_MAX_JOBS', self.max_jobs)
+
+    def add_listener(self, callback: Callable[[Job], None]) -> None:
+        """Call callback(job) whenever a job finishes or fails"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def _notify(self, job: Job) -> None:
+        for callback in self.listeners:
+            try:
+                callback(job)
+            except Exception as e:
+                self.logger.error(f"Job listener failed for {job.id}: {str(e)}")
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='scan-worker'
+                )
+            return self._executor
+
+    def create(self, scan_type: str, target: str) -> Job:
+        """Register a job that the caller runs itself (e.g. a streamed scan)"""
+        job = Job(scan_type, target)
+        with self._lock:
+            self.jobs[job.id] = job
+            self._prune()
+        return job
+
+    def submit(self, scan_type: str, target: str, func: Callable, *args, **kwargs) -> Job:
+        """Queue func(*args, **kwargs) and return the job tracking it"""
+        job = self.create(scan_type, target)
+        self.executor.submit(self._run, job, func, args, kwargs)
+        self.logger.info(f"Queued {scan_type} job {job.id} for {target}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    @contextmanager
+    def running(self, job: Job):
+        """Mark job as running and bind it to the current context"""
+        job.status = Job.RUNNING
+        job.started_at = time.time()
+        token = current_job.set(job)
+        try:
+            yield job
+            job.status = Job.FINISHED
+        except Exception as e:
+            self.logger.error(f"Job {job.id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = Job.FAILED
+            raise
+        finally:
+            current_job.reset(token)
+            if job.status == Job.RUNNING:
+                # Interrupted, e.g. a streaming client disconnected
+                job.error = "Interrupted"
+                job.status = Job.FAILED
+            job.finished_at = time.time()
+            self._notify(job)
+
+    def _run(self, job: Job, func: Callable, args, kwargs) -> None:
+        try:
+            with self.running(job):
+                job.result = func(*args, **kwargs)
+        except Exception:
+            pass  # Already recorded on the job
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs once max_jobs is exceeded"""
+        excess = len(self.jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        finished = sorted((j for j in self.jobs.values() if j.done), key=lambda j: j.finished_at)
+        for job in finished[:excess]:
+            del self.jobs[job.id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
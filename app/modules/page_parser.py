@@ -0,0 +1,165 @@
+import logging
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; the stdlib tokenizer is used instead
+    etree = None
+
+BACKENDS = ('lxml', 'html.parser')
+DEFAULT_BACKEND = 'lxml' if etree is not None else 'html.parser'
+
+# Tags whose attributes hold links to follow
+_LINK_ATTRS = {'a': 'href', 'area': 'href', 'frame': 'src', 'iframe': 'src'}
+
+
+@dataclass(slots=True)
+class FormField:
+    tag: str                  # 'input', 'textarea' or 'select'
+    name: str
+    type: str = 'text'
+    value: str = ''
+
+
+@dataclass(slots=True)
+class Form:
+    action: str
+    method: str
+    fields: List[FormField] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class PageInfo:
+    """The parts of an HTML page the web simulators use; no tree is kept"""
+    forms: List[Form] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    scripts: List[str] = field(default_factory=list)         # src of external scripts
+    inline_scripts: List[str] = field(default_factory=list)  # Bodies of inline scripts
+
+
+class _PageCollector:
+    """Parser target keeping only forms, links and scripts.
+
+    Receives start/end/data events from either backend. Text is only
+    buffered inside inline scripts, textareas and options, so memory is
+    bounded by what is extracted rather than by the size of the page.
+    """
+
+    def __init__(self):
+        self.page = PageInfo()
+        self._form: Optional[Form] = None
+        self._select: Optional[FormField] = None
+        self._text: Optional[List[str]] = None  # Buffer of the element being captured
+        self._capture: Optional[str] = None     # Tag whose text is being captured
+        self._option_value: Optional[str] = None
+        self._option_selected = False
+        self._select_chosen = False
+
+    def start(self, tag: str, attrs: Dict[str, Optional[str]]) -> None:
+        tag = tag.lower()
+        if tag in _LINK_ATTRS:
+            link = attrs.get(_LINK_ATTRS[tag])
+            if link:
+                self.page.links.append(link)
+        elif tag == 'script':
+            if attrs.get('src'):
+                self.page.scripts.append(attrs['src'])
+            else:
+                self._begin_text('script')
+        elif tag == 'form':
+            self._form = Form(attrs.get('action') or '', (attrs.get('method') or 'get').lower())
+            self.page.forms.append(self._form)
+        elif self._form is None:
+            return
+        elif tag == 'input' and attrs.get('name'):
+            self._form.fields.append(FormField('input', attrs['name'], (attrs.get('type') or 'text').lower(),
+                                               attrs.get('value') or ''))
+        elif tag == 'textarea' and attrs.get('name'):
+            self._form.fields.append(FormField('textarea', attrs['name'], 'textarea'))
+            self._begin_text('textarea')
+        elif tag == 'select' and attrs.get('name'):
+            self._select = FormField('select', attrs['name'], 'select')
+            self._select_chosen = False
+            self._form.fields.append(self._select)
+        elif tag == 'option' and self._select is not None:
+            self._close_option()
+            self._option_value = attrs.get('value')
+            self._option_selected = 'selected' in attrs
+            if self._option_value is None:
+                self._begin_text('option')
+
+    def end(self, tag: str) -> None:
+        tag = tag.lower()
+        if tag == self._capture:
+            text = ''.join(self._text)
+            self._text = self._capture = None
+            if tag == 'script':
+                self.page.inline_scripts.append(text)
+            elif tag == 'textarea' and self._form is not None and self._form.fields:
+                self._form.fields[-1].value = text
+            elif tag == 'option':
+                self._option_value = text.strip()
+        if tag == 'option' and self._select is not None and self._option_value is not None:
+            # The first option is submitted unless another one is marked selected
+            if self._option_selected or not self._select_chosen:
+                self._select.value = self._option_value
+            self._select_chosen = True
+            self._option_value = None
+        elif tag == 'select':
+            self._close_option()
+            self._select = None
+        elif tag == 'form':
+            self._form = None
+
+    def data(self, text: str) -> None:
+        if self._text is not None:
+            self._text.append(text)
+
+    def close(self) -> PageInfo:
+        return self.page
+
+    def _close_option(self) -> None:
+        # html.parser reports no end tag for an <option> closed implicitly
+        if self._capture == 'option' or self._option_value is not None:
+            self.end('option')
+
+    def _begin_text(self, tag: str) -> None:
+        self._capture = tag
+        self._text = []
+
+
+class _StdlibTokenizer(HTMLParser):
+    """Feeds html.parser token events to a collector"""
+
+    def __init__(self, target: _PageCollector):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def parse_page(html: str, backend: Optional[str] = None) -> PageInfo:
+    """Extract forms, links and scripts from html with the fastest available backend"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+    collector = _PageCollector()
+    if backend == 'lxml' and etree is not None:
+        parser = etree.HTMLParser(target=collector)
+        parser.feed(html)
+        return parser.close()
+    if backend == 'lxml':
+        logging.getLogger(__name__).debug("lxml is not installed, using html.parser")
+    tokenizer = _StdlibTokenizer(collector)
+    tokenizer.feed(html)
+    tokenizer.close()
+    return collector.close()
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+import requests
+from app.modules.http_client import http_client as shared_http_client
+
+
+@dataclass
+class Probe:
+    """A single payload request to send to the target"""
+    method: str
+    url: str
+    payload: str
+    data: Optional[Union[Dict[str, str], str]] = None  # Form fields, or a body already encoded
+    context: Dict[str, Any] = field(default_factory=dict)
+    headers: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class ProbeResult:
+    probe: Probe
+    response: Optional[requests.Response] = None
+    error: Optional[requests.exceptions.RequestException] = None
+    elapsed: float = 0.0
+
+
+class PayloadEngine:
+    """Sends payload probes either one by one or concurrently.
+
+    'sequential' (the default) keeps the old one-request-at-a-time behaviour
+    for fragile targets. 'async' fans all probes out on an asyncio loop,
+    allowing at most `concurrency` requests in flight per host. Requests
+    still go through the pooled HTTPClient, so retries and keep-alive
+    apply in both modes. Results are always returned in probe order.
+    """
+
+    MODES = ('sequential', 'async')
+
+    def __init__(self, http_client=None, mode: str = 'sequential', concurrency: int = 5):
+        self.logger = logging.getLogger(__name__)
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown payload engine mode: {mode}")
+        self.http = http_client or shared_http_client
+        self.mode = mode
+        self.concurrency = max(1, concurrency)
+
+    def _send(self, probe: Probe) -> ProbeResult:
+        start = time.perf_counter()
+        try:
+            extra = {'headers': probe.headers} if probe.headers else {}
+            response = self.http.request(probe.method, probe.url, data=probe.data, **extra)
+            return ProbeResult(probe, response=response, elapsed=time.perf_counter() - start)
+        except requests.exceptions.RequestException as e:
+            return ProbeResult(probe, error=e, elapsed=time.perf_counter() - start)
+
+    def run(self, probes: List[Probe]) -> List[ProbeResult]:
+        """Send every probe and return the results in the same order"""
+        return list(self.iter_results(probes))
+
+    def iter_results(self, probes: List[Probe]) -> Iterator[ProbeResult]:
+        """Yield results in probe order as soon as each one is available"""
+        if self.mode == 'sequential' or len(probes) < 2:
+            for probe in probes:
+                yield self._send(probe)
+            return
+
+        # The event loop runs on its own thread and hands back results as
+        # they complete; out-of-order results wait until their turn. Probes
+        # not yet sent are skipped once the caller stops iterating.
+        completed = queue.Queue()
+        stop = threading.Event()
+        loop_thread = threading.Thread(
+            target=lambda: asyncio.run(self._run_async(probes, completed.put, stop)),
+            name='payload-engine-loop',
+            daemon=True
+        )
+        loop_thread.start()
+        try:
+            waiting = {}
+            for index in range(len(probes)):
+                while index not in waiting:
+                    done_index, result = completed.get()
+                    waiting[done_index] = result
+                yield waiting.pop(index)
+        finally:
+            stop.set()
+        loop_thread.join()
+
+    async def _run_async(self, probes: List[Probe], on_result: Callable[[Tuple[int, ProbeResult]], None],
+                         stop: threading.Event) -> None:
+        loop = asyncio.get_running_loop()
+        hosts = {urlsplit(probe.url).netloc for probe in probes}
+        limits = {host: asyncio.Semaphore(self.concurrency) for host in hosts}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency * len(hosts),
+                                thread_name_prefix='payload-engine') as executor:
+            async def send(index: int, probe: Probe) -> None:
+                async with limits[urlsplit(probe.url).netloc]:
+                    if stop.is_set():
+                        return
+                    result = await loop.run_in_executor(executor, self._send, probe)
+                on_result((index, result))
+
+            await asyncio.gather(*(send(index, probe) for index, probe in enumerate(probes)))
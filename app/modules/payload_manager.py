@@ -1,9 +1,9 @@
 import logging
 from typing import List, Dict
-from app import socketio
+from app.modules.events import LogEmitter
 import time
 
-class PayloadManager:
+class PayloadManager(LogEmitter):
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.community_payloads = {
@@ -19,13 +19,6 @@ class PayloadManager:
             'ftp': ['anonymous', 'default-creds', 'wordlist']
         }
         
-    def emit_log(self, message):
-        """Emit log message to connected clients"""
-        try:
-            socketio.emit('log_message', {'message': message})
-        except Exception as e:
-            self.logger.error(f"Error emitting log: {str(e)}")
-
     def add_payload(self, payload_type: str, payload: str, category: str = None) -> bool:
         """Add a new community payload with category"""
         if payload_type not in self.community_payloads:
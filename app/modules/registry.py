@@ -0,0 +1,58 @@
+import copy
+import logging
+import threading
+import time
+from typing import Any, Dict, Type
+import nmap
+
+
+class ScannerRegistry:
+    """Process-wide, lazily built scanner objects.
+
+    nmap.PortScanner() shells out to locate and version-check the nmap
+    binary. The registry does that once per process and hands out copies
+    of the probed scanner, each with its own empty scan result. Modules
+    that hold no per-scan state (the SSH and FTP simulators) are built
+    once and shared.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._prototype = None
+        self._shared: Dict[type, Any] = {}
+        self.stats = {'nmap_probes': 0, 'probe_seconds': 0.0, 'port_scanners': 0}
+
+    def port_scanner(self) -> nmap.PortScanner:
+        """Return a fresh PortScanner without probing the nmap binary again"""
+        with self._lock:
+            if self._prototype is None:
+                start = time.perf_counter()
+                self._prototype = nmap.PortScanner()
+                elapsed = time.perf_counter() - start
+                self.stats['nmap_probes'] += 1
+                self.stats['probe_seconds'] += elapsed
+                self.logger.info(f"nmap binary probed in {elapsed * 1000:.1f} ms")
+            self.stats['port_scanners'] += 1
+        scanner = copy.copy(self._prototype)
+        # The scan result and raw output are per-scan state
+        scanner._scan_result = {}
+        scanner._nmap_last_output = ''
+        return scanner
+
+    def shared(self, cls: Type) -> Any:
+        """Return the process-wide instance of a stateless scanner module"""
+        with self._lock:
+            instance = self._shared.get(cls)
+            if instance is None:
+                instance = self._shared[cls] = cls()
+            return instance
+
+    def reset(self) -> None:
+        """Forget everything built so far; the next request probes again"""
+        with self._lock:
+            self._prototype = None
+            self._shared.clear()
+
+
+scanner_registry = ScannerRegistry()
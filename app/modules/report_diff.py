@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Optional, Tuple
+from app.modules.results import ScanReport
+
+Fingerprint = Tuple[str, str, str, str]
+
+
+def host_fingerprints(report: ScanReport) -> Dict[int, Fingerprint]:
+    """Open ports of a discovery scan keyed by port number"""
+    return {
+        port.port: (port.protocol, port.service, port.product, port.version)
+        for host in report.hosts for port in host.open_ports()
+    }
+
+
+def port_fingerprints(chain: ScanReport) -> Dict[int, Fingerprint]:
+    """Open ports found by a chain's discovery phase"""
+    fingerprints = {}
+    for child in chain.children:
+        if child.phase == 'discovery':
+            fingerprints.update(host_fingerprints(child))
+    return fingerprints
+
+
+def finding_keys(report: ScanReport) -> Dict[tuple, Dict[str, Any]]:
+    """Every finding and successful login of a chain, keyed for comparison"""
+    keys = {}
+    for child in report.children:
+        for finding in child.findings:
+            port = finding.port if finding.port is not None else child.meta.get('port')
+            key = (child.phase, port, finding.title, finding.location, finding.payload)
+            keys[key] = {'phase': child.phase, 'port': port, 'title': finding.title,
+                         'location': finding.location, 'payload': finding.payload}
+        for attempt in child.successful_attempts:
+            title = f"Weak {attempt.service.upper()} credentials"
+            key = (child.phase, child.meta.get('port'), title, attempt.username, None)
+            keys[key] = {'phase': child.phase, 'port': child.meta.get('port'), 'title': title,
+                         'location': attempt.username, 'payload': None}
+    return keys
+
+
+def diff_reports(previous: ScanReport, current: ScanReport,
+                 previous_scan_id: Optional[int] = None) -> Dict[str, Any]:
+    """Ports and findings that appeared, disappeared or changed between two chain runs"""
+    before, after = port_fingerprints(previous), port_fingerprints(current)
+    old_findings, new_findings = finding_keys(previous), finding_keys(current)
+    reused: List[int] = sorted({
+        child.meta['port'] for child in current.children
+        if 'reused_from' in child.meta and child.meta.get('port') is not None
+    })
+    return {
+        'previous_scan': previous_scan_id,
+        'new_ports': sorted(set(after) - set(before)),
+        'closed_ports': sorted(set(before) - set(after)),
+        'changed_ports': sorted(port for port in set(before) & set(after) if before[port] != after[port]),
+        'new_findings': [new_findings[key] for key in new_findings if key not in old_findings],
+        'resolved_findings': [old_findings[key] for key in old_findings if key not in new_findings],
+        'reused_ports': reused
+    }
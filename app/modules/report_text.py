@@ -0,0 +1,271 @@
+from typing import Callable, Dict, List
+from app.modules.results import ScanReport, ERROR
+
+REMINDER = "\nReminder: Only test on authorized systems!"
+
+# Educational notes printed under SQLi payloads, keyed by payload marker
+SQLI_NOTES = [
+    ("UNION SELECT", "Note: UNION-based payloads can extract data from other tables"),
+    ("SLEEP", "Note: Time-based payloads help detect blind SQLi"),
+    ("WAITFOR", "Note: Time-based payloads help detect blind SQLi"),
+    ("CONVERT", "Note: Error-based payloads force database errors to leak info")
+]
+
+CHAIN_PHASES = [
+    ('discovery', "Phase 1: Service Discovery", None),
+    ('web', "Phase 2: Web Vulnerability Testing", "No web services discovered to test"),
+    ('ssh', "Phase 3: SSH Security Testing", "No SSH services discovered to test"),
+    ('ftp', "Phase 4: FTP Security Testing", "No FTP services discovered to test")
+]
+
+
+def _finding_lines(finding) -> List[str]:
+    prefix = "" if finding.severity == ERROR else "! "
+    lines = [f"{prefix}{finding.title}"]
+    if finding.detail and finding.severity != ERROR and finding.title != finding.detail:
+        lines.append(finding.detail)
+    return lines
+
+
+def _render_vuln_scan(report: ScanReport) -> List[str]:
+    lines = list(report.notes)
+    if 'shards' in report.meta:
+        lines.insert(0, f"Batch scan of {report.meta['targets']} hosts in {report.meta['shards']} nmap runs")
+    if 'pairs' in report.meta:
+        line = f"Connect scan of {report.meta['targets']} hosts ({report.meta['pairs']} host:port pairs)"
+        if 'fingerprint_runs' in report.meta:
+            line += f", open ports fingerprinted in {report.meta['fingerprint_runs']} nmap runs"
+        lines.insert(0, line)
+    for host in report.hosts:
+        lines.extend([
+            f"\nScan report for {host.target} ({host.ip})",
+            "=" * 50,
+            "PORT     STATE  SERVICE    VERSION",
+            "-" * 50
+        ])
+        if not host.ports:
+            lines.append("No open ports found")
+        for port in host.ports:
+            lines.append(f"{port.port:<8} {port.state:<6} {port.service:<10} {port.version_info}".rstrip())
+            for finding in report.findings:
+                if finding.port == port.port and finding.location in (None, host.ip):
+                    lines.append(f"    ! {finding.title}")
+    return lines
+
+
+def _crawl_line(crawl: Dict) -> str:
+    line = (f"Crawled {crawl['pages']} pages to depth {crawl['depth']}, "
+            f"found {crawl['points']} injection points")
+    return line + (" (page budget reached)" if crawl['truncated'] else "")
+
+
+def _timing_line(timing: Dict, location: str = "") -> str:
+    where = f" for {location}" if location else ""
+    return (f"\nTiming analysis{where}: baseline {timing['baseline_mean'] * 1000:.0f} ms "
+            f"(sd {timing['baseline_stdev'] * 1000:.0f} ms), {timing['delay']}s injected delay, "
+            f"{timing['requests']} requests in {timing['total_time']:.1f}s")
+
+
+def _unreachable_lines(report: ScanReport) -> List[str]:
+    if 'unreachable' not in report.meta:
+        return []
+    return [f"\n! Target unreachable, remaining tests skipped: {report.meta['unreachable']}"]
+
+
+def _connection_line(connections: Dict) -> str:
+    return (f"{connections['attempts']} attempts over {connections['handshakes']} connections "
+            f"({connections['attempts_per_connection']} per connection, "
+            f"{connections['handshakes_saved']} handshakes saved)")
+
+
+def _render_sqli(report: ScanReport) -> List[str]:
+    lines = [
+        f"Testing SQL Injection vulnerabilities on {report.meta.get('url', report.target)}",
+        "=" * 50
+    ]
+    if 'crawl' in report.meta:
+        lines.append(_crawl_line(report.meta['crawl']) + "\n")
+    else:
+        lines.append(f"Baseline response length: {report.meta.get('baseline_length', 0)} bytes\n")
+    for payload in report.meta.get('payloads', []):
+        lines.extend([f"\nTesting payload: {payload}", "-" * 30])
+        for finding in report.findings:
+            if finding.payload == payload:
+                lines.extend(_finding_lines(finding))
+        note = next((note for marker, note in SQLI_NOTES if marker in payload), None)
+        if note:
+            lines.append(note)
+    timing = report.meta.get('timing')
+    if timing:
+        lines.append(_timing_line(timing))
+    for location, timing in report.meta.get('timing_points', {}).items():
+        lines.append(_timing_line(timing, location))
+    lines.extend(_unreachable_lines(report))
+    lines.append(REMINDER)
+    return lines
+
+
+def _render_xss(report: ScanReport) -> List[str]:
+    lines = [
+        f"Testing XSS Vulnerabilities on {report.target}",
+        "=" * 50,
+        "\nEducational Notes:",
+        "- XSS allows attackers to inject malicious scripts",
+        "- Always sanitize user input",
+        "- Use Content Security Policy (CSP)",
+        "- Encode special characters in output\n"
+    ]
+    if 'crawl' in report.meta:
+        lines.append(_crawl_line(report.meta['crawl']))
+    inputs = report.meta.get('inputs', [])
+    if not inputs:
+        lines.append("No input fields found to test")
+        return lines + _unreachable_lines(report)
+    lines.append(f"Found {len(inputs)} potential injection points")
+    for input_data in inputs:
+        location = input_data.get('location', input_data['input_name'])
+        lines.extend([
+            f"\nTesting {input_data['input_type']} input: {location}",
+            "-" * 40
+        ])
+        for finding in report.findings:
+            if finding.location == location:
+                lines.extend(_finding_lines(finding))
+    lines.extend(_unreachable_lines(report))
+    lines.append(REMINDER)
+    return lines
+
+
+def _audit_lines(report: ScanReport, prefix: str = "") -> List[str]:
+    lines = []
+    audit = report.meta.get('audit') or {}
+    if audit.get('skipped'):
+        lines.append(f"{prefix}{audit['skipped']} credentials skipped to stay under the account lockout threshold")
+    if audit.get('stopped'):
+        lines.append(f"{prefix}Stopped early: {audit['stopped']}")
+    connections = report.meta.get('connections')
+    if connections and connections['handshakes']:
+        lines.append(prefix + _connection_line(connections))
+    return lines
+
+
+def _batch_lines(report: ScanReport, service: str) -> List[str]:
+    lines = [f"{service} credential audit of {report.meta.get('targets', len(report.children))} hosts", "=" * 50]
+    for child in report.children:
+        lines.extend(["", render_text(child)])
+    return lines
+
+
+def _render_ssh_brute(report: ScanReport) -> List[str]:
+    if report.children:
+        return _batch_lines(report, "SSH")
+    lines = [
+        f"SSH Security Test for {report.target}",
+        "=" * 50,
+        f"Testing username: {report.meta.get('username', '')}",
+        "-" * 50,
+        "\nEducational Notes:",
+        "- Strong passwords should be long and complex",
+        "- Use SSH keys instead of passwords when possible",
+        "- Implement fail2ban or similar tools",
+        "- Monitor auth.log for suspicious attempts\n"
+    ]
+    for attempt in report.attempts:
+        lines.extend([f"Testing password: {attempt.password}", f"Result: {attempt.message}"])
+        if attempt.success:
+            lines.extend(["\n! Warning: Weak password detected!", "Recommendation: Change password immediately"])
+    audit = _audit_lines(report)
+    if audit:
+        lines.extend([""] + audit)
+    lines.append(REMINDER)
+    return lines
+
+
+def _render_ftp_brute(report: ScanReport) -> List[str]:
+    if report.children:
+        return _batch_lines(report, "FTP")
+    lines = [f"\nFTP Security Test - {report.target}:{report.meta.get('port', 21)}", "-" * 40]
+    lines.extend(attempt.message for attempt in report.attempts)
+    if report.successful_attempts:
+        lines.extend([
+            "\n[!] WARNING: Weak FTP credentials identified!",
+            "[!] Recommendation: Change default/weak passwords"
+        ])
+    else:
+        lines.append("\n[✓] No weak FTP credentials found")
+    lines.extend(_audit_lines(report, "[i] "))
+    return lines
+
+
+def _diff_lines(diff: Dict) -> List[str]:
+    def ports(values):
+        return ", ".join(str(port) for port in values) or "none"
+
+    lines = [
+        f"\nChanges Since Previous Run (scan #{diff['previous_scan']})",
+        "-" * 40,
+        f"New ports: {ports(diff['new_ports'])}",
+        f"Closed ports: {ports(diff['closed_ports'])}",
+        f"Changed services: {ports(diff['changed_ports'])}",
+        f"Not re-tested (unchanged): {ports(diff['reused_ports'])}"
+    ]
+    for label, key in (("New", 'new_findings'), ("Resolved", 'resolved_findings')):
+        for finding in diff[key]:
+            where = f" on port {finding['port']}" if finding['port'] is not None else ""
+            lines.append(f"{label}: {finding['title']}{where}")
+    return lines
+
+
+def _render_attack_chain(report: ScanReport) -> List[str]:
+    lines = [f"Chained Security Test on {report.target}", "=" * 50]
+    for phase, title, empty_message in CHAIN_PHASES:
+        lines.extend([f"\n{title}", "-" * 40])
+        children = [child for child in report.children if child.phase == phase]
+        if not children and empty_message:
+            lines.append(empty_message)
+        for child in children:
+            lines.extend([render_text(child), ""])
+
+    diff = report.meta.get('diff')
+    if diff:
+        lines.extend(_diff_lines(diff))
+
+    services = report.meta.get('services', {})
+    lines.extend([
+        "\nSecurity Analysis",
+        "=" * 50,
+        f"Web Services: {len(services.get('web', []))} ports",
+        f"SSH Services: {len(services.get('ssh', []))} ports",
+        f"FTP Services: {len(services.get('ftp', []))} ports",
+        f"Database Services: {len(services.get('db', []))} ports",
+        f"Other Services: {len(services.get('other', []))} ports",
+        "\nRecommendations:",
+        "1. Minimize exposed services",
+        "2. Implement strong access controls",
+        "3. Keep all services updated",
+        "4. Monitor for suspicious activity",
+        "5. Use WAF for web services",
+        "6. Enable fail2ban for SSH and FTP",
+        "\nReminder: Only test authorized systems!"
+    ])
+    return lines
+
+
+RENDERERS: Dict[str, Callable[[ScanReport], List[str]]] = {
+    'vuln_scan': _render_vuln_scan,
+    'sqli': _render_sqli,
+    'xss': _render_xss,
+    'ssh_brute': _render_ssh_brute,
+    'ftp_brute': _render_ftp_brute,
+    'attack_chain': _render_attack_chain
+}
+
+
+def render_text(report: ScanReport) -> str:
+    """Render a structured report as the plain-text report shown to users"""
+    if report.error:
+        return report.error
+    renderer = RENDERERS.get(report.scan_type)
+    if renderer is None:
+        return "\n".join(report.notes) or "No results available."
+    return "\n".join(renderer(report))
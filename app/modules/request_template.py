@@ -0,0 +1,200 @@
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote, urlsplit, urlunsplit
+from app.modules.payload_engine import Probe
+
+LOCATIONS = ('query', 'form', 'json', 'header', 'cookie')
+
+
+def _url(payload: str) -> str:
+    return quote(payload, safe='')
+
+
+def _no_newlines(payload: str) -> str:
+    # A raw CR/LF would end the header and let the payload forge new ones
+    return payload.replace('\r', '%0D').replace('\n', '%0A')
+
+
+# Transforms applied to a payload before it is placed in the request
+ENCODINGS: Dict[str, Callable[[str], str]] = {
+    'url': _url,                                  # Percent-encoded, as a browser sends it
+    'double_url': lambda payload: _url(_url(payload)),  # For targets that decode twice
+    'raw': lambda payload: payload,               # Sent as written
+}
+
+# Encoding used when none is asked for; JSON, headers and cookies are framed safely anyway
+DEFAULT_ENCODING = {'query': 'url', 'form': 'url', 'json': 'raw', 'header': 'raw', 'cookie': 'url'}
+
+
+@dataclass(slots=True)
+class RequestTemplate:
+    """A request with one slot for the payload.
+
+    Everything around the slot is rendered once when the template is
+    built, so each payload costs one encoding and a string concatenation.
+    """
+    method: str
+    location: str
+    param: str
+    encoding: str
+    url_prefix: str
+    url_suffix: str = ''
+    body_prefix: Optional[str] = None
+    body_suffix: str = ''
+    headers: Dict[str, str] = field(default_factory=dict)
+    header_prefix: str = ''   # Header or cookie slot: the header's text around the payload
+    header_suffix: str = ''
+    frame: Callable[[str], str] = _url
+
+    def _slot(self, payload: str) -> str:
+        return self.frame(ENCODINGS[self.encoding](payload))
+
+    def url_for(self, payload: str) -> str:
+        """The request URL carrying payload (the payload is only in it for query templates)"""
+        if self.location == 'query':
+            return self.url_prefix + self._slot(payload) + self.url_suffix
+        return self.url_prefix + self.url_suffix
+
+    def probe(self, payload: str, context: Optional[Dict[str, Any]] = None) -> Probe:
+        """The payload request, ready for the payload engine"""
+        data, headers = None, self.headers
+        if self.location in ('form', 'json'):
+            data = self.body_prefix + self._slot(payload) + self.body_suffix
+        elif self.body_prefix is not None:
+            data = self.body_prefix + self.body_suffix
+        if self.location in ('header', 'cookie'):
+            name = self.param if self.location == 'header' else 'Cookie'
+            headers = {**self.headers, name: self.header_prefix + self._slot(payload) + self.header_suffix}
+        return Probe(self.method, self.url_for(payload), payload, data=data, headers=headers or None,
+                     context=context or {})
+
+
+class RequestBuilder:
+    """Parses a target request once and builds payload templates for its parameters.
+
+    The URL's query string, a form or JSON body, headers and cookies are
+    all injectable; every other parameter keeps its original value and
+    order. A parameter that does not exist yet is appended.
+    """
+
+    def __init__(self, url: str, method: str = 'GET', data: Optional[Dict[str, str]] = None,
+                 json_body: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                 cookies: Optional[Dict[str, str]] = None):
+        parts = urlsplit(url)
+        self.method = method.upper()
+        self.base = urlunsplit((parts.scheme, parts.netloc, parts.path or '/', '', ''))
+        self.query: List[Tuple[str, str]] = parse_qsl(parts.query, keep_blank_values=True)
+        self.form = list((data or {}).items()) if data is not None else None
+        self.json_body = json_body
+        self.headers = dict(headers or {})
+        self.cookies = list((cookies or {}).items())
+
+    def parameters(self) -> List[Tuple[str, str]]:
+        """(location, name) of every parameter that can carry a payload"""
+        params = [('query', name) for name, _ in self.query]
+        params += [('form', name) for name, _ in self.form or []]
+        params += [('json', name) for name in (self.json_body or {})]
+        params += [('cookie', name) for name, _ in self.cookies]
+        return params
+
+    def value(self, location: str, param: str) -> Optional[str]:
+        """The original value of param, or None if the request does not have it"""
+        if location == 'json':
+            node: Any = self.json_body or {}
+            for key in param.split('.'):
+                node = node.get(key) if isinstance(node, dict) else None
+            return None if node is None or isinstance(node, dict) else str(node)
+        if location == 'header':
+            return self.headers.get(param)
+        pairs = {'query': self.query, 'form': self.form or [], 'cookie': self.cookies}.get(location, [])
+        return dict(pairs).get(param)
+
+    def template(self, location: str, param: str, encoding: Optional[str] = None) -> RequestTemplate:
+        if location not in LOCATIONS:
+            raise ValueError(f"Unknown injection location: {location}")
+        encoding = encoding or DEFAULT_ENCODING[location]
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown payload encoding: {encoding}")
+
+        headers = dict(self.headers)
+        url_prefix, url_suffix = self.base, self._encoded(self.query)
+        if url_suffix:
+            url_suffix = '?' + url_suffix
+        body_prefix, body_suffix = None, ''
+        if self.form is not None:
+            body_prefix = self._encoded(self.form)
+            headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+        elif self.json_body is not None:
+            body_prefix = json.dumps(self.json_body)
+            headers.setdefault('Content-Type', 'application/json')
+        if self.cookies and location != 'cookie':
+            headers['Cookie'] = self._cookie_header(self.cookies)
+        template = RequestTemplate(self.method, location, param, encoding, url_prefix, url_suffix,
+                                   body_prefix, body_suffix, headers)
+
+        if location == 'query':
+            before, after = self._split(self.query, param, self._encoded)
+            template.url_prefix = f"{self.base}?{before}{'&' if before else ''}{_url(param)}="
+            template.url_suffix = f"&{after}" if after else ''
+            template.frame = lambda text: text
+        elif location == 'form':
+            before, after = self._split(self.form or [], param, self._encoded)
+            template.body_prefix = f"{before}{'&' if before else ''}{_url(param)}="
+            template.body_suffix = f"&{after}" if after else ''
+            template.frame = lambda text: text
+            headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+            if template.method == 'GET':
+                template.method = 'POST'
+        elif location == 'json':
+            template.body_prefix, template.body_suffix = self._json_slot(param)
+            template.frame = lambda text: json.dumps(text)[1:-1]
+            headers['Content-Type'] = 'application/json'
+            if template.method == 'GET':
+                template.method = 'POST'
+        elif location == 'header':
+            headers.pop(param, None)
+            template.frame = _no_newlines
+        else:
+            before, after = self._split(self.cookies, param, self._cookie_header)
+            headers.pop('Cookie', None)
+            template.header_prefix = f"{before}{'; ' if before else ''}{param}="
+            template.header_suffix = f"; {after}" if after else ''
+            template.frame = lambda text: _no_newlines(text).replace(';', '%3B')
+        return template
+
+    def templates(self, encoding: Optional[str] = None) -> List[RequestTemplate]:
+        """A template for every parameter of the request"""
+        return [self.template(location, name, encoding) for location, name in self.parameters()]
+
+    @staticmethod
+    def _encoded(pairs: List[Tuple[str, str]]) -> str:
+        return '&'.join(f"{_url(name)}={_url(value)}" for name, value in pairs)
+
+    @staticmethod
+    def _cookie_header(pairs: List[Tuple[str, str]]) -> str:
+        return '; '.join(f"{name}={value}" for name, value in pairs)
+
+    @staticmethod
+    def _split(pairs, param, render) -> Tuple[str, str]:
+        """Rendered pairs before and after param; a new param goes at the end"""
+        names = [name for name, _ in pairs]
+        if param not in names:
+            return render(pairs), ''
+        index = names.index(param)
+        return render(pairs[:index]), render(pairs[index + 1:])
+
+    def _json_slot(self, param: str) -> Tuple[str, str]:
+        """Body text around the string value of param; dots address nested objects"""
+        marker = f"payload-{uuid.uuid4().hex}"
+        body = json.loads(json.dumps(self.json_body or {}))
+        node = body
+        *parents, leaf = param.split('.')
+        for key in parents:
+            if not isinstance(node.get(key), dict):
+                node[key] = {}
+            node = node[key]
+        node[leaf] = marker
+        prefix, suffix = json.dumps(body).split(marker, 1)
+        return prefix, suffix
@@ -0,0 +1,106 @@
+import html
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+from urllib.parse import quote, quote_plus
+from app.modules.signatures import SignatureMatch, SignatureMatcher
+
+# Error signatures per DBMS, in lower case and matched case-insensitively.
+# Each starts with a literal so the regex engine can skip ahead to candidates
+DBMS_ERRORS: Dict[str, List[str]] = {
+    'MySQL': [r"you have an error in your sql syntax", r"warning: mysql", r"mysql_fetch",
+              r"mysqli_fetch", r"mysqlclient\.", r"com\.mysql\.jdbc"],
+    'PostgreSQL': [r"postgresql.{0,80}error", r"pg_query\(\)", r"pg_exec\(\)", r"psqlexception",
+                   r"unterminated quoted string at or near"],
+    'SQL Server': [r"microsoft sql server", r"odbc sql server driver", r"sqlserver jdbc driver",
+                   r"unclosed quotation mark after the character string", r"system\.data\.sqlclient"],
+    'Oracle': [r"ora-\d{5}", r"oracle error", r"quoted string not properly terminated"],
+    'SQLite': [r"sqlite_error", r"sqlite3\.operationalerror", r"unrecognized token:"],
+    'Generic': [r"sql syntax.{0,80}near", r"syntax error.{0,80}sql", r"unclosed quotation mark"],
+}
+
+ERROR_SIGNATURES = SignatureMatcher(
+    ((dbms, pattern) for dbms, patterns in DBMS_ERRORS.items() for pattern in patterns), regex=True
+)
+
+# Content that changes between requests without meaning anything
+_DYNAMIC = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"   # UUIDs
+    r"|\b\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?\S*"    # ISO timestamps
+    r"|\b\d{1,2}:\d{2}:\d{2}\b"                                        # Clock times
+    r"|\b[0-9a-f]{16,}\b"                                              # Hex tokens / hashes
+    r"|\b[a-z0-9+/_-]{32,}={0,2}"                                      # Base64 tokens (CSRF, session)
+    r"|\b\d{9,}\b",                                                    # Epoch times, request ids
+    re.IGNORECASE
+)
+_TOKENS = re.compile(r"\w+|[^\w\s]")
+
+
+@dataclass(slots=True)
+class Fingerprint:
+    """Normalized shingle set of a response, compared by Jaccard similarity"""
+    length: int
+    shingles: FrozenSet[int] = field(default_factory=frozenset)
+
+
+@dataclass(slots=True)
+class Comparison:
+    similarity: float
+    length_delta: int
+    errors: List[SignatureMatch] = field(default_factory=list)  # Labelled with the DBMS
+
+
+def find_errors(text: str) -> List[SignatureMatch]:
+    """DBMS error signatures in text, in document order.
+
+    Where signatures overlap (a generic one inside a DBMS-specific
+    message) only the first, most specific, is kept.
+    """
+    errors: List[SignatureMatch] = []
+    end = -1
+    for match in ERROR_SIGNATURES.find_all(text):
+        if match.offset >= end:
+            errors.append(match)
+            end = match.offset + len(match.text)
+    return errors
+
+
+def normalize(text: str, payload: Optional[str] = None) -> str:
+    """Lower-case text with reflected payloads and dynamic tokens removed"""
+    text = text.lower()
+    if payload:
+        for form in {payload, html.escape(payload), html.escape(payload, quote=False),
+                     quote(payload), quote_plus(payload)}:
+            text = text.replace(form.lower(), " ")
+    return _DYNAMIC.sub(" ", text)
+
+
+def fingerprint(text: str, payload: Optional[str] = None, k: int = 4) -> Fingerprint:
+    """Hash every run of k tokens; linear in the size of the response"""
+    tokens = _TOKENS.findall(normalize(text, payload))
+    if len(tokens) < k:
+        return Fingerprint(len(text), frozenset([hash(tuple(tokens))]))
+    return Fingerprint(len(text), frozenset(hash(tuple(tokens[i:i + k])) for i in range(len(tokens) - k + 1)))
+
+
+def similarity(a: Fingerprint, b: Fingerprint) -> float:
+    if not a.shingles and not b.shingles:
+        return 1.0
+    return len(a.shingles & b.shingles) / len(a.shingles | b.shingles)
+
+
+class ResponseComparer:
+    """Compares payload responses against a baseline page.
+
+    Error signatures already present on the baseline are ignored, so a
+    page that always shows a SQL error is not reported for every payload.
+    """
+
+    def __init__(self, baseline_text: str):
+        self.baseline = fingerprint(baseline_text)
+        self.baseline_errors = {match.text.lower() for match in find_errors(baseline_text)}
+
+    def compare(self, text: str, payload: Optional[str] = None) -> Comparison:
+        errors = [match for match in find_errors(text) if match.text.lower() not in self.baseline_errors]
+        response = fingerprint(text, payload)
+        return Comparison(round(similarity(self.baseline, response), 3), response.length - self.baseline.length, errors)
@@ -0,0 +1,155 @@
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Union
+
+# Finding severities, lowest to highest
+INFO = 'info'
+LOW = 'low'
+MEDIUM = 'medium'
+HIGH = 'high'
+ERROR = 'error'
+
+
+@dataclass(slots=True)
+class PortResult:
+    """State and fingerprint of a single scanned port"""
+    port: int
+    state: str
+    service: str = 'unknown'
+    product: str = ''
+    version: str = ''
+    protocol: str = 'tcp'
+
+    @property
+    def version_info(self) -> str:
+        return f"{self.product} {self.version}".strip()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == 'open'
+
+
+@dataclass(slots=True)
+class HostResult:
+    """A scanned host and its ports"""
+    target: str
+    ip: Optional[str] = None
+    ports: List[PortResult] = field(default_factory=list)
+
+    def open_ports(self) -> List[PortResult]:
+        return [port for port in self.ports if port.is_open]
+
+
+@dataclass(slots=True)
+class Finding:
+    """Something a check observed, e.g. a reflected payload or an SQL error"""
+    title: str
+    severity: str = INFO
+    detail: str = ''
+    payload: Optional[str] = None
+    location: Optional[str] = None  # Parameter, input field or URL tested
+    port: Optional[int] = None
+
+
+@dataclass(slots=True)
+class AuthAttempt:
+    """A single credential check against an SSH/FTP service"""
+    service: str
+    username: str
+    password: str
+    success: bool
+    message: str
+    port: Optional[int] = None
+
+
+def connection_stats(per_connection: List[int], passwords: int) -> Dict[str, float]:
+    """Summary of an auth session: attempts made on each connection, passwords tried"""
+    handshakes = len(per_connection)
+    return {
+        'attempts': passwords,
+        'handshakes': handshakes,
+        'attempts_per_connection': round(sum(per_connection) / handshakes, 2) if handshakes else 0.0,
+        # Against one connection per password
+        'handshakes_saved': max(0, passwords - handshakes)
+    }
+
+
+Record = Union[PortResult, HostResult, Finding, AuthAttempt, 'ScanReport', str]
+
+
+@dataclass(slots=True)
+class ScanReport:
+    """Structured result of one scan; rendered to text only for display"""
+    scan_type: str
+    target: str
+    hosts: List[HostResult] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)
+    attempts: List[AuthAttempt] = field(default_factory=list)
+    children: List['ScanReport'] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    phase: Optional[str] = None
+    error: Optional[str] = None
+
+    def add(self, record: Record) -> Record:
+        """File a record under the matching list and return it"""
+        if isinstance(record, Finding):
+            self.findings.append(record)
+        elif isinstance(record, HostResult):
+            self.hosts.append(record)
+        elif isinstance(record, AuthAttempt):
+            self.attempts.append(record)
+        elif isinstance(record, ScanReport):
+            self.children.append(record)
+        elif isinstance(record, str):
+            self.notes.append(record)
+        else:
+            raise TypeError(f"Unsupported record type: {type(record).__name__}")
+        return record
+
+    def fail(self, error: str) -> 'ScanReport':
+        self.error = error
+        return self
+
+    @property
+    def successful_attempts(self) -> List[AuthAttempt]:
+        return [attempt for attempt in self.attempts if attempt.success]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScanReport':
+        """Rebuild a report from to_dict() output, e.g. one loaded from the store"""
+        return cls(
+            scan_type=data['scan_type'],
+            target=data['target'],
+            hosts=[
+                HostResult(host['target'], host.get('ip'), [PortResult(**port) for port in host.get('ports', [])])
+                for host in data.get('hosts', [])
+            ],
+            findings=[Finding(**finding) for finding in data.get('findings', [])],
+            attempts=[AuthAttempt(**attempt) for attempt in data.get('attempts', [])],
+            children=[cls.from_dict(child) for child in data.get('children', [])],
+            notes=list(data.get('notes', [])),
+            meta=dict(data.get('meta', {})),
+            phase=data.get('phase'),
+            error=data.get('error')
+        )
+
+
+EVENT_TYPES = (
+    (HostResult, 'host'),
+    (Finding, 'finding'),
+    (AuthAttempt, 'attempt'),
+    (ScanReport, 'report'),
+    (str, 'note'),
+)
+
+
+def record_to_event(record: Record) -> Dict[str, Any]:
+    """Wrap a yielded record as a JSON-serialisable {'type', 'data'} event"""
+    for record_type, name in EVENT_TYPES:
+        if isinstance(record, record_type):
+            data = record if isinstance(record, str) else asdict(record)
+            return {'type': name, 'data': data}
+    raise TypeError(f"Unsupported record type: {type(record).__name__}")
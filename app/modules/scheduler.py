@@ -0,0 +1,98 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class PhaseScheduler:
+    """Runs named phases once their dependencies have finished.
+
+    Each phase is a factory returning a list of independent tasks; the
+    factory is only called when every phase it depends on is complete, so
+    it can use their results (e.g. services found during discovery). Tasks
+    of all ready phases share one pool of max_workers threads. Results are
+    returned per phase in task order; a task that raised is represented by
+    its exception. on_result, if given, is called with (phase, result) as
+    soon as each task finishes, for callers that stream results. Once the
+    stop event passed to run() is set, tasks that have not started are
+    skipped and no further phases start.
+    """
+
+    def __init__(self, max_workers: int = 4,
+                 on_progress: Optional[Callable[[int, int], None]] = None,
+                 on_result: Optional[Callable[[str, Any], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max(1, max_workers)
+        self.on_progress = on_progress
+        self.on_result = on_result
+        self._phases: Dict[str, Dict[str, Any]] = {}
+
+    def add_phase(self, name: str, factory: Callable[[], List[Callable[[], Any]]],
+                  depends_on: Sequence[str] = ()) -> None:
+        missing = [dep for dep in depends_on if dep not in self._phases]
+        if missing:
+            raise ValueError(f"Phase {name} depends on unknown phase(s): {', '.join(missing)}")
+        self._phases[name] = {'factory': factory, 'depends_on': tuple(depends_on)}
+
+    def _run_task(self, task: Callable[[], Any], stop: threading.Event) -> Any:
+        if stop.is_set():
+            return None
+        try:
+            return task()
+        except Exception as e:
+            self.logger.error(f"Scheduled task failed: {str(e)}")
+            return e
+
+    def run(self, stop: Optional[threading.Event] = None) -> Dict[str, List[Any]]:
+        stop = stop or threading.Event()
+        results: Dict[str, List[Any]] = {}
+        remaining: Dict[str, int] = {}
+        pending = {}
+        done_tasks = 0
+
+        def total_tasks() -> int:
+            # Phases not expanded yet count as one unit of work
+            expanded = sum(len(r) for r in results.values())
+            return expanded + sum(1 for name in self._phases if name not in results)
+
+        def start_ready_phases(executor) -> None:
+            for name, phase in self._phases.items():
+                if stop.is_set():
+                    return
+                if name in results:
+                    continue
+                if any(remaining.get(dep, 1) for dep in phase['depends_on']):
+                    continue
+                tasks = phase['factory']()
+                results[name] = [None] * len(tasks)
+                remaining[name] = len(tasks)
+                for index, task in enumerate(tasks):
+                    # Copy the context so tasks keep the job's event room
+                    context = contextvars.copy_context()
+                    future = executor.submit(context.run, self._run_task, task, stop)
+                    pending[future] = (name, index)
+                if not tasks:
+                    start_ready_phases(executor)
+                    return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='chain-phase') as executor:
+            start_ready_phases(executor)
+            while pending:
+                if stop.is_set():
+                    # Tasks already running finish on their own; queued ones return at once
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, index = pending.pop(future)
+                    results[name][index] = future.result()
+                    if self.on_result:
+                        self.on_result(name, results[name][index])
+                    remaining[name] -= 1
+                    done_tasks += 1
+                    if remaining[name] == 0:
+                        start_ready_phases(executor)
+                if self.on_progress:
+                    self.on_progress(done_tasks, total_tasks())
+
+        return results
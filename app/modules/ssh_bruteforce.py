@@ -1,97 +1,216 @@
 import paramiko
 import socket
 import logging
-from typing import List, Tuple
-from app import socketio
-import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from app.modules.corpus import corpus_registry
+from app.modules.credential_audit import AuditJob, credential_auditor
+from app.modules.events import emit_event, LogEmitter
+from app.modules.health import HostUnreachable, host_health
+from app.modules.results import ScanReport, AuthAttempt, connection_stats
 
-class SSHBruteForceSimulator:
-    def __init__(self):
+
+def split_target(target: str, default_port: int = 22) -> Tuple[str, int]:
+    """'host' or 'host:port' as (host, port)"""
+    host, sep, port = target.rpartition(':')
+    if sep and port.isdigit() and ':' not in host:
+        return host, int(port)
+    return target, default_port
+
+
+class SSHAuthSession:
+    """One SSH transport on which successive passwords are tried.
+
+    The TCP connect and key exchange are done once, then passwords are
+    tried until the server drops the session (sshd allows MaxAuthTries,
+    6 by default, per connection). The next attempt reconnects.
+    """
+
+    def __init__(self, hostname: str, port: int = 22, timeout: float = 3):
         self.logger = logging.getLogger(__name__)
-        # Educational sample of weak passwords
-        self.sample_passwords = [
-            "password", "123456", "admin",
-            "root", "qwerty", "letmein"
-        ]
-        
-    def emit_log(self, message):
-        """Emit log message to connected clients"""
+        self.hostname = hostname
+        self.port = port
+        self.timeout = timeout
+        self.transport: Optional[paramiko.Transport] = None
+        self.per_connection: List[int] = []  # Attempts made on each connection
+        self.passwords_tried = 0
+
+    def _connect(self) -> None:
+        with host_health.guard(self.hostname, self.port):
+            sock = socket.create_connection((self.hostname, self.port), timeout=self.timeout)
+        transport = paramiko.Transport(sock)
+        transport.banner_timeout = self.timeout
+        transport.auth_timeout = self.timeout
         try:
-            socketio.emit('log_message', {'message': message})
-        except Exception as e:
-            self.logger.error(f"Error emitting log: {str(e)}")
+            transport.start_client(timeout=self.timeout)
+        except Exception:
+            transport.close()
+            raise
+        self.transport = transport
+        self.per_connection.append(0)
+
+    def try_password(self, username: str, password: str) -> Tuple[bool, str]:
+        """Try one password, reconnecting first if the server closed the session.
+
+        HostUnreachable is raised once the host's circuit is open.
+        """
+        self.passwords_tried += 1
+        for retry in range(2):
+            if self.transport is None or not self.transport.is_active():
+                self.close()
+                try:
+                    self._connect()
+                except HostUnreachable:
+                    raise
+                except (socket.timeout, paramiko.SSHException, EOFError, OSError) as e:
+                    return False, f"Connection error: {str(e)}"
+            try:
+                self.transport.auth_password(username, password)
+            except paramiko.BadAuthenticationType as e:
+                self.per_connection[-1] += 1
+                return False, f"Password authentication not offered (allowed: {', '.join(e.allowed_types)})"
+            except paramiko.AuthenticationException:
+                self.per_connection[-1] += 1
+                if self.transport.is_active() or retry:
+                    return False, "Authentication failed"
+                # The server closed the session instead of answering, as sshd does
+                # at MaxAuthTries; the password may not have been checked
+                self.close()
+                continue
+            except (socket.timeout, paramiko.SSHException, EOFError, OSError) as e:
+                # A session dropped between attempts is retried once on a new connection
+                reused = self.per_connection[-1] > 0
+                self.close()
+                if retry == 0 and reused:
+                    continue
+                return False, f"Connection error: {str(e)}"
+            self.per_connection[-1] += 1
+            # An authenticated session cannot try further passwords
+            self.close()
+            return True, "Authentication successful"
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    def stats(self) -> Dict[str, float]:
+        return connection_stats(self.per_connection, self.passwords_tried)
+
+
+class SSHBruteForceSimulator(LogEmitter):
+    def __init__(self, reuse_connection: bool = True):
+        self.logger = logging.getLogger(__name__)
+        # Try successive passwords on one transport instead of one connection each
+        self.reuse_connection = reuse_connection
+        # Educational sample of weak passwords, streamed from the corpus
+        self.sample_passwords = corpus_registry.view('ssh_passwords')
         
     def test_ssh_auth(self, hostname: str, username: str, password: str) -> Tuple[bool, str]:
         """Test a single SSH authentication attempt"""
         client = paramiko.SSHClient()
         client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        hostname, port = split_target(hostname)
         
         try:
             self.emit_log(f"Attempting login with username: {username}")
-            client.connect(
-                hostname=hostname,
-                username=username,
-                password=password,
-                timeout=3,
-                banner_timeout=3,
-                auth_timeout=3
-            )
+            with host_health.guard(hostname, port):
+                client.connect(
+                    hostname=hostname,
+                    port=port,
+                    username=username,
+                    password=password,
+                    timeout=3,
+                    banner_timeout=3,
+                    auth_timeout=3
+                )
             return True, "Authentication successful"
+        except HostUnreachable:
+            raise
         except paramiko.AuthenticationException:
             return False, "Authentication failed"
-        except (socket.timeout, paramiko.SSHException) as e:
+        except (socket.timeout, paramiko.SSHException, OSError) as e:
             return False, f"Connection error: {str(e)}"
         finally:
             client.close()
             
-    def simulate_bruteforce(self, target: str, username: str, custom_passwords: List[str] = None) -> str:
+    def audit_job(self, target: str, username: str, passwords: Iterable[str],
+                  spacing: Optional[float] = None) -> AuditJob:
+        """The passwords to try for username on target, for the credential auditor"""
+        host, port = split_target(target)
+        session = SSHAuthSession(host, port) if self.reuse_connection else None
+
+        def check(username: str, password: str) -> Tuple[bool, str]:
+            self.emit_log(f"Testing password: {password}")
+            if session is not None:
+                return session.try_password(username, password)
+            return self.test_ssh_auth(target, username, password)
+
+        return AuditJob(host, 'ssh', port, ((username, password) for password in passwords), check, spacing,
+                        close=session.close if session else None, stats=session.stats if session else None)
+
+    def simulate_bruteforce(self, target: str, username: str, custom_passwords: List[str] = None,
+                            delay: Optional[float] = None) -> ScanReport:
         """Simulate SSH brute force attempts for educational purposes"""
+        report = ScanReport('ssh_brute', target, meta={'username': username})
+        for record in self.iter_bruteforce(report, target, username, custom_passwords, delay):
+            report.add(record)
+        return report
+
+    def iter_bruteforce(self, report: ScanReport, target: str, username: str,
+                        custom_passwords: List[str] = None, delay: Optional[float] = None) -> Iterator[AuthAttempt]:
+        """Yield each authentication attempt as soon as it completes.
+
+        Attempts are paced by the credential auditor's per-host limits;
+        delay overrides its spacing between attempts.
+        """
         self.emit_log(f"Starting SSH security test on {target}")
         
-        results = [
-            f"SSH Security Test for {target}",
-            "=" * 50,
-            f"Testing username: {username}",
-            "-" * 50,
-            "\nEducational Notes:",
-            "- Strong passwords should be long and complex",
-            "- Use SSH keys instead of passwords when possible",
-            "- Implement fail2ban or similar tools",
-            "- Monitor auth.log for suspicious attempts\n"
-        ]
-        
         # Use either custom passwords or sample set
         passwords = custom_passwords if custom_passwords else self.sample_passwords
+        job = self.audit_job(target, username, passwords, delay)
+        
+        try:
+            for _, attempt in credential_auditor.run([job]):
+                if attempt is None:
+                    continue
+                yield attempt
+                if attempt.success:
+                    self.emit_log("! Warning: Weak password detected!")
+                    
+            self.emit_log("SSH testing completed")
+            emit_event('scan_complete', {'message': 'SSH Security testing completed'})
+            
+        except Exception as e:
+            self.logger.error(f"SSH testing error: {str(e)}")
+            error_msg = f"Error during SSH testing: {str(e)}"
+            self.emit_log(error_msg)
+            report.fail(error_msg)
+        finally:
+            report.meta.update(job.report_meta())
+
+    def iter_batch(self, report: ScanReport, targets: List[str], username: str,
+                   custom_passwords: List[str] = None, delay: Optional[float] = None) -> Iterator[ScanReport]:
+        """Test every target at once, yielding each host's report when its attempts are done"""
+        self.emit_log(f"Starting SSH security test on {len(targets)} hosts")
+        passwords = custom_passwords if custom_passwords else self.sample_passwords
+        report.meta.update(username=username, targets=len(targets))
+        jobs = {self.audit_job(target, username, passwords, delay): target for target in targets}
+        children = {job: ScanReport('ssh_brute', target, meta={'username': username}) for job, target in jobs.items()}
         
         try:
-            for password in passwords[:5]:  # Limit attempts for demonstration
-                self.emit_log(f"Testing password: {password}")
-                success, message = self.test_ssh_auth(target, username, password)
-                
-                results.extend([
-                    f"Testing password: {password}",
-                    f"Result: {message}"
-                ])
-                
-                if success:
-                    msg = "\n! Warning: Weak password detected!"
-                    self.emit_log(msg)
-                    results.extend([
-                        msg,
-                        "Recommendation: Change password immediately"
-                    ])
-                    break
-                
-                # Add delay between attempts
-                time.sleep(1)
+            for job, attempt in credential_auditor.run(jobs):
+                child = children[job]
+                if attempt is None:
+                    child.meta.update(job.report_meta())
+                    yield child
+                elif child.add(attempt).success:
+                    self.emit_log(f"! Warning: Weak password detected on {child.target}!")
                     
             self.emit_log("SSH testing completed")
-            socketio.emit('scan_complete', {'message': 'SSH Security testing completed'})
-            results.append("\nReminder: Only test on authorized systems!")
-            return "\n".join(results)
+            emit_event('scan_complete', {'message': 'SSH Security testing completed'})
             
         except Exception as e:
             self.logger.error(f"SSH testing error: {str(e)}")
             error_msg = f"Error during SSH testing: {str(e)}"
             self.emit_log(error_msg)
-            return error_msg
\ No newline at end of file
+            report.fail(error_msg)
@@ -2,9 +2,9 @@ import logging
 import random
 import time
 from typing import Dict
-from app import socketio
+from app.modules.events import LogEmitter
 
-class StealthScanner:
+class StealthScanner(LogEmitter):
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.delay_between_requests = 1.0  # Default delay in seconds
@@ -12,13 +12,6 @@ class StealthScanner:
         self.current_proxy = None
         self.max_retries = 3
         
-    def emit_log(self, message):
-        """Emit log message to connected clients"""
-        try:
-            socketio.emit('log_message', {'message': message})
-        except Exception as e:
-            self.logger.error(f"Error emitting log: {str(e)}")
-            
     def set_scan_delay(self, min_delay: float, max_delay: float):
         """Set random delay between requests"""
         self.emit_log(f"Setting scan delay range: {min_delay}-{max_delay}s")
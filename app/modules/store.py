@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.modules.results import ScanReport
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    scan_type TEXT NOT NULL,
+    target TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    started_at REAL,
+    finished_at REAL NOT NULL,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scans_target ON scans (target, finished_at);
+CREATE INDEX IF NOT EXISTS idx_scans_type ON scans (scan_type, finished_at);
+CREATE INDEX IF NOT EXISTS idx_scans_finished ON scans (finished_at);
+CREATE INDEX IF NOT EXISTS idx_scans_job ON scans (job_id);
+
+CREATE TABLE IF NOT EXISTS ports (
+    scan_id INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    target TEXT NOT NULL,
+    ip TEXT,
+    port INTEGER NOT NULL,
+    protocol TEXT NOT NULL,
+    state TEXT NOT NULL,
+    service TEXT,
+    product TEXT,
+    version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ports_scan ON ports (scan_id);
+CREATE INDEX IF NOT EXISTS idx_ports_port ON ports (port, service);
+CREATE INDEX IF NOT EXISTS idx_ports_service ON ports (service);
+CREATE INDEX IF NOT EXISTS idx_ports_target ON ports (target);
+
+CREATE TABLE IF NOT EXISTS findings (
+    scan_id INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    detail TEXT,
+    payload TEXT,
+    location TEXT,
+    port INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_findings_scan ON findings (scan_id);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings (severity);
+"""
+
+SCAN_COLUMNS = "id, job_id, scan_type, target, status, error, started_at, finished_at"
+
+
+def _walk(report: ScanReport) -> Iterator[ScanReport]:
+    """The report and every nested child report (e.g. attack chain phases)"""
+    yield report
+    for child in report.children:
+        yield from _walk(child)
+
+
+class ScanStore:
+    """SQLite-backed history of finished scans.
+
+    Each scan is kept as its full JSON report plus one row per port and
+    finding, so history, port and service queries are answered from
+    indexes without decoding reports. The database runs in WAL mode so
+    dashboard reads never wait on a scan being written. Each thread uses
+    its own connection.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._initialized = False
+
+    def init_app(self, app):
+        """Read the database path from the Flask config"""
+        path = app.config.get('SCAN_DB_PATH') or os.path.join(app.instance_path, 'scans.db')
+        if path != self.path:
+            self.path = path
+            self._initialized = False
+            self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path is None:
+            raise RuntimeError("Scan store has no database path configured")
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._schema_lock:
+                if not self._initialized:
+                    conn.executescript(SCHEMA)
+                    self._initialized = True
+        return conn
+
+    def save(self, report: ScanReport, job_id: Optional[str] = None, status: str = 'finished',
+             started_at: Optional[float] = None, finished_at: Optional[float] = None) -> int:
+        """Persist a report and return its scan id"""
+        finished_at = finished_at or time.time()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO scans (job_id, scan_type, target, status, error, started_at, finished_at, report) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, report.scan_type, report.target, status, report.error,
+                 started_at, finished_at, json.dumps(report.to_dict()))
+            )
+            scan_id = cursor.lastrowid
+            ports, findings = [], []
+            for part in _walk(report):
+                for host in part.hosts:
+                    ports.extend(
+                        (scan_id, host.target, host.ip, port.port, port.protocol, port.state,
+                         port.service, port.product, port.version)
+                        for port in host.ports
+                    )
+                findings.extend(
+                    (scan_id, finding.title, finding.severity, finding.detail,
+                     finding.payload, finding.location, finding.port)
+                    for finding in part.findings
+                )
+            conn.executemany("INSERT INTO ports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", ports)
+            conn.executemany("INSERT INTO findings VALUES (?, ?, ?, ?, ?, ?, ?)", findings)
+        return scan_id
+
+    def save_job(self, job) -> None:
+        """Job queue listener: store every job that produced a report"""
+        if not isinstance(job.result, ScanReport):
+            return
+        try:
+            self.save(job.result, job.id, job.status, job.started_at, job.finished_at)
+        except sqlite3.Error as e:
+            self.logger.error(f"Could not store job {job.id}: {str(e)}")
+
+    def _where(self, filters: List[Tuple[str, Any]]) -> Tuple[str, List[Any]]:
+        clauses = [clause for clause, value in filters if value is not None]
+        params = [value for _, value in filters if value is not None]
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def history(self, target: Optional[str] = None, scan_type: Optional[str] = None,
+                since: Optional[float] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Stored scans, newest first, without their reports"""
+        where, params = self._where([
+            ("target = ?", target), ("scan_type = ?", scan_type), ("finished_at >= ?", since)
+        ])
+        rows = self._connect().execute(
+            f"SELECT {SCAN_COLUMNS} FROM scans{where} ORDER BY finished_at DESC LIMIT ?",
+            params + [limit]
+        )
+        return [dict(row) for row in rows]
+
+    def get(self, scan_id: int) -> Optional[ScanReport]:
+        row = self._connect().execute("SELECT report FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        return ScanReport.from_dict(json.loads(row['report'])) if row else None
+
+    def latest(self, target: str, scan_type: Optional[str] = None) -> Optional[Tuple[Dict[str, Any], ScanReport]]:
+        """The most recent stored scan of target as (scan row, report)"""
+        where, params = self._where([("target = ?", target), ("scan_type = ?", scan_type)])
+        row = self._connect().execute(
+            f"SELECT {SCAN_COLUMNS}, report FROM scans{where} ORDER BY finished_at DESC LIMIT 1", params
+        ).fetchone()
+        if row is None:
+            return None
+        scan = dict(row)
+        return scan, ScanReport.from_dict(json.loads(scan.pop('report')))
+
+    def ports(self, port: Optional[int] = None, service: Optional[str] = None, target: Optional[str] = None,
+              state: Optional[str] = 'open', limit: int = 500) -> List[Dict[str, Any]]:
+        """Stored port observations, newest scans first"""
+        where, params = self._where([
+            ("p.port = ?", port), ("p.service = ?", service), ("p.target = ?", target), ("p.state = ?", state)
+        ])
+        rows = self._connect().execute(
+            "SELECT p.*, s.scan_type, s.finished_at FROM ports p JOIN scans s ON s.id = p.scan_id"
+            f"{where} ORDER BY s.finished_at DESC LIMIT ?",
+            params + [limit]
+        )
+        return [dict(row) for row in rows]
+
+    def findings(self, target: Optional[str] = None, severity: Optional[str] = None,
+                 limit: int = 500) -> List[Dict[str, Any]]:
+        """Stored findings, newest scans first"""
+        where, params = self._where([("s.target = ?", target), ("f.severity = ?", severity)])
+        rows = self._connect().execute(
+            "SELECT f.*, s.target, s.scan_type, s.finished_at FROM findings f JOIN scans s ON s.id = f.scan_id"
+            f"{where} ORDER BY s.finished_at DESC LIMIT ?",
+            params + [limit]
+        )
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+scan_store = ScanStore()
@@ -0,0 +1,107 @@
+import ipaddress
+import re
+from typing import Iterable, List
+from urllib.parse import urlparse
+
+# Upper bound on hosts a single batch may expand to (a /20 is 4094 hosts)
+MAX_TARGETS = 4096
+
+_SEPARATORS = re.compile(r'[\s,;]+')
+_SHORT_RANGE = re.compile(r'^(\d{1,3}\.\d{1,3}\.\d{1,3}\.)(\d{1,3})-(\d{1,3})$')
+
+
+def is_ip(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+
+def split_entries(spec: str) -> List[str]:
+    """Split a target spec on commas, semicolons and whitespace, dropping # comments"""
+    lines = (line.split('#', 1)[0] for line in spec.splitlines())
+    return [entry for line in lines for entry in _SEPARATORS.split(line) if entry]
+
+
+def _is_network(entry: str) -> bool:
+    if '/' not in entry or entry.startswith(('http://', 'https://')):
+        return False
+    try:
+        ipaddress.ip_network(entry, strict=False)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_range(entry: str) -> bool:
+    if _SHORT_RANGE.match(entry):
+        return True
+    start, _, end = entry.partition('-')
+    return bool(end) and is_ip(start) and is_ip(end)
+
+
+def is_batch(spec: str) -> bool:
+    """True if spec names more than one host (a list, CIDR block or range)"""
+    entries = split_entries(spec)
+    return len(entries) > 1 or any(_is_network(entry) or _is_range(entry) for entry in entries)
+
+
+def _expand_range(entry: str) -> List[str]:
+    short = _SHORT_RANGE.match(entry)
+    if short:
+        prefix, first, last = short.groups()
+        start, end = ipaddress.ip_address(prefix + first), ipaddress.ip_address(prefix + last)
+    else:
+        start, end = (ipaddress.ip_address(part) for part in entry.split('-', 1))
+    if start.version != end.version or int(end) < int(start):
+        raise ValueError(f"Invalid address range: {entry}")
+    return [str(ipaddress.ip_address(value)) for value in range(int(start), int(end) + 1)]
+
+
+def _host_of(entry: str) -> str:
+    """Reduce a URL or host:port to the bare host name"""
+    if entry.startswith(('http://', 'https://')):
+        return urlparse(entry).hostname or ''
+    if entry.count(':') == 1:
+        return entry.split(':', 1)[0]
+    return entry
+
+
+def parse_targets(spec: str, max_targets: int = MAX_TARGETS) -> List[str]:
+    """Expand a target spec into a de-duplicated list of hosts.
+
+    Accepts host names, IPs, URLs, CIDR blocks (10.0.0.0/24) and ranges
+    (10.0.0.1-10.0.0.20 or 10.0.0.1-20), one or more per line or
+    separated by commas. Raises ValueError beyond max_targets hosts.
+    """
+    targets = {}
+    for entry in split_entries(spec.strip().lower()):
+        if _is_network(entry):
+            network = ipaddress.ip_network(entry, strict=False)
+            if network.num_addresses > max_targets:
+                raise ValueError(f"{entry} is larger than the {max_targets} host limit")
+            hosts = [str(host) for host in network.hosts()]
+        elif _is_range(entry):
+            hosts = _expand_range(entry)
+        else:
+            hosts = [_host_of(entry)]
+        for host in hosts:
+            if host:
+                targets.setdefault(host, None)
+        if len(targets) > max_targets:
+            raise ValueError(f"Target list exceeds the {max_targets} host limit")
+    return list(targets)
+
+
+def load_target_file(path: str, max_targets: int = MAX_TARGETS) -> List[str]:
+    """Read a host file (one entry per line, # comments allowed)"""
+    with open(path, encoding='utf-8') as f:
+        return parse_targets(f.read(), max_targets)
+
+
+def shard(targets: Iterable[str], size: int) -> List[List[str]]:
+    """Split targets into consecutive groups of at most size hosts"""
+    targets = list(targets)
+    size = max(1, size)
+    return [targets[i:i + size] for i in range(0, len(targets), size)]
@@ -0,0 +1,111 @@
+import logging
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+import requests
+
+
+@dataclass(slots=True)
+class TimingBaseline:
+    """Response time distribution of the page with a harmless parameter value"""
+    mean: float
+    stdev: float
+    samples: List[float] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class TimingVerdict:
+    """Outcome of the sequential test for one time-based payload"""
+    payload: str
+    vulnerable: bool
+    confidence: float
+    requests: int
+    elapsed: float
+    decided: bool  # False if max_samples ran out before a boundary was crossed
+    samples: List[float] = field(default_factory=list)
+
+
+class TimingEngine:
+    """Time-based blind SQLi detection with Wald's sequential probability ratio test.
+
+    The baseline latency is sampled first. The injected delay is then
+    calibrated to sit several standard deviations above that noise
+    (between min_delay and max_delay), and each payload is sent until the
+    log-likelihood ratio of "response delayed by the injected amount"
+    against "baseline latency" crosses the bound set by alpha and beta.
+    On a clean target this usually takes one request per payload and a
+    confirmed delay takes two; no request waits longer than the delay plus
+    a small margin.
+    """
+
+    def __init__(self, http_client, baseline_samples: int = 5, max_samples: int = 6,
+                 min_delay: float = 1.0, max_delay: float = 5.0, alpha: float = 0.01, beta: float = 0.01,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.logger = logging.getLogger(__name__)
+        self.http = http_client
+        self.baseline_samples = max(2, baseline_samples)
+        self.max_samples = max(1, max_samples)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.upper = math.log((1 - beta) / alpha)   # Accept "delayed"
+        self.lower = math.log(beta / (1 - alpha))   # Accept "not delayed"
+        self.clock = clock
+
+    def _timed_get(self, url: str, timeout: float) -> float:
+        """Elapsed seconds for one request; a read timeout counts as the full timeout.
+
+        Any other request error is raised, since it says nothing about latency.
+        """
+        start = self.clock()
+        try:
+            self.http.get(url, timeout=timeout)
+        except requests.exceptions.Timeout:
+            pass
+        return self.clock() - start
+
+    def measure_baseline(self, url: str, timeout: Optional[float] = None) -> TimingBaseline:
+        samples = [self._timed_get(url, timeout or self.max_delay * 2) for _ in range(self.baseline_samples)]
+        mean = statistics.fmean(samples)
+        # Floor the spread so a very quiet link does not make every jitter significant
+        stdev = max(statistics.stdev(samples), 0.05, 0.1 * mean)
+        return TimingBaseline(mean, stdev, samples)
+
+    def calibrate_delay(self, baseline: TimingBaseline) -> int:
+        """Whole-second delay well clear of the baseline noise (SLEEP takes integers)"""
+        return int(min(self.max_delay, max(self.min_delay, math.ceil(6 * baseline.stdev))))
+
+    def evaluate(self, url_for: Callable[[str], str], payload_template: str,
+                 baseline: TimingBaseline, delay: int) -> TimingVerdict:
+        """Send payload_template (with {delay} filled in) until the SPRT decides"""
+        payload = payload_template.format(delay=delay)
+        url = url_for(payload)
+        timeout = baseline.mean + delay + 4 * baseline.stdev + 1
+        variance = baseline.stdev ** 2
+        llr = 0.0
+        samples = []
+
+        while len(samples) < self.max_samples:
+            elapsed = self._timed_get(url, timeout)
+            samples.append(elapsed)
+            step = (delay / variance) * (elapsed - baseline.mean - delay / 2)
+            # Cap the evidence per sample so a single network spike can never
+            # confirm a delay on its own; a prompt response may still clear it
+            llr += max(min(step, self.upper / 2), self.lower)
+            if llr >= self.upper or llr <= self.lower:
+                break
+
+        decided = llr >= self.upper or llr <= self.lower
+        # Posterior probability of the delayed hypothesis with even priors
+        p_delayed = 1 / (1 + math.exp(-max(min(llr, 700), -700)))
+        vulnerable = llr >= self.upper
+        return TimingVerdict(
+            payload=payload,
+            vulnerable=vulnerable,
+            confidence=round(p_delayed if vulnerable else 1 - p_delayed, 4),
+            requests=len(samples),
+            elapsed=sum(samples),
+            decided=decided,
+            samples=samples
+        )
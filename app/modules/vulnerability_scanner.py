@@ -1,21 +1,46 @@
 import nmap
 from urllib.parse import urlparse
+import contextvars
 import socket
 import logging
-from app import socketio
-from flask_socketio import emit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.modules.events import emit_event, LogEmitter
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.modules.connect_scan import ConnectScanner, parse_ports
+from app.modules.results import ScanReport, HostResult, PortResult, Finding, Record
+from app.modules.targets import is_ip, shard
+from app.modules.registry import scanner_registry
+from app.modules.cache import resolver
 
-class VulnerabilityScanner:
-    def __init__(self):
-        self.scanner = nmap.PortScanner()
-        self.logger = logging.getLogger(__name__)
+class VulnerabilityScanner(LogEmitter):
+    # Educational notes shown for open services
+    SERVICE_NOTES = {
+        'ftp': "Check for anonymous FTP access",
+        'ssh': "Verify SSH version for CVEs",
+        'http': "Check for common web vulnerabilities",
+        'https': "Check for common web vulnerabilities"
+    }
     
-    def emit_log(self, message):
-        """Emit log message to connected clients"""
-        try:
-            socketio.emit('log_message', {'message': message})
-        except Exception as e:
-            self.logger.error(f"Error emitting log: {str(e)}")
+    PORTS = '21-25,80,443,8080,8443'
+    # Use TCP connect scan (-sT) instead of SYN scan (-sS)
+    # Also use version detection (-sV) but with light intensity (--version-intensity 2)
+    SCAN_ARGS = '-sT -sV --version-intensity 2 -Pn'
+    
+    # 'nmap' scans and fingerprints every port; 'connect' is the asyncio connect
+    # scan with banner grabbing; 'hybrid' runs nmap -sV only on the ports it found open
+    BACKENDS = ('nmap', 'connect', 'hybrid')
+    
+    def __init__(self, shard_size: int = 16, parallel_shards: int = 4, backend: str = 'nmap',
+                 connect_concurrency: int = 256, connect_timeout: float = 1.0):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown discovery backend: {backend}")
+        self.backend = backend
+        # Only the nmap backend needs the binary up front
+        self.scanner = scanner_registry.port_scanner() if backend == 'nmap' else None
+        self.connect_scanner = ConnectScanner(connect_concurrency, connect_timeout, banner_timeout=connect_timeout)
+        self.logger = logging.getLogger(__name__)
+        self.shard_size = max(1, shard_size)
+        self.parallel_shards = max(1, parallel_shards)
     
     def _get_ip_from_url(self, url):
         """Extract IP from URL or domain"""
@@ -25,7 +50,7 @@ class VulnerabilityScanner:
             # Remove port number if present
             domain = domain.split(':')[0]
             self.emit_log(f"Resolving hostname: {domain}")
-            ip = socket.gethostbyname(domain)
+            ip = resolver.resolve_one(domain)
             self.emit_log(f"Resolved to IP: {ip}")
             return ip
         except socket.gaierror as e:
@@ -33,90 +58,247 @@ class VulnerabilityScanner:
             self.emit_log(f"Failed to resolve hostname: {domain}")
             return None
 
-    def scan_target(self, target):
+    @staticmethod
+    def _nmap_ports(host_data: Dict) -> List[PortResult]:
+        return [
+            PortResult(
+                port=int(port),
+                state=data.get('state', 'unknown'),
+                service=data.get('name', 'unknown'),
+                product=data.get('product', ''),
+                version=data.get('version', '')
+            )
+            for port, data in host_data.get('tcp', {}).items()
+        ]
+
+    def _parse_host(self, target: str, target_ip: str, host_data: Dict) -> Tuple[HostResult, List[Finding]]:
+        """Turn nmap's data for one host into a HostResult and its service notes"""
+        return self._build_host(target, target_ip, self._nmap_ports(host_data))
+
+    def _build_host(self, target: str, target_ip: str, ports: List[PortResult]) -> Tuple[HostResult, List[Finding]]:
+        """The HostResult for ports found on one host, and its service notes"""
+        host = HostResult(target, target_ip)
+        notes = []
+        
+        if not ports:
+            self.emit_log(f"No open ports found on {target_ip}")
+        for port_result in ports:
+            host.ports.append(port_result)
+            self.emit_log(f"Found: {port_result.port} {port_result.state} "
+                          f"{port_result.service} {port_result.version_info}".rstrip())
+            
+            # Add educational security notes
+            note = self.SERVICE_NOTES.get(port_result.service)
+            if port_result.is_open and note:
+                self.emit_log(f"    ! {note}")
+                notes.append(Finding(note, detail=port_result.service, location=target_ip, port=port_result.port))
+        return host, notes
+
+    def scan_target(self, target) -> ScanReport:
         """Perform vulnerability scan on target"""
-        results = []
+        report = ScanReport('vuln_scan', target)
+        for record in self.iter_scan(report, target):
+            report.add(record)
+        return report
+
+    def iter_scan(self, report: ScanReport, target) -> Iterator[Record]:
+        """Scan target, yielding the host and its notes as they are produced.
+
+        Failures are recorded on report instead of being yielded.
+        """
         self.emit_log(f"Starting vulnerability scan on {target}")
         
         # Clean up target input
         target = target.strip().lower()
         if not target:
             self.emit_log("Error: No target specified")
-            return "Error: No target specified"
+            report.fail("Error: No target specified")
+            return
             
         # Extract IP from URL if needed
         if target.startswith(('http://', 'https://')):
             target_ip = self._get_ip_from_url(target)
             if not target_ip:
-                return f"Error: Could not resolve hostname '{target}'"
-            results.append(f"Resolved {target} to {target_ip}")
+                report.fail(f"Error: Could not resolve hostname '{target}'")
+                return
+            yield f"Resolved {target} to {target_ip}"
         else:
             target_ip = target
             
         try:
-            # Use TCP connect scan (-sT) instead of SYN scan (-sS)
-            # Also use version detection (-sV) but with light intensity (--version-intensity 2)
-            scan_args = '-sT -sV --version-intensity 2 -Pn'
+            if self.backend != 'nmap':
+                yield from self._iter_connect(report, {target_ip: target})
+                self.emit_log("Scan completed successfully")
+                emit_event('scan_complete', {'message': 'Vulnerability scan completed'})
+                return
+            
             self.emit_log("Initializing port scanner...")
             
             # Start the scan
             self.emit_log(f"Scanning ports on {target_ip}...")
-            scan_results = self.scanner.scan(target_ip, '21-25,80,443,8080,8443', arguments=scan_args)
+            scan_results = self.scanner.scan(target_ip, self.PORTS, arguments=self._scan_args(target_ip))
             
             if not scan_results.get('scan'):
                 msg = f"No results: Host {target_ip} appears to be down or blocking our scans"
                 self.emit_log(msg)
-                return msg
+                report.fail(msg)
+                return
                 
-            host_data = scan_results['scan'].get(target_ip, {})
-            
-            # Format results
-            results.append(f"\nScan report for {target} ({target_ip})")
-            results.append("=" * 50)
-            results.append("PORT     STATE  SERVICE    VERSION")
-            results.append("-" * 50)
-            
-            tcp_data = host_data.get('tcp', {})
-            if not tcp_data:
-                self.emit_log("No open ports found")
-                results.append("No open ports found")
-            else:
-                for port, data in tcp_data.items():
-                    state = data.get('state', 'unknown')
-                    service = data.get('name', 'unknown')
-                    version = data.get('version', '')
-                    product = data.get('product', '')
-                    version_info = f"{product} {version}".strip()
-                    
-                    port_result = f"{port:<8} {state:<6} {service:<10} {version_info}"
-                    self.emit_log(f"Found: {port_result}")
-                    results.append(port_result)
-                    
-                    # Add educational security notes
-                    if state == 'open':
-                        if service == 'ftp':
-                            note = "    ! Check for anonymous FTP access"
-                            self.emit_log(note)
-                            results.append(note)
-                        elif service == 'ssh':
-                            note = "    ! Verify SSH version for CVEs"
-                            self.emit_log(note)
-                            results.append(note)
-                        elif service in ['http', 'https']:
-                            note = "    ! Check for common web vulnerabilities"
-                            self.emit_log(note)
-                            results.append(note)
+            host, notes = self._parse_host(target, target_ip, scan_results['scan'].get(target_ip, {}))
+            yield host
+            yield from notes
             
             self.emit_log("Scan completed successfully")
-            socketio.emit('scan_complete', {'message': 'Vulnerability scan completed'})
-            return "\n".join(results)
+            emit_event('scan_complete', {'message': 'Vulnerability scan completed'})
             
         except nmap.PortScannerError as e:
             error_msg = f"Scan Error: {str(e)}"
             self.emit_log(error_msg)
-            return error_msg
+            report.fail(error_msg)
         except Exception as e:
             self.logger.error(f"Unexpected error during scan: {str(e)}")
             error_msg = f"Error: Scan failed unexpectedly. Check target and try again."
             self.emit_log(error_msg)
-            return error_msg
\ No newline at end of file
+            report.fail(error_msg)
+
+    def scan_batch(self, targets: List[str]) -> ScanReport:
+        """Scan many hosts and merge them into one report"""
+        report = ScanReport('vuln_scan', ', '.join(targets))
+        for record in self.iter_batch(report, targets):
+            report.add(record)
+        return report
+
+    def _scan_args(self, target_ip: str) -> str:
+        # nmap only scans IPv6 addresses when asked to with -6
+        return f"{self.SCAN_ARGS} -6" if ':' in target_ip else self.SCAN_ARGS
+
+    def _scan_shard(self, shard_ips: List[str], ports: Optional[str] = None) -> Dict:
+        # One PortScanner per shard: it keeps the last result on the instance
+        return scanner_registry.port_scanner().scan(' '.join(shard_ips), ports or self.PORTS,
+                                                    arguments=self._scan_args(shard_ips[0]))
+
+    def _shards(self, ips: List[str]) -> List[List[str]]:
+        # IPv4 and IPv6 hosts cannot share an nmap run
+        return (shard([ip for ip in ips if ':' not in ip], self.shard_size)
+                + shard([ip for ip in ips if ':' in ip], self.shard_size))
+
+    def _iter_connect(self, report: ScanReport, names: Dict[str, str]) -> Iterator[Record]:
+        """Connect-scan every host; in hybrid mode, then fingerprint the open ports with nmap"""
+        ports = parse_ports(self.PORTS)
+        report.meta.update(backend=self.backend, targets=len(names), pairs=len(names) * len(ports))
+        self.emit_log(f"Connect-scanning {len(names) * len(ports)} host:port pairs "
+                      f"({self.connect_scanner.concurrency} at a time)")
+        
+        found = {}  # IP -> open ports, for nmap to fingerprint
+        for target_ip, open_ports in self.connect_scanner.iter_hosts(list(names), ports):
+            if self.backend == 'hybrid' and open_ports:
+                found[target_ip] = open_ports
+                continue
+            host, notes = self._build_host(names[target_ip], target_ip, open_ports)
+            yield host
+            yield from notes
+        
+        if found:
+            yield from self._iter_fingerprint(report, names, found)
+
+    def _iter_fingerprint(self, report: ScanReport, names: Dict[str, str],
+                          found: Dict[str, List[PortResult]]) -> Iterator[Record]:
+        """Run nmap -sV on the open ports only; hosts with the same open ports share runs.
+
+        If nmap fails, the connect scan's banner results are kept.
+        """
+        groups: Dict[str, List[str]] = {}
+        for target_ip, open_ports in found.items():
+            groups.setdefault(','.join(str(port.port) for port in open_ports), []).append(target_ip)
+        runs = [(shard_ips, ports) for ports, ips in groups.items() for shard_ips in self._shards(ips)]
+        report.meta['fingerprint_runs'] = len(runs)
+        self.emit_log(f"Fingerprinting open ports of {len(found)} hosts in {len(runs)} nmap runs")
+        
+        workers = min(self.parallel_shards, len(runs))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='nmap-shard') as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._scan_shard, shard_ips, ports): shard_ips
+                for shard_ips, ports in runs
+            }
+            for future in as_completed(futures):
+                shard_ips = futures[future]
+                try:
+                    scanned = future.result().get('scan', {})
+                except Exception as e:
+                    self.logger.error(f"Version detection failed: {str(e)}")
+                    yield f"Version detection failed for {', '.join(shard_ips)}, keeping banner results: {str(e)}"
+                    scanned = {}
+                
+                for target_ip in shard_ips:
+                    merged = {port.port: port for port in found[target_ip]}
+                    for port in self._nmap_ports(scanned.get(target_ip, {})):
+                        banner = merged.get(port.port)
+                        if banner is not None:
+                            # nmap's answer wins, but not its blanks
+                            if port.service == 'unknown':
+                                port.service = banner.service
+                            if not port.product:
+                                port.product, port.version = banner.product, banner.version
+                        merged[port.port] = port
+                    host, notes = self._build_host(names[target_ip], target_ip,
+                                                   [merged[port] for port in sorted(merged)])
+                    yield host
+                    yield from notes
+
+    def iter_batch(self, report: ScanReport, targets: List[str]) -> Iterator[Record]:
+        """Scan targets in shards of shard_size hosts per nmap run.
+
+        Up to parallel_shards nmap runs execute at once; hosts are yielded
+        as soon as the shard containing them finishes. The connect and
+        hybrid backends scan every host in one asyncio pass instead.
+        """
+        self.emit_log(f"Starting batch vulnerability scan of {len(targets)} targets")
+        
+        names = {}  # IP -> target as given
+        for target in targets:
+            target_ip = target if is_ip(target) else self._get_ip_from_url(target)
+            if not target_ip:
+                yield f"Could not resolve hostname '{target}'"
+                continue
+            names.setdefault(target_ip, target)
+        if not names:
+            report.fail("Error: No scannable targets")
+            return
+        
+        if self.backend != 'nmap':
+            yield from self._iter_connect(report, names)
+            self.emit_log("Batch scan completed")
+            emit_event('scan_complete', {'message': 'Vulnerability scan completed'})
+            return
+        
+        shards = self._shards(list(names))
+        report.meta.update(targets=len(names), shards=len(shards))
+        self.emit_log(f"Scanning {len(names)} hosts in {len(shards)} nmap runs")
+        
+        workers = min(self.parallel_shards, len(shards))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='nmap-shard') as executor:
+            # Each shard gets its own context copy so its logs reach the job's room
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._scan_shard, shard_ips): shard_ips
+                for shard_ips in shards
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                shard_ips = futures[future]
+                try:
+                    scanned = future.result().get('scan', {})
+                except Exception as e:
+                    self.logger.error(f"Shard scan failed: {str(e)}")
+                    yield f"Scan Error for {', '.join(shard_ips)}: {str(e)}"
+                    continue
+                
+                for target_ip in shard_ips:
+                    if target_ip not in scanned:
+                        yield f"No results: Host {target_ip} appears to be down or blocking our scans"
+                        continue
+                    host, notes = self._parse_host(names[target_ip], target_ip, scanned[target_ip])
+                    yield host
+                    yield from notes
+                self.emit_log(f"Completed {done}/{len(shards)} scan batches")
+        
+        self.emit_log("Batch scan completed")
+        emit_event('scan_complete', {'message': 'Vulnerability scan completed'})
@@ -1,61 +1,89 @@
-import requests
-from bs4 import BeautifulSoup
 import logging
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
 from urllib.parse import urljoin
-from app import socketio
+from app.modules.events import emit_event, LogEmitter
+from app.modules.http_client import http_client as shared_http_client
+from app.modules.cache import baseline_cache
+from app.modules.corpus import corpus_registry
+from app.modules.health import HostUnreachable
+from app.modules.signatures import SignatureMatcher
+from app.modules.crawler import InjectionPoint
+from app.modules.page_parser import parse_page
+from app.modules.payload_engine import PayloadEngine
+from app.modules.request_template import RequestBuilder, RequestTemplate
+from app.modules.results import ScanReport, Finding, Record, HIGH, ERROR
 
-class XSSSimulator:
-    def __init__(self):
+class XSSSimulator(LogEmitter):
+    def __init__(self, http_client=None, mode='sequential', concurrency=5, crawler=None):
         self.logger = logging.getLogger(__name__)
-        self.payloads = [
-            "<script>alert('XSS')</script>",
-            "<img src=x onerror=alert('XSS')>",
-            "javascript:alert('XSS')",
-            "<svg onload=alert('XSS')>",
-            "'\"><script>alert('XSS')</script>"
-        ]
+        self.http = http_client or shared_http_client
+        self.engine = PayloadEngine(self.http, mode, concurrency)
+        self.crawler = crawler
+        self.payloads = corpus_registry.load('xss')
         
-    def emit_log(self, message):
-        """Emit log message to connected clients"""
-        try:
-            socketio.emit('log_message', {'message': message})
-        except Exception as e:
-            self.logger.error(f"Error emitting log: {str(e)}")
-            
     def find_inputs(self, html_content: str) -> List[Dict]:
         """Find potential XSS injection points"""
         inputs = []
-        soup = BeautifulSoup(html_content, 'html.parser')
         
         # Check forms and their inputs
-        for form in soup.find_all('form'):
-            self.emit_log(f"Found form: action={form.get('action', '')} method={form.get('method', 'get')}")
-            for input_field in form.find_all(['input', 'textarea']):
+        for form in parse_page(html_content).forms:
+            self.emit_log(f"Found form: action={form.action} method={form.method}")
+            for input_field in form.fields:
+                if input_field.tag == 'select':
+                    continue
                 input_info = {
                     'type': 'form',
-                    'method': form.get('method', 'get').lower(),
-                    'action': form.get('action', ''),
-                    'input_name': input_field.get('name', ''),
-                    'input_type': input_field.get('type', 'text')
+                    'method': form.method,
+                    'action': form.action,
+                    'input_name': input_field.name,
+                    'input_type': 'text' if input_field.tag == 'textarea' else input_field.type
                 }
                 self.emit_log(f"Found input field: {input_info['input_type']} named {input_info['input_name']}")
                 inputs.append(input_info)
                 
         return inputs
-        
-    def test_xss(self, target_url: str) -> str:
-        """Test for XSS vulnerabilities"""
-        results = [
-            f"Testing XSS Vulnerabilities on {target_url}",
-            "=" * 50,
-            "\nEducational Notes:",
-            "- XSS allows attackers to inject malicious scripts",
-            "- Always sanitize user input",
-            "- Use Content Security Policy (CSP)",
-            "- Encode special characters in output\n"
+
+    def point_inputs(self, points: List[InjectionPoint]) -> List[Dict]:
+        """One input entry per parameter of each crawled injection point"""
+        return [
+            {
+                'type': point.source,
+                'method': point.method,
+                'action': point.url,
+                'input_name': param,
+                'input_type': 'text',
+                'location': point.location(param),
+                'point': index
+            }
+            for index, point in enumerate(points)
+            for param in point.params
         ]
         
+    def _template_for(self, target_url: str, input_data: Dict,
+                      points: List[InjectionPoint]) -> Optional[RequestTemplate]:
+        """Request template injecting into one input, or None for unsupported methods"""
+        if 'point' in input_data:
+            return points[input_data['point']].template(input_data['input_name'])
+        if input_data['method'] == 'get':
+            return RequestBuilder(target_url).template('query', input_data['input_name'])
+        if input_data['method'] == 'post':
+            builder = RequestBuilder(urljoin(target_url, input_data['action']), 'POST', data={})
+            return builder.template('form', input_data['input_name'])
+        return None
+
+    def test_xss(self, target_url: str) -> ScanReport:
+        """Test for XSS vulnerabilities"""
+        report = ScanReport('xss', target_url)
+        for record in self.iter_xss(report, target_url):
+            report.add(record)
+        return report
+
+    def iter_xss(self, report: ScanReport, target_url: str) -> Iterator[Record]:
+        """Yield XSS findings as soon as each probe's response is analysed.
+
+        With a crawler the inputs of every discovered injection point are
+        tested, not just the forms on target_url.
+        """
         self.emit_log(f"Starting XSS tests on {target_url}")
         
         if not target_url.startswith(('http://', 'https://')):
@@ -63,67 +91,68 @@ class XSSSimulator:
             self.emit_log(f"Added HTTP scheme: {target_url}")
             
         try:
-            # Get initial page
-            self.emit_log("Fetching target page...")
-            response = requests.get(target_url, timeout=5)
-            inputs = self.find_inputs(response.text)
+            points = []
+            if self.crawler is not None:
+                crawl = self.crawler.crawl(target_url)
+                points = crawl.points
+                report.meta['crawl'] = crawl.summary()
+                inputs = self.point_inputs(points)
+            else:
+                # Get initial page
+                self.emit_log("Fetching target page...")
+                page = baseline_cache.fetch(target_url, self.http)
+                inputs = self.find_inputs(page.text)
+            report.meta.update({'url': target_url, 'inputs': inputs})
             
             if not inputs:
-                msg = "No input fields found to test"
-                self.emit_log(msg)
-                results.append(msg)
-                return "\n".join(results)
+                self.emit_log("No input fields found to test")
+                return
                 
             self.emit_log(f"Found {len(inputs)} potential injection points")
-            results.append(f"Found {len(inputs)} potential injection points")
             
-            for input_data in inputs:
-                results.extend([
-                    f"\nTesting {input_data['input_type']} input: {input_data['input_name']}",
-                    "-" * 40
-                ])
+            # Build every input x payload combination up front so the
+            # engine can send them sequentially or concurrently
+            probes = []
+            for index, input_data in enumerate(inputs):
+                template = self._template_for(target_url, input_data, points)
+                if template is not None:
+                    probes.extend(template.probe(payload, {'input': index}) for payload in self.payloads)
+            
+            # Each response is searched only for the payload it was sent
+            reflections = {payload: SignatureMatcher.from_strings([payload]) for payload in self.payloads}
+            for result in self.engine.iter_results(probes):
+                input_data = inputs[result.probe.context['input']]
+                input_name = input_data.get('location', input_data['input_name'])
+                payload = result.probe.payload
+                self.emit_log(f"Testing payload on {input_name}: {payload}")
                 
-                for payload in self.payloads:
-                    self.emit_log(f"Testing payload on {input_data['input_name']}: {payload}")
-                    
-                    if input_data['method'] == 'get':
-                        test_url = f"{target_url}?{input_data['input_name']}={payload}"
-                        try:
-                            test_response = requests.get(test_url, timeout=5)
-                            if payload.lower() in test_response.text.lower():
-                                msg = f"! Potential XSS Found with: {payload}"
-                                self.emit_log(msg)
-                                results.append(msg)
-                                results.append("Payload was reflected in response")
-                        except requests.exceptions.RequestException as e:
-                            msg = f"Error testing GET payload: {str(e)}"
-                            self.emit_log(msg)
-                            results.append(msg)
-                            
-                    elif input_data['method'] == 'post':
-                        try:
-                            test_response = requests.post(
-                                urljoin(target_url, input_data['action']),
-                                data={input_data['input_name']: payload},
-                                timeout=5
-                            )
-                            if payload.lower() in test_response.text.lower():
-                                msg = f"! Potential XSS Found with: {payload}"
-                                self.emit_log(msg)
-                                results.append(msg)
-                                results.append("Payload was reflected in response")
-                        except requests.exceptions.RequestException as e:
-                            msg = f"Error testing POST payload: {str(e)}"
-                            self.emit_log(msg)
-                            results.append(msg)
+                if isinstance(result.error, HostUnreachable):
+                    raise result.error
+                if result.error is None:
+                    match = reflections[payload].search(result.response.text, html_context=True)
+                    if match:
+                        msg = f"Potential XSS Found with: {payload}"
+                        self.emit_log(f"! {msg}")
+                        yield Finding(msg, HIGH,
+                                      detail=f"Payload was reflected in response ({match.context} context, "
+                                             f"offset {match.offset})",
+                                      payload=payload, location=input_name)
+                else:
+                    msg = f"Error testing {result.probe.method} payload: {str(result.error)}"
+                    self.emit_log(msg)
+                    yield Finding(msg, ERROR, payload=payload, location=input_name)
             
             self.emit_log("XSS testing completed")
-            socketio.emit('scan_complete', {'message': 'XSS testing completed'})
-            results.append("\nReminder: Only test on authorized systems!")
-            return "\n".join(results)
+            emit_event('scan_complete', {'message': 'XSS testing completed'})
             
+        except HostUnreachable as e:
+            # The remaining payloads would only fail the same way
+            self.emit_log(f"! Target unreachable, remaining tests skipped: {str(e)}")
+            report.meta['unreachable'] = str(e)
+            yield Finding("Target unreachable", ERROR, detail=f"{str(e)}; last error: {e.last_error}",
+                          location=target_url)
         except Exception as e:
             self.logger.error(f"XSS testing error: {str(e)}")
             error_msg = f"Error during XSS testing: {str(e)}"
             self.emit_log(error_msg)
-            return error_msg
\ No newline at end of file
+            report.fail(error_msg)
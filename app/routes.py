@@ -1,10 +1,21 @@
-from flask import Blueprint, render_template, request
+import json
+from flask import Blueprint, Response, current_app, render_template, request, jsonify, url_for, stream_with_context
+from flask_socketio import join_room
+from app import job_queue
+from app.modules.events import job_room
 from app.modules.vulnerability_scanner import VulnerabilityScanner
 from app.modules.sqli_simulator import SQLiSimulator
 from app.modules.ssh_bruteforce import SSHBruteForceSimulator
 from app.modules.ftp_bruteforce import FTPBruteForceSimulator
 from app.modules.xss_simulator import XSSSimulator
 from app.modules.attack_chain import ChainedAttackSimulator
+from app.modules.crawler import Crawler
+from app.modules.results import ScanReport, AuthAttempt, record_to_event
+from app.modules.report_text import render_text
+from app.modules.targets import is_batch, parse_targets
+from app.modules.registry import scanner_registry
+from app.modules.store import scan_store
+from app.modules.cache import resolver, baseline_cache
 
 main_bp = Blueprint('main', __name__)
 
@@ -12,67 +23,233 @@ main_bp = Blueprint('main', __name__)
 def home():
     return render_template("index.html")
 
-@main_bp.route("/scan", methods=["POST"])
-def scan():
-    scan_type = request.form.get("scan_type")
-    target = request.form.get("target")
-    ssh_user = request.form.get("ssh_user")
-    ssh_pass = request.form.get("ssh_pass")
-    custom_payload = request.form.get("custom_payload")
-    
-    results = "No results available."
-    
-    try:
-        if scan_type == "vuln_scan":
-            scanner = VulnerabilityScanner()
-            results = scanner.scan_target(target)
-        elif scan_type == "sqli":
-            scanner = SQLiSimulator()
-            results = scanner.test_endpoint(target)
-        elif scan_type == "ssh_brute":
-            if not ssh_user:  # Require username for SSH testing
-                results = "Error: SSH username required"
+def start_scan(scan_type, target, form, options=None):
+    """Prepare the requested scan and return (report, records).
+
+    Nothing runs until records is iterated; each record is yielded as soon
+    as the scanner produces it. Failures are recorded on report.
+    """
+    options = options or {}
+    engine_options = dict(options.get("engine", {}))
+    if options.get("crawl"):
+        # Web simulators test every injection point found by a bounded crawl
+        engine_options["crawler"] = Crawler(**options["crawl"])
+    ssh_user = form.get("ssh_user")
+    ssh_pass = form.get("ssh_pass")
+    custom_payload = form.get("custom_payload")
+
+    report = ScanReport(scan_type, target)
+    records = iter(())
+
+    if scan_type == "vuln_scan":
+        scanner = VulnerabilityScanner(**options.get("batch", {}))
+        if is_batch(target):
+            records = scanner.iter_batch(report, parse_targets(target))
+        else:
+            records = scanner.iter_scan(report, target)
+    elif scan_type == "sqli":
+        scanner = SQLiSimulator(**engine_options)
+        records = scanner.iter_endpoint(report, target)
+    elif scan_type == "ssh_brute":
+        if not ssh_user:  # Require username for SSH testing
+            report.fail("Error: SSH username required")
+        else:
+            scanner = scanner_registry.shared(SSHBruteForceSimulator)
+            custom_pass_list = [ssh_pass] if ssh_pass else None
+            report.meta['username'] = ssh_user
+            if is_batch(target):
+                records = scanner.iter_batch(report, parse_targets(target), ssh_user, custom_pass_list)
             else:
-                scanner = SSHBruteForceSimulator()
-                custom_pass_list = [ssh_pass] if ssh_pass else None
-                results = scanner.simulate_bruteforce(target, ssh_user, custom_pass_list)
-        elif scan_type == "ftp_brute":
-            scanner = FTPBruteForceSimulator()
-            ftp_user = request.form.get("ftp_user")
-            ftp_pass = request.form.get("ftp_pass")
-            ftp_port = request.form.get("ftp_port", "21")
-            
-            try:
-                port = int(ftp_port)
-            except ValueError:
-                port = 21
-                
-            if ftp_user and ftp_pass:
-                # Test specific credentials
+                records = scanner.iter_bruteforce(report, target, ssh_user, custom_pass_list)
+    elif scan_type == "ftp_brute":
+        scanner = scanner_registry.shared(FTPBruteForceSimulator)
+        ftp_user = form.get("ftp_user")
+        ftp_pass = form.get("ftp_pass")
+        ftp_port = form.get("ftp_port", "21")
+
+        try:
+            port = int(ftp_port)
+        except ValueError:
+            port = 21
+
+        report.meta['port'] = port
+        if is_batch(target):
+            custom_wordlist = [(ftp_user, ftp_pass)] if ftp_user and ftp_pass else None
+            records = scanner.iter_batch(report, parse_targets(target), port, custom_wordlist)
+        elif ftp_user and ftp_pass:
+            # Test specific credentials
+            def single_attempt():
                 success, message = scanner.test_credentials(target, ftp_user, ftp_pass, port)
-                results = f"FTP Security Test - {target}:{port}\n" + "=" * 50 + "\n" + message
-            else:
-                # Run default bruteforce simulation
-                results = scanner.simulate_bruteforce(target, port=port)
+                yield AuthAttempt('ftp', ftp_user, ftp_pass, success, message, port)
+            records = single_attempt()
+        else:
+            # Run default bruteforce simulation
+            records = scanner.iter_bruteforce(report, target, port=port)
+    elif scan_type == "xss":
+        scanner = XSSSimulator(**engine_options)
+        records = scanner.iter_xss(report, target)
+    elif scan_type == "attack_chain":
+        scanner = ChainedAttackSimulator(**engine_options, discovery=options.get("batch"))
+        records = scanner.iter_chain(report, target, **options.get("chain", {}))
+    elif scan_type == "community":
+        if not custom_payload:
+            report.fail("Error: Custom payload required")
+        elif scan_type == "sqli":
+            scanner = SQLiSimulator(**engine_options)
+            records = scanner.iter_endpoint(report, target, custom_payload)
         elif scan_type == "xss":
-            scanner = XSSSimulator()
-            results = scanner.test_xss(target)
-        elif scan_type == "attack_chain":
-            scanner = ChainedAttackSimulator()
-            results = scanner.run_chain(target)
-        elif scan_type == "community":
-            if not custom_payload:
-                results = "Error: Custom payload required"
-            elif scan_type == "sqli":
-                scanner = SQLiSimulator()
-                results = scanner.test_endpoint(target, custom_payload)
-            elif scan_type == "xss":
-                scanner = XSSSimulator()
-                # Add custom payload to XSS test
-                scanner.payloads.append(custom_payload)
-                results = scanner.test_xss(target)
-                
+            scanner = XSSSimulator(**engine_options)
+            # Add custom payload to XSS test
+            scanner.payloads.append(custom_payload)
+            records = scanner.iter_xss(report, target)
+
+    return report, records
+
+def run_scan(scan_type, target, form, options=None):
+    """Run the requested scan and return its structured report (executed on a worker)"""
+    try:
+        results, records = start_scan(scan_type, target, form, options)
+        for record in records:
+            results.add(record)
     except Exception as e:
-        results = f"Error during scan: {str(e)}"
-    
-    return render_template("results.html", scan_type=scan_type, target=target, results=results)
+        results = ScanReport(scan_type, target).fail(f"Error during scan: {str(e)}")
+
+    return results
+
+def scan_options_for(form):
+    """Scanner settings resolved while the app config is still reachable"""
+    return {
+        "engine": {
+            "mode": "async" if form.get("payload_mode") == "async" else "sequential",
+            "concurrency": current_app.config["PAYLOAD_CONCURRENCY"]
+        },
+        "batch": {
+            "shard_size": current_app.config["NMAP_SHARD_SIZE"],
+            "parallel_shards": current_app.config["NMAP_PARALLEL_SHARDS"],
+            "backend": form.get("scan_backend") or current_app.config["SCAN_BACKEND"],
+            "connect_concurrency": current_app.config["CONNECT_SCAN_CONCURRENCY"],
+            "connect_timeout": current_app.config["CONNECT_SCAN_TIMEOUT"]
+        },
+        "chain": {
+            "incremental": form.get("incremental") == "on",
+            "retest_ttl": current_app.config["CHAIN_RETEST_TTL"]
+        },
+        "crawl": {
+            "max_depth": current_app.config["CRAWL_MAX_DEPTH"],
+            "max_pages": current_app.config["CRAWL_MAX_PAGES"],
+            "concurrency": current_app.config["CRAWL_CONCURRENCY"]
+        } if form.get("crawl") == "on" else None
+    }
+
+def target_from(req):
+    """The form target plus any hosts listed in an uploaded target file"""
+    target = req.form.get("target", "")
+    upload = req.files.get("target_file")
+    if upload and upload.filename:
+        hosts = upload.read().decode("utf-8", "replace")
+        target = "\n".join(part for part in (target, hosts) if part.strip())
+    return target
+
+@main_bp.route("/scan", methods=["POST"])
+def scan():
+    scan_type = request.form.get("scan_type")
+    target = target_from(request)
+    options = scan_options_for(request.form)
+
+    # Hand the scan to the worker pool and return immediately
+    job = job_queue.submit(scan_type, target, run_scan, scan_type, target, request.form.to_dict(), options)
+    status_url = url_for("main.job_status", job_id=job.id)
+
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({"job_id": job.id, "status": job.status, "status_url": status_url}), 202
+    return render_template("results.html", scan_type=scan_type, target=target, job_id=job.id, status_url=status_url)
+
+@main_bp.route("/scan/stream", methods=["POST"])
+def scan_stream():
+    """Run a scan within the request and stream each record as an NDJSON line.
+
+    Records are written out as they are yielded and not kept, so memory
+    stays flat however large the report grows.
+    """
+    scan_type = request.form.get("scan_type")
+    target = target_from(request)
+    form = request.form.to_dict()
+    options = scan_options_for(request.form)
+    job = job_queue.create(scan_type, target)
+
+    def generate():
+        yield json.dumps({"type": "start", "job_id": job.id, "scan_type": scan_type, "target": target}) + "\n"
+        report = ScanReport(scan_type, target)
+        with job_queue.running(job):
+            try:
+                report, records = start_scan(scan_type, target, form, options)
+                for record in records:
+                    yield json.dumps(record_to_event(record)) + "\n"
+            except Exception as e:
+                report.fail(f"Error during scan: {str(e)}")
+        yield json.dumps({"type": "summary", "meta": report.meta, "error": report.error}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@main_bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    data = job.to_dict()
+    if isinstance(job.result, ScanReport):
+        data["result"] = render_text(job.result)
+        data["report"] = job.result.to_dict()
+    return jsonify(data)
+
+@main_bp.route("/history", methods=["GET"])
+def history():
+    """Stored scans, newest first, filtered by target, scan_type and since"""
+    scans = scan_store.history(
+        target=request.args.get("target"),
+        scan_type=request.args.get("scan_type"),
+        since=request.args.get("since", type=float),
+        limit=request.args.get("limit", 50, type=int)
+    )
+    for scan in scans:
+        scan["url"] = url_for("main.history_scan", scan_id=scan["id"])
+    return jsonify(scans)
+
+@main_bp.route("/history/<int:scan_id>", methods=["GET"])
+def history_scan(scan_id):
+    report = scan_store.get(scan_id)
+    if report is None:
+        return jsonify({"error": "Unknown scan"}), 404
+    return jsonify({"id": scan_id, "result": render_text(report), "report": report.to_dict()})
+
+@main_bp.route("/history/ports", methods=["GET"])
+def history_ports():
+    """Stored port observations filtered by port, service, target and state"""
+    return jsonify(scan_store.ports(
+        port=request.args.get("port", type=int),
+        service=request.args.get("service"),
+        target=request.args.get("target"),
+        state=request.args.get("state", "open"),
+        limit=request.args.get("limit", 500, type=int)
+    ))
+
+@main_bp.route("/history/findings", methods=["GET"])
+def history_findings():
+    return jsonify(scan_store.findings(
+        target=request.args.get("target"),
+        severity=request.args.get("severity"),
+        limit=request.args.get("limit", 500, type=int)
+    ))
+
+@main_bp.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """Hit/miss counters of the shared DNS and baseline caches"""
+    return jsonify({"dns": resolver.cache.stats, "baseline": baseline_cache.cache.stats})
+
+def join_job(data):
+    """Subscribe the client to the event room of a single scan job"""
+    job_id = (data or {}).get("job_id")
+    if not job_id or job_queue.get(job_id) is None:
+        return False
+    join_room(job_room(job_id))
+    return True
@@ -0,0 +1,75 @@
+"""Compare loading a wordlist into a list with streaming it from the corpus.
+
+The old simulators held every payload in a Python list. The corpus
+registry streams entries through a memory map and deduplicates them
+with a table of 64-bit fingerprints instead of a set of strings. A generated wordlist of
+about a million lines with 10% duplicates is used unless a file is given.
+
+Usage: python -m benchmarks.bench_corpus [wordlist.txt]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from app.modules.corpus import CorpusRegistry
+
+
+def generate(path, lines=1_000_000, duplicates=0.1):
+    rng = random.Random(7)
+    words = ['password', 'admin', 'dragon', 'summer', 'monkey', 'shadow', 'master', 'letmein']
+    with open(path, 'w') as f:
+        for i in range(lines):
+            j = rng.randrange(i) if i and rng.random() < duplicates else i
+            f.write(f"{words[j % len(words)]}{j}\n")
+
+
+def load_list(path):
+    """The previous approach: the whole file as a list, deduplicated with a dict"""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        entries = list(dict.fromkeys(line.rstrip('\n') for line in f if line.strip()))
+    return sum(1 for _ in entries)
+
+
+def stream(path, dedup=True):
+    registry = CorpusRegistry(builtin_dir=os.path.dirname(path))
+    return sum(1 for _ in registry.iter(os.path.splitext(os.path.basename(path))[0], dedup=dedup))
+
+
+def measure(count, path):
+    start = time.perf_counter()
+    count(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    entries = count(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, entries
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'wordlist.txt')
+        if len(sys.argv) > 1:
+            shutil.copyfile(sys.argv[1], path)
+        else:
+            generate(path)
+        print(f"{os.path.getsize(path) / 2 ** 20:.1f} MB wordlist")
+        baseline = None
+        candidates = (("list + dict dedup (old)", load_list), ("mmap stream + fingerprints", stream),
+                      ("mmap stream, no dedup", lambda path: stream(path, dedup=False)))
+        for label, count in candidates:
+            elapsed, peak, entries = measure(count, path)
+            baseline = baseline or peak
+            print(f"  {label:<28} {elapsed * 1000:8.1f} ms  peak {peak / 2 ** 20:7.1f} MB  "
+                  f"({entries} entries)  {baseline / peak:6.1f}x less memory")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Compare wall time of serial and audited credential checks across many hosts.
+
+The old path tried every credential of every host in turn, sleeping a
+random 1-3 s between attempts. The auditor runs hosts in parallel and
+spaces attempts per host only, so the same spacing costs wall time once
+per host instead of once per attempt. Check latency and spacing are
+scaled down so the comparison runs in seconds.
+
+Usage: python -m benchmarks.bench_credential_audit [hosts] [passwords]
+"""
+
+import random
+import sys
+import time
+from app.modules.credential_audit import AuditJob, AuditPolicy, CredentialAuditor
+
+LATENCY = 0.02   # Seconds one simulated login takes
+SPACING = 0.05   # Minimum seconds between attempts on one host
+JITTER = 0.05
+
+
+def check(username, password):
+    time.sleep(LATENCY)
+    return False, "Authentication failed"
+
+
+def serial(hosts, passwords):
+    """The previous loop: every attempt, then a randomised delay"""
+    for _ in range(hosts):
+        for password in passwords:
+            check('root', password)
+            time.sleep(SPACING + random.uniform(0, JITTER))
+
+
+def audited(hosts, passwords, workers):
+    auditor = CredentialAuditor(AuditPolicy(min_spacing=SPACING, jitter=JITTER), max_workers=workers)
+    jobs = [AuditJob(f"10.0.{i // 256}.{i % 256}", 'ssh', 22, (('root', p) for p in passwords), check)
+            for i in range(hosts)]
+    return sum(attempt is not None for _, attempt in auditor.run(jobs))
+
+
+def timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    passwords = [f"password{i}" for i in range(int(sys.argv[2]) if len(sys.argv) > 2 else 10)]
+    print(f"{hosts} hosts x {len(passwords)} passwords, {LATENCY * 1000:.0f} ms per check, "
+          f"{SPACING * 1000:.0f}-{(SPACING + JITTER) * 1000:.0f} ms between attempts on a host")
+    baseline = timed(lambda: serial(hosts, passwords))
+    print(f"  {'serial with delays (old)':<26} {baseline:7.2f} s")
+    for workers in (1, 8, 32):
+        elapsed = timed(lambda: audited(hosts, passwords, workers))
+        print(f"  {f'auditor, {workers} workers':<26} {elapsed:7.2f} s  {baseline / elapsed:5.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Compare FTP credential checks with and without control-connection reuse,
+and the old printed directory listing with the bounded capture.
+
+A local FTP server answers every command after a simulated round trip
+(and two for a new connection: TCP handshake and banner). Like vsftpd's
+max_login_fails, it hangs up after a number of rejected logins. Its
+anonymous root holds a large number of files.
+
+Usage: python -m benchmarks.bench_ftp_auth [attempts] [rtt_ms] [files]
+"""
+
+import ftplib
+import io
+import socket
+import socketserver
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from app.modules.ftp_bruteforce import FTPAuthSession, FTPBruteForceSimulator, capture_listing
+
+MAX_LOGIN_FAILS = 3
+
+
+class Handler(socketserver.StreamRequestHandler):
+    rtt = 0.02
+    files = 100000
+
+    def reply(self, line):
+        time.sleep(self.rtt)
+        self.wfile.write(line.encode() + b"\r\n")
+        self.wfile.flush()
+
+    def handle(self):
+        time.sleep(self.rtt)
+        self.reply("220 Benchmark FTP")
+        user, fails, passive = None, 0, None
+        for raw in self.rfile:
+            command, _, argument = raw.decode().strip().partition(' ')
+            command = command.upper()
+            if command == 'USER':
+                user = argument
+                self.reply("331 Please specify the password.")
+            elif command == 'PASS':
+                if user == 'anonymous':
+                    self.reply("230 Login successful.")
+                    continue
+                fails += 1
+                self.reply("530 Login incorrect.")
+                if fails >= MAX_LOGIN_FAILS:
+                    return
+            elif command == 'PASV':
+                passive = socket.create_server(('127.0.0.1', 0))
+                port = passive.getsockname()[1]
+                self.reply(f"227 Entering Passive Mode (127,0,0,1,{port >> 8},{port & 255}).")
+            elif command == 'LIST' and passive is not None:
+                self.reply("150 Here comes the directory listing.")
+                self.send_listing(passive)
+                passive = None
+            elif command == 'QUIT':
+                self.reply("221 Goodbye.")
+                return
+            else:
+                self.reply("215 UNIX Type: L8" if command == 'SYST' else "200 OK")
+
+    def send_listing(self, passive):
+        data, _ = passive.accept()
+        passive.close()
+        lines = (f"-rw-r--r--    1 ftp      ftp          1024 Jan 01 00:00 file{i}.bin\r\n"
+                 for i in range(self.files))
+        try:
+            for start in range(0, self.files, 1000):
+                data.sendall("".join(next(lines) for _ in range(min(1000, self.files - start))).encode())
+            data.close()
+            self.reply("226 Directory send OK.")
+        except OSError:
+            data.close()
+            self.reply("426 Connection closed; transfer aborted.")
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    attempts = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    Handler.rtt = (int(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    Handler.files = int(sys.argv[3]) if len(sys.argv) > 3 else 100000
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    credentials = [("admin", f"password{i}") for i in range(attempts)]
+    print(f"{attempts} rejected logins, {Handler.rtt * 1000:.0f} ms round trip, "
+          f"server hangs up after {MAX_LOGIN_FAILS} failures")
+
+    fresh = FTPBruteForceSimulator(reuse_connection=False)
+    elapsed, _ = timed(lambda: [fresh.test_credentials('127.0.0.1', u, p, port) for u, p in credentials])
+    print(f"  new connection per attempt  {elapsed:6.2f} s  {attempts} connections")
+    session = FTPAuthSession('127.0.0.1', port)
+    reused, _ = timed(lambda: [FTPBruteForceSimulator().test_credentials('127.0.0.1', u, p, port, session)
+                               for u, p in credentials])
+    session.close()
+    stats = session.stats()
+    print(f"  reused control connection   {reused:6.2f} s  {stats['handshakes']} connections  "
+          f"{elapsed / reused:4.1f}x faster")
+
+    print(f"\nAnonymous listing of {Handler.files} files")
+    for label, list_directory in (("ftp.dir() (old)", lambda ftp: ftp.dir()), ("capture_listing", capture_listing)):
+        ftp = ftplib.FTP()
+        ftp.connect('127.0.0.1', port)
+        ftp.login()
+        printed = io.StringIO()
+        with redirect_stdout(printed):
+            elapsed, _ = timed(lambda: list_directory(ftp))
+        ftp.close()
+        print(f"  {label:<18} {elapsed * 1000:8.1f} ms  {len(printed.getvalue()) / 2 ** 20:6.2f} MB printed")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Compare parse time and peak memory of form/link extraction backends.
+
+The old path built a full BeautifulSoup tree with html.parser; parse_page
+streams tokens from lxml or html.parser and keeps only forms, links and
+scripts. Saved pages can be benchmarked by passing their paths.
+
+Usage: python -m benchmarks.bench_html_parsing [page.html ...]
+"""
+
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from app.modules.page_parser import BACKENDS, etree, parse_page
+
+
+def shop_page(products=2500):
+    """A large product listing: navigation, cards with inline markup, forms and scripts"""
+    nav = "".join(f'<li class="nav-item"><a href="/category/{i}">Category {i}</a></li>' for i in range(60))
+    cards = "".join(
+        f'<div class="card" data-id="{i}" style="margin:4px"><a href="/product?id={i}&amp;ref=list">'
+        f'<img src="/img/{i}.jpg" alt="Product {i}" loading="lazy"></a><h3>Product {i}</h3>'
+        f'<p class="price">&euro;{i % 97}.99</p><p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, '
+        f'sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p>'
+        f'<form action="/cart/add" method="post"><input type="hidden" name="product" value="{i}">'
+        f'<select name="qty"><option>1</option><option>2</option></select>'
+        f'<input type="submit" value="Add to cart"></form></div>'
+        for i in range(products)
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>Shop</title><script src="/static/app.js"></script>'
+        '<script>window.__STATE__ = {"api": "/api/products?page=1", "items": [' + ",".join(str(i) for i in range(5000))
+        + ']};</script></head><body><nav><ul>' + nav + '</ul><form action="/search" method="get">'
+        '<input name="q" placeholder="Search"><button>Go</button></form></nav><main>' + cards
+        + '</main><footer><form action="/newsletter" method="post"><input type="email" name="email">'
+        '<textarea name="comment">Optional</textarea></form></footer></body></html>'
+    )
+
+
+def article_page(paragraphs=4000):
+    """A long text page with few forms, as documentation or news sites serve"""
+    body = "".join(
+        f'<p id="p{i}">Paragraph {i} with <a href="/docs/section-{i % 50}#anchor">a link</a>, '
+        f'<code>inline code</code> and <em>emphasis</em> text that goes on for a while.</p>'
+        for i in range(paragraphs)
+    )
+    return ('<html><body><article>' + body + '</article><form action="/feedback" method="post">'
+            '<textarea name="message"></textarea><input name="name"></form></body></html>')
+
+
+def bs4_forms(html, builder):
+    """The previous extraction: a full tree, then find_all for forms and links"""
+    soup = BeautifulSoup(html, builder)
+    forms = [(form.get('action'), [field.get('name') for field in form.find_all(['input', 'textarea', 'select'])])
+             for form in soup.find_all('form')]
+    links = [tag.get('href') for tag in soup.find_all('a')]
+    return len(forms), len(links)
+
+
+def page_forms(html, backend):
+    page = parse_page(html, backend)
+    return len(page.forms), len(page.links)
+
+
+def measure(extract, html, rounds):
+    best = min(_timed(extract, html) for _ in range(rounds))
+    tracemalloc.start()
+    result = extract(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def _timed(extract, html):
+    start = time.perf_counter()
+    extract(html)
+    return time.perf_counter() - start
+
+
+def main():
+    pages = [(path, open(path, encoding='utf-8', errors='replace').read()) for path in sys.argv[1:]]
+    pages = pages or [("shop listing", shop_page()), ("long article", article_page())]
+    candidates = [("bs4 + html.parser (old)", lambda html: bs4_forms(html, 'html.parser'))]
+    if etree is not None:
+        candidates.append(("bs4 + lxml", lambda html: bs4_forms(html, 'lxml')))
+    candidates.extend((f"parse_page({backend})", lambda html, b=backend: page_forms(html, b))
+                      for backend in BACKENDS if backend != 'lxml' or etree is not None)
+
+    for name, html in pages:
+        print(f"\n{name}: {len(html) / 1024:.0f} KB")
+        baseline = None
+        for label, extract in candidates:
+            elapsed, peak, (forms, links) = measure(extract, html, rounds=3)
+            baseline = baseline or (elapsed, peak)
+            print(f"  {label:<26} {elapsed * 1000:8.1f} ms  peak {peak / 2 ** 20:7.1f} MB  "
+                  f"({forms} forms, {links} links)  {baseline[0] / elapsed:5.1f}x faster, "
+                  f"{baseline[1] / peak:5.1f}x less memory")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Compare per-payload wall time of bare requests calls vs the pooled HTTPClient.
+
+Usage: python -m benchmarks.bench_http_pool [requests_per_run]
+"""
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from app.modules.http_client import HTTPClient
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    body = b"<html><body><form><input name='id'></form></body></html>"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def timed(label, fetch, url, count):
+    start = time.perf_counter()
+    for i in range(count):
+        fetch(f"{url}?id={i}")
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed:7.3f}s total  {elapsed / count * 1000:7.3f} ms/payload")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    client = HTTPClient()
+    client.get(url)  # warm up the pool
+    bare = timed("requests.get (bare)", lambda u: requests.get(u, timeout=5), url, count)
+    pooled = timed("HTTPClient (pooled)", client.get, url, count)
+    print(f"speedup: {bare / pooled:.2f}x")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Compare discovery time of the asyncio connect scan, a serial connect loop and nmap.
+
+Scans the default ports of a block of loopback addresses, plus a few
+banner-sending services on 127.0.0.1 and two "filtered" ports on every
+address. A filtered port is a listener whose accept queue is full, so
+the kernel drops further SYNs and connects time out, as they do behind
+a firewall. nmap -sT -sV is timed too when the binary is installed.
+
+Usage: python -m benchmarks.bench_port_scan [hosts] [connect_timeout]
+"""
+
+import shutil
+import socket
+import sys
+import threading
+import time
+from app.modules.connect_scan import ConnectScanner, parse_ports
+from app.modules.vulnerability_scanner import VulnerabilityScanner
+
+GREETINGS = [b"SSH-2.0-OpenSSH_9.6p1\r\n", b"220 (vsFTPd 3.0.5)\r\n", b"220 mx ESMTP Postfix\r\n"]
+
+
+def serve(greeting):
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', 0))
+    server.listen(128)
+
+    def loop():
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                conn.sendall(greeting)
+    threading.Thread(target=loop, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def filtered():
+    """A port on every loopback address that never completes a connect"""
+    server = socket.socket()
+    server.bind(('0.0.0.0', 0))
+    server.listen(0)
+    port = server.getsockname()[1]
+    # Fill the accept queue; later SYNs are dropped
+    held = [server]
+    try:
+        while True:
+            held.append(socket.create_connection(('127.0.0.1', port), timeout=0.2))
+    except OSError:
+        pass
+    return port, held
+
+
+def serial(hosts, ports, timeout):
+    """One blocking connect at a time, as a simple script would probe"""
+    found = 0
+    for host in hosts:
+        for port in ports:
+            try:
+                socket.create_connection((host, port), timeout=timeout).close()
+                found += 1
+            except OSError:
+                pass
+    return found
+
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
+    hosts = [f"127.0.{i // 254}.{i % 254 + 1}" for i in range(count)]
+    blackholes = [filtered() for _ in range(2)]
+    ports = (parse_ports(VulnerabilityScanner.PORTS) + [serve(greeting) for greeting in GREETINGS]
+             + [port for port, _ in blackholes])
+    print(f"{len(hosts)} hosts x {len(ports)} ports = {len(hosts) * len(ports)} pairs, "
+          f"{len(hosts) * len(blackholes)} filtered, {timeout}s connect timeout")
+
+    elapsed, found = timed(lambda: serial(hosts, ports, timeout))
+    baseline = elapsed
+    print(f"  {'serial connect loop':<32} {elapsed:7.2f} s  {found} open")
+    for concurrency in (64, 256):
+        scanner = ConnectScanner(concurrency=concurrency, timeout=timeout, banner_timeout=timeout)
+        elapsed, results = timed(lambda: scanner.scan(hosts, ports))
+        found = sum(len(open_ports) for open_ports in results.values())
+        print(f"  {f'connect scan, {concurrency} at a time':<32} {elapsed:7.2f} s  {found} open  "
+              f"{baseline / elapsed:5.1f}x faster")
+    if shutil.which('nmap'):
+        import nmap
+        elapsed, _ = timed(lambda: nmap.PortScanner().scan(' '.join(hosts), ','.join(map(str, ports)),
+                                                           arguments=VulnerabilityScanner.SCAN_ARGS))
+        print(f"  {'nmap -sT -sV':<32} {elapsed:7.2f} s  {baseline / elapsed:5.1f}x faster")
+    else:
+        print("  nmap not installed; skipped")
+
+
+if __name__ == '__main__':
+    main()
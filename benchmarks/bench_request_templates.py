@@ -0,0 +1,48 @@
+"""Compare per-payload request building: urlencode of the full query vs a template.
+
+Usage: python -m benchmarks.bench_request_templates [payloads]
+"""
+
+import sys
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from app.modules.payload_engine import Probe
+from app.modules.request_template import RequestBuilder
+
+TARGET = "http://lab.example/search?q=shoes&page=2&sort=price&filter=red&lang=en&session=abc123&id=7"
+
+
+def per_payload(payloads):
+    """Parse the target and encode every parameter again for each payload"""
+    probes = []
+    for payload in payloads:
+        parts = urlsplit(TARGET)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        query['id'] = payload
+        probes.append(Probe('GET', f"{parts.scheme}://{parts.netloc}{parts.path}?{urlencode(query)}", payload))
+    return probes
+
+
+def templated(payloads):
+    template = RequestBuilder(TARGET).template('query', 'id')
+    return [template.probe(payload) for payload in payloads]
+
+
+def timed(label, build, payloads):
+    start = time.perf_counter()
+    build(payloads)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed * 1000:8.1f} ms  {elapsed / len(payloads) * 1e6:6.2f} us/payload")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    payloads = [f"' OR {i}={i} -- <script>alert({i})</script>" for i in range(count)]
+    slow = timed("parse + urlencode per payload", per_payload, payloads)
+    fast = timed("RequestTemplate.probe", templated, payloads)
+    print(f"speedup: {slow / fast:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Compare per-request scanner construction with and without the scanner registry.
+
+Requires the nmap binary on PATH.
+
+Usage: python -m benchmarks.bench_scanner_startup [constructions_per_run]
+"""
+
+import sys
+import time
+import nmap
+from app.modules.attack_chain import ChainedAttackSimulator
+from app.modules.registry import ScannerRegistry, scanner_registry
+from app.modules.vulnerability_scanner import VulnerabilityScanner
+
+
+def timed(label, build, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        build()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:7.3f}s total  {elapsed / count * 1000:8.3f} ms/request")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    try:
+        start = time.perf_counter()
+        ScannerRegistry().port_scanner()
+        print(f"{'cold start (first nmap probe)':<34} {(time.perf_counter() - start) * 1000:7.3f} ms")
+    except nmap.PortScannerError as e:
+        sys.exit(f"nmap is required for this benchmark: {e}")
+
+    probed = timed("nmap.PortScanner() per request", nmap.PortScanner, count)
+    registry = timed("registry.port_scanner()", scanner_registry.port_scanner, count)
+    print(f"speedup: {probed / registry:.1f}x")
+
+    timed("VulnerabilityScanner()", VulnerabilityScanner, count)
+    timed("ChainedAttackSimulator()", ChainedAttackSimulator, count)
+    print(f"registry stats: {scanner_registry.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Compare the reflection and SQL error checks before and after SignatureMatcher.
+
+Each check is timed on the path a scanner really runs per response: the
+XSS simulator looks for the one payload it sent, and the SQLi simulator
+looks for every DBMS error signature. A reflected payload also pays for
+the HTML context lookup, which the old check did not report.
+
+Usage: python -m benchmarks.bench_signatures [response_kb]
+"""
+
+import re
+import sys
+import time
+from app.modules.response_diff import DBMS_ERRORS, find_errors
+from app.modules.signatures import SignatureMatcher
+from app.modules.xss_simulator import XSSSimulator
+
+# The SQLi simulator's checks before response_diff existed
+SUBSTRING_ERRORS = ["sql syntax", "mysql_fetch", "ORA-", "SQL Server", "mysqli_fetch", "PostgreSQL"]
+
+# The single alternation response_diff compiled before it moved to SignatureMatcher
+ALTERNATION = re.compile(
+    "|".join(f"(?P<e{index}>{'|'.join(patterns)})" for index, patterns in enumerate(DBMS_ERRORS.values())),
+    re.IGNORECASE
+)
+
+
+def build_body(size_kb, payload):
+    row = "<tr><td class='name'>Product</td><td><a href='/item?id=1'>View</a></td></tr>\n"
+    rows = row * (size_kb * 1024 // len(row))
+    return f"<html><body><table>{rows}</table><p>{payload}</p></body></html>"
+
+
+def timed(label, check, body, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        found = check(body)
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{label:<44} {elapsed * 1000:8.3f} ms/response  ({found} hits)")
+    return elapsed
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    payload = XSSSimulator().payloads[0]
+    body = build_body(size_kb, payload)
+    clean = build_body(size_kb, '')
+    reflection = SignatureMatcher.from_strings([payload])
+    rounds = 10
+
+    def xss_before(text):
+        return int(payload.lower() in text.lower())
+
+    def xss_after(text):
+        return int(reflection.search(text, html_context=True) is not None)
+
+    print(f"response size: {len(body) / 1024:.0f} KB, payload {payload!r}")
+    old_miss = timed("XSS, not reflected: lower() in lower()", xss_before, clean, rounds)
+    new_miss = timed("XSS, not reflected: search()", xss_after, clean, rounds)
+    old_xss = timed("XSS, reflected: lower() in lower()", xss_before, body, rounds)
+    new_xss = timed("XSS, reflected: search() + HTML context", xss_after, body, rounds)
+    substring_sql = timed("SQL: 6 lower-cased substring checks",
+                          lambda text: sum(err.lower() in text.lower() for err in SUBSTRING_ERRORS), body, rounds)
+    alternation_sql = timed("SQL: one compiled alternation",
+                            lambda text: sum(1 for _ in ALTERNATION.finditer(text)), body, rounds)
+    new_sql = timed("SQL: find_errors",
+                    lambda text: len(find_errors(text)), body, rounds)
+    print(f"XSS after/before: {new_miss / old_miss:.2f}x the time not reflected, "
+          f"{new_xss / old_xss:.2f}x reflected")
+    print(f"SQL errors after/before: {new_sql / substring_sql:.2f}x the substring checks, "
+          f"{new_sql / alternation_sql:.2f}x the alternation")
+
+
+if __name__ == '__main__':
+    main()
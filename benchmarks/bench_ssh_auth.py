@@ -0,0 +1,88 @@
+"""Compare one connection per password with password attempts on a reused transport.
+
+Runs a local paramiko SSH server that rejects every password and, like
+sshd with MaxAuthTries, drops the session after a number of failures.
+Inter-attempt delays are disabled so only connection cost is measured.
+
+Usage: python -m benchmarks.bench_ssh_auth [attempts] [max_auth_tries]
+"""
+
+import logging
+import socket
+import sys
+import threading
+import time
+import paramiko
+from app.modules.ssh_bruteforce import SSHAuthSession, SSHBruteForceSimulator
+
+
+class RejectingServer(paramiko.ServerInterface):
+    def __init__(self, max_tries):
+        self.max_tries = max_tries
+        self.failures = 0
+        self.exhausted = threading.Event()
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        self.failures += 1
+        if self.failures >= self.max_tries:
+            self.exhausted.set()
+        return paramiko.AUTH_FAILED
+
+
+def serve(listener, host_key, max_tries):
+    while True:
+        try:
+            client, _ = listener.accept()
+        except OSError:
+            return
+        threading.Thread(target=handle, args=(client, host_key, max_tries), daemon=True).start()
+
+
+def handle(client, host_key, max_tries):
+    transport = paramiko.Transport(client)
+    transport.add_server_key(host_key)
+    server = RejectingServer(max_tries)
+    try:
+        transport.start_server(server=server)
+        server.exhausted.wait(30)
+    except (paramiko.SSHException, EOFError):
+        pass
+    finally:
+        transport.close()
+
+
+def main():
+    logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+    attempts = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    max_tries = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    listener = socket.create_server(('127.0.0.1', 0))
+    port = listener.getsockname()[1]
+    threading.Thread(target=serve, args=(listener, paramiko.RSAKey.generate(2048), max_tries), daemon=True).start()
+    passwords = [f"password{i}" for i in range(attempts)]
+    print(f"{attempts} attempts, server allows {max_tries} per connection")
+
+    simulator = SSHBruteForceSimulator(reuse_connection=False)
+    simulator.emit_log = lambda message: None
+    start = time.perf_counter()
+    for password in passwords:
+        simulator.test_ssh_auth(f"127.0.0.1:{port}", "root", password)
+    per_attempt = time.perf_counter() - start
+    print(f"  new connection per attempt  {per_attempt:6.2f} s  {attempts} handshakes")
+
+    session = SSHAuthSession('127.0.0.1', port)
+    start = time.perf_counter()
+    for password in passwords:
+        session.try_password("root", password)
+    reused = time.perf_counter() - start
+    session.close()
+    stats = session.stats()
+    print(f"  reused transport            {reused:6.2f} s  {stats['handshakes']} handshakes "
+          f"({stats['attempts_per_connection']} attempts each)  {per_attempt / reused:4.1f}x faster")
+    listener.close()
+
+
+if __name__ == '__main__':
+    main()
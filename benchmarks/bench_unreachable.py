@@ -0,0 +1,81 @@
+"""Compare the time SQLi and XSS scans spend on a target that stops answering.
+
+The target serves the baseline page, then every connection times out
+after CONNECT_TIMEOUT seconds, as a host that went down mid-scan or is
+behind a dropping firewall does. Without a circuit breaker every payload
+waits out the timeout; with one the scan stops after a few.
+
+Usage: python -m benchmarks.bench_unreachable [connect_timeout]
+"""
+
+import sys
+import time
+from unittest import mock
+import requests
+from app.modules.health import HealthTracker
+from app.modules.http_client import HTTPClient
+from app.modules.sqli_simulator import SQLiSimulator
+from app.modules.xss_simulator import XSSSimulator
+
+PAGE = ('<html><form action="/search" method="get"><input name="q"><input name="category">'
+        '<input name="sort"><input name="page"></form></html>')
+
+
+class Response:
+    status_code = 200
+    text = PAGE
+    content = text.encode()
+
+
+class BlackholeSession:
+    """Answers the baseline request, then times out every connection"""
+
+    def __init__(self, connect_timeout):
+        self.connect_timeout = connect_timeout
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            return Response()
+        time.sleep(self.connect_timeout)
+        raise requests.exceptions.ConnectTimeout(f"Connection to {url} timed out")
+
+
+def sqli_scan(client):
+    simulator = SQLiSimulator(http_client=client)
+    simulator.time_payloads = []
+    simulator.emit_log = lambda message, progress=None: None
+    simulator.test_endpoint("http://blackhole.example/item?id=1")
+
+
+def xss_scan(client):
+    simulator = XSSSimulator(http_client=client)
+    simulator.emit_log = lambda message, progress=None: None
+    simulator.test_xss("http://blackhole.example/")
+
+
+def timed(run, connect_timeout, health):
+    client = HTTPClient(health=health)
+    session = BlackholeSession(connect_timeout)
+    start = time.perf_counter()
+    with mock.patch.object(client, 'session_for', return_value=session):
+        run(client)
+    return time.perf_counter() - start, session.calls
+
+
+def main():
+    connect_timeout = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    print(f"Target answers the baseline, then every connect times out after {connect_timeout:.2f}s")
+    for name, run in [("SQLi, one parameter", sqli_scan), ("XSS, form with 4 inputs", xss_scan)]:
+        print(f"\n{name}")
+        baseline = None
+        for label, health in [("no breaker (old)", HealthTracker(failure_threshold=10 ** 9)),
+                              ("breaker, threshold 3", HealthTracker(failure_threshold=3))]:
+            elapsed, calls = timed(run, connect_timeout, health)
+            baseline = baseline or elapsed
+            print(f"  {label:<22} {elapsed:6.2f} s  {calls:3d} requests  {baseline / elapsed:5.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
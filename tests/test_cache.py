@@ -0,0 +1,71 @@
+import socket
+import unittest
+from unittest import mock
+from app.modules.cache import TTLCache, HostResolver, BaselineCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestTTLCache(unittest.TestCase):
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        clock.now = 11
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats['hits'], 1)
+        self.assertEqual(cache.stats['expired'], 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats['evictions'], 1)
+
+class TestHostResolver(unittest.TestCase):
+    ADDRINFO = [
+        (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::5', 0, 0, 0)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('10.0.0.5', 0)),
+    ]
+
+    def test_lookups_are_cached_ipv4_first(self):
+        resolver = HostResolver()
+        with mock.patch('socket.getaddrinfo', return_value=self.ADDRINFO) as lookup:
+            self.assertEqual(resolver.resolve('Lab.Example'), ['10.0.0.5', '2001:db8::5'])
+            self.assertEqual(resolver.resolve_one('lab.example'), '10.0.0.5')
+        lookup.assert_called_once()
+        self.assertEqual(resolver.cache.stats['hits'], 1)
+
+    def test_failures_are_cached(self):
+        resolver = HostResolver()
+        with mock.patch('socket.getaddrinfo', side_effect=socket.gaierror("no such host")) as lookup:
+            for _ in range(2):
+                with self.assertRaises(socket.gaierror):
+                    resolver.resolve('missing.example')
+        lookup.assert_called_once()
+
+class TestBaselineCache(unittest.TestCase):
+    def test_baseline_is_fetched_once_per_url(self):
+        http = mock.Mock()
+        http.get.return_value = mock.Mock(status_code=200, text='<html>ok</html>', content=b'<html>ok</html>')
+        baselines = BaselineCache()
+
+        first = baselines.fetch('http://lab.example/', http)
+        second = baselines.fetch('http://lab.example/', http)
+
+        http.get.assert_called_once_with('http://lab.example/')
+        self.assertIs(first, second)
+        self.assertEqual(first.length, 15)
+        self.assertEqual(len(first.digest), 64)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import socket
+import threading
+import unittest
+from unittest import mock
+import app.modules.vulnerability_scanner as vulnerability_scanner
+from app.modules.connect_scan import ConnectScanner, identify, parse_ports
+from app.modules.registry import scanner_registry
+
+def serve(greeting=b'', reply=b''):
+    """A local TCP server that sends greeting, or answers the first request with reply"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(16)
+
+    def loop():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            with conn:
+                if greeting:
+                    conn.sendall(greeting)
+                else:
+                    conn.recv(1024)
+                    conn.sendall(reply)
+    threading.Thread(target=loop, daemon=True).start()
+    return server
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class RecordingPortScanner:
+    """Fingerprints every port it is asked about as nginx; records the ports asked for"""
+    calls = []
+
+    def scan(self, hosts, ports, arguments):
+        self.calls.append((hosts, ports))
+        return {'scan': {host: {'tcp': {int(port): {'state': 'open', 'name': 'http', 'product': 'nginx',
+                                                    'version': '1.24.0'} for port in ports.split(',')}}
+                         for host in hosts.split()}}
+
+class TestIdentify(unittest.TestCase):
+    def test_banners(self):
+        cases = [
+            (22, "SSH-2.0-OpenSSH_9.6p1 Ubuntu-3ubuntu13\r\n", ('ssh', 'OpenSSH', '9.6p1')),
+            (2222, "SSH-2.0-dropbear\r\n", ('ssh', 'dropbear', '')),
+            (21, "220 (vsFTPd 3.0.5)\r\n", ('ftp', 'vsFTPd', '3.0.5')),
+            (2121, "220 ProFTPD Server (Debian) [::ffff:10.0.0.5]\r\n", ('ftp', 'ProFTPD', '')),
+            (25, "220 mx.example ESMTP Exim 4.96 Mon, 1 Jan 2024\r\n", ('smtp', 'Exim', '4.96')),
+            (8080, "HTTP/1.1 200 OK\r\nDate: today\r\nServer: Apache/2.4.58 (Ubuntu)\r\n\r\n",
+             ('http', 'Apache', '2.4.58')),
+            (9000, "HTTP/1.0 404 Not Found\r\n\r\n", ('http', '', '')),
+            (23, "\xff\xfd\x18\xff\xfd\x20", ('telnet', '', '')),
+            (443, "", ('https', '', '')),
+            (12345, "", ('unknown', '', '')),
+        ]
+        for port, banner, expected in cases:
+            with self.subTest(port=port):
+                self.assertEqual(identify(port, banner), expected)
+
+    def test_parse_ports(self):
+        self.assertEqual(parse_ports('21-25,80, 443,80'), [21, 22, 23, 24, 25, 80, 443])
+        with self.assertRaises(ValueError):
+            parse_ports('0-10')
+
+class TestConnectScanner(unittest.TestCase):
+    def setUp(self):
+        self.servers = [serve(greeting=b"SSH-2.0-OpenSSH_9.6p1\r\n"),
+                        serve(reply=b"HTTP/1.0 200 OK\r\nServer: nginx/1.24.0\r\n\r\n")]
+        for server in self.servers:
+            self.addCleanup(server.close)
+        self.ports = [server.getsockname()[1] for server in self.servers]
+        scanner_registry.reset()
+        self.addCleanup(scanner_registry.reset)
+
+    def test_open_ports_are_found_and_identified(self):
+        scanner = ConnectScanner(concurrency=8, timeout=1, banner_timeout=0.2)
+        results = scanner.scan(['127.0.0.1'], self.ports + [closed_port()])
+        found = [(p.port, p.state, p.service, p.product, p.version) for p in results['127.0.0.1']]
+        self.assertEqual(found, sorted([
+            (self.ports[0], 'open', 'ssh', 'OpenSSH', '9.6p1'),
+            # Silent at first, so it was sent an HTTP request
+            (self.ports[1], 'open', 'http', 'nginx', '1.24.0'),
+        ]))
+
+    def test_connect_backend_needs_no_nmap(self):
+        with mock.patch.object(vulnerability_scanner.nmap, 'PortScanner', side_effect=AssertionError):
+            scanner = vulnerability_scanner.VulnerabilityScanner(backend='connect', connect_timeout=0.2)
+            scanner.PORTS = ','.join(map(str, self.ports))
+            report = scanner.scan_target('127.0.0.1')
+
+        self.assertIsNone(report.error)
+        self.assertEqual(report.meta, {'backend': 'connect', 'targets': 1, 'pairs': 2})
+        self.assertEqual({port.service for port in report.hosts[0].ports}, {'ssh', 'http'})
+        self.assertEqual(len(report.findings), 2)
+
+    def test_hybrid_fingerprints_only_open_ports(self):
+        RecordingPortScanner.calls = []
+        with mock.patch.object(vulnerability_scanner.nmap, 'PortScanner', RecordingPortScanner):
+            scanner = vulnerability_scanner.VulnerabilityScanner(backend='hybrid', connect_timeout=0.2)
+            scanner.PORTS = ','.join(map(str, self.ports + [closed_port()]))
+            report = scanner.scan_batch(['127.0.0.1', '127.0.0.2'])
+
+        # 127.0.0.2 has nothing listening and is never handed to nmap
+        self.assertEqual(RecordingPortScanner.calls, [('127.0.0.1', ','.join(map(str, sorted(self.ports))))])
+        self.assertEqual(report.meta['fingerprint_runs'], 1)
+        hosts = {host.ip: host for host in report.hosts}
+        self.assertEqual(hosts['127.0.0.2'].ports, [])
+        self.assertEqual({port.product for port in hosts['127.0.0.1'].ports}, {'nginx'})
+
+    def test_hybrid_keeps_banners_when_nmap_fails(self):
+        with mock.patch.object(vulnerability_scanner.nmap, 'PortScanner',
+                               side_effect=vulnerability_scanner.nmap.PortScannerError("nmap program was not found")):
+            scanner = vulnerability_scanner.VulnerabilityScanner(backend='hybrid', connect_timeout=0.2)
+            scanner.PORTS = ','.join(map(str, self.ports))
+            report = scanner.scan_target('127.0.0.1')
+
+        self.assertIsNone(report.error)
+        self.assertEqual({port.product for port in report.hosts[0].ports}, {'OpenSSH', 'nginx'})
+        self.assertIn("keeping banner results", report.notes[0])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            vulnerability_scanner.VulnerabilityScanner(backend='masscan')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from app.modules.corpus import FingerprintSet, CorpusRegistry, corpus_registry, iter_file
+from app.modules.ftp_bruteforce import FTPBruteForceSimulator
+from app.modules.sqli_payloads import content_payloads, time_payloads
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.builtin = os.path.join(self.tmp.name, 'builtin')
+        self.extra = os.path.join(self.tmp.name, 'extra')
+        os.mkdir(self.builtin)
+        os.mkdir(self.extra)
+        self.registry = CorpusRegistry(self.builtin, self.extra)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, directory, name, text):
+        with open(os.path.join(directory, name), 'w') as f:
+            f.write(text)
+
+    def test_comments_tags_and_escapes(self):
+        self.write(self.builtin, 'sqli.txt', "# comment\n\n#% tags: content, MySQL\n' OR 1=1 --\r\n"
+                                             "#% tags: time\n\\# starts with a hash\n")
+        entries = list(iter_file(os.path.join(self.builtin, 'sqli.txt')))
+        self.assertEqual([e.text for e in entries], ["' OR 1=1 --", "# starts with a hash"])
+        self.assertEqual(entries[0].tags, {'content', 'mysql'})
+        self.assertEqual(self.registry.load('sqli', ['mysql']), ["' OR 1=1 --"])
+
+    def test_extra_files_are_appended_and_deduplicated(self):
+        self.write(self.builtin, 'ssh_passwords.txt', "admin\nroot\nadmin\n")
+        self.write(self.extra, 'ssh_passwords_leaked.txt', "root\nhunter2")
+        self.write(self.extra, 'xss_more.txt', "<b>\n")
+        self.assertEqual(self.registry.load('ssh_passwords'), ['admin', 'root', 'hunter2'])
+        self.assertEqual(list(self.registry.iter('ssh_passwords', dedup=False)),
+                         ['admin', 'root', 'admin', 'root', 'hunter2'])
+        view = self.registry.view('ssh_passwords')
+        self.assertEqual(len(view), 3)
+        self.assertEqual(list(view), list(view))
+        with self.assertRaises(KeyError):
+            self.registry.load('nothing')
+
+    def test_entries_are_streamed(self):
+        self.write(self.builtin, 'ssh_passwords.txt', "".join(f"password{i}\n" for i in range(100000)))
+        stream = self.registry.iter('ssh_passwords')
+        self.assertEqual([next(stream) for _ in range(3)], ['password0', 'password1', 'password2'])
+        stream.close()
+
+    def test_fingerprint_set_grows_past_its_capacity(self):
+        seen = FingerprintSet(10)
+        self.assertTrue(all(seen.add(f"item{i}") for i in range(1000)))
+        self.assertFalse(any(seen.add(f"item{i}") for i in range(1000)))
+        self.assertEqual(seen.count, 1000)
+
+    def test_builtin_corpora(self):
+        self.assertIn("' OR '1'='1", content_payloads())
+        self.assertNotIn("' AND 1=CONVERT(int, @@version) --", content_payloads('mysql'))
+        self.assertEqual(time_payloads('postgresql'), ["' AND 1=(SELECT 1 FROM PG_SLEEP({delay})) --"])
+        self.assertTrue(all('{delay}' in payload for payload in time_payloads()))
+        self.assertIn(('anonymous', 'anonymous'), list(FTPBruteForceSimulator().default_wordlist))
+        self.assertEqual(len(corpus_registry.load('xss', ['attribute'])), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import threading
+import unittest
+from urllib.parse import parse_qs, parse_qsl, urlsplit
+import requests
+from app.modules.crawler import Crawler
+from app.modules.results import ERROR
+from app.modules.sqli_simulator import SQLiSimulator
+from app.modules.xss_simulator import XSSSimulator
+
+PAGES = {
+    '/': ('text/html', """
+        <a href="/search">Search</a> <a href="/item?id=1">Item</a> <a href="/item?id=2">Item 2</a>
+        <a href="http://elsewhere.example/">Off site</a> <a href="/logo.png">Logo</a>
+        <a href="mailto:admin@lab.example">Mail</a> <script src="/app.js"></script>"""),
+    '/search': ('text/html', """
+        <form action="/search" method="get"><input name="q"><input type="submit" name="go" value="Go"></form>
+        <a href="/deep">Deeper</a>"""),
+    '/item': ('text/html', """
+        <form action="/comment" method="post"><textarea name="body"></textarea>
+        <input type="hidden" name="csrf" value="t0k3n"></form>
+        <form action="/comment" method="post"><textarea name="body"></textarea>
+        <input type="hidden" name="csrf" value="t0k3n"></form>"""),
+    '/app.js': ('application/javascript', "fetch('/api/products?category=1&sort=asc').then(r => r.json())"),
+    '/deep': ('text/html', '<a href="/deeper">Deeper still</a>'),
+}
+
+class Response:
+    def __init__(self, url, content_type, text):
+        self.url = url
+        self.headers = {'Content-Type': content_type}
+        self.text = text
+        self.status_code = 200
+        self.content = text.encode()
+
+class FakeSite:
+    """Serves PAGES on lab.example and reflects the q parameter of /search"""
+    def __init__(self):
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def request(self, method, url, data=None, **kwargs):
+        parts = urlsplit(url)
+        if isinstance(data, str):
+            data = dict(parse_qsl(data, keep_blank_values=True))
+        with self.lock:
+            self.fetched.append((method, parts.path, data))
+        if parts.netloc != 'lab.example':
+            raise requests.exceptions.ConnectionError(f"unexpected host {parts.netloc}")
+        if parts.path == '/search' and parts.query:
+            return Response(url, 'text/html', f"Results for {parse_qs(parts.query, keep_blank_values=True)['q'][0]}")
+        content_type, text = PAGES.get(parts.path, ('text/html', 'not found'))
+        return Response(url, content_type, text)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+class BrokenFormSite(FakeSite):
+    """Drops every connection to the comment form"""
+    posts = 0
+
+    def request(self, method, url, data=None, **kwargs):
+        if method == 'POST':
+            self.posts += 1
+            raise requests.exceptions.ConnectionError("Connection reset by peer")
+        return super().request(method, url, data=data, **kwargs)
+
+class TestCrawler(unittest.TestCase):
+    def test_points_are_found_and_deduplicated(self):
+        site = FakeSite()
+        result = Crawler(site, max_depth=2).crawl("http://lab.example/")
+
+        points = {(p.method, urlsplit(p.url).path, p.params, p.source) for p in result.points}
+        self.assertEqual(points, {
+            ('get', '/search', ('q',), 'form'),
+            ('get', '/item', ('id',), 'query'),
+            ('post', '/comment', ('body', 'csrf'), 'form'),
+            ('get', '/api/products', ('category', 'sort'), 'script'),
+        })
+        fetched = [path for _, path, _ in site.fetched]
+        # /item?id=2 is the same page as /item?id=1; images and other origins are skipped
+        self.assertEqual(fetched.count('/item'), 1)
+        self.assertNotIn('/logo.png', fetched)
+        # /deeper is three links away
+        self.assertNotIn('/deeper', fetched)
+        self.assertFalse(result.truncated)
+
+    def test_page_budget_and_shared_results(self):
+        site = FakeSite()
+        crawler = Crawler(site, max_depth=5, max_pages=3)
+        result = crawler.crawl("http://lab.example/")
+
+        self.assertEqual(len(result.pages), 3)
+        self.assertTrue(result.truncated)
+        self.assertIs(crawler.crawl("http://lab.example/"), result)
+        self.assertEqual(len(site.fetched), 3)
+
+    def test_xss_tests_crawled_points(self):
+        site = FakeSite()
+        simulator = XSSSimulator(http_client=site, crawler=Crawler(site))
+        report = simulator.test_xss("http://lab.example/")
+
+        self.assertIsNone(report.error)
+        self.assertEqual(report.meta['crawl']['points'], 4)
+        reflected = {f.location for f in report.findings}
+        self.assertEqual(reflected, {"q (GET http://lab.example/search)"})
+        # Hidden fields keep their default value when another field is injected
+        posts = [data for method, _, data in site.fetched if method == 'POST']
+        self.assertEqual(len(posts), 2 * len(simulator.payloads))
+        self.assertTrue(all(data['csrf'] == 't0k3n' for data in posts if data['body'] in simulator.payloads))
+
+    def test_sqli_tests_every_crawled_parameter(self):
+        site = FakeSite()
+        simulator = SQLiSimulator(http_client=site, crawler=Crawler(site))
+        simulator.time_payloads = []
+        report = simulator.test_endpoint("http://lab.example/")
+
+        self.assertIsNone(report.error)
+        self.assertEqual(len(report.meta['points']), 4)
+        self.assertNotIn('parameter', report.meta)
+        # body and csrf each get every payload, after one baseline POST
+        per_param = len(simulator.payloads) + 2 * len(simulator.boolean_pairs)
+        posts = [data for method, _, data in site.fetched if method == 'POST']
+        self.assertEqual(len(posts), 1 + 2 * per_param)
+        self.assertEqual(sum(data['csrf'] == 't0k3n' for data in posts), 1 + per_param)
+
+    def test_sqli_baseline_error_skips_only_that_point(self):
+        site = BrokenFormSite()
+        simulator = SQLiSimulator(http_client=site, crawler=Crawler(site))
+        simulator.time_payloads = []
+        report = simulator.test_endpoint("http://lab.example/")
+
+        self.assertIsNone(report.error)
+        [error] = [f for f in report.findings if f.severity == ERROR]
+        self.assertEqual(error.location, "body (POST http://lab.example/comment)")
+        # Only the form's baseline was attempted; the GET points were still tested
+        self.assertEqual(site.posts, 1)
+        searches = [path for method, path, _ in site.fetched if method == 'GET' and path == '/search']
+        self.assertGreater(len(searches), len(simulator.payloads))
+
+if __name__ == '__main__':
+    unittest.main()
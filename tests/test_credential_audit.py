@@ -0,0 +1,79 @@
+import threading
+import time
+import unittest
+from collections import Counter
+from app.modules.credential_audit import AuditJob, AuditPolicy, CredentialAuditor
+
+class Recorder:
+    """A check that takes latency seconds and records when and where it ran"""
+    def __init__(self, latency=0.02, valid=()):
+        self.latency = latency
+        self.valid = set(valid)
+        self.lock = threading.Lock()
+        self.starts = []
+        self.running = Counter()
+        self.peak_per_host = 0
+        self.peak = 0
+
+    def job(self, host, credentials, **kwargs):
+        def check(username, password):
+            with self.lock:
+                self.starts.append((host, time.monotonic()))
+                self.running[host] += 1
+                self.peak_per_host = max(self.peak_per_host, self.running[host])
+                self.peak = max(self.peak, sum(self.running.values()))
+            time.sleep(self.latency)
+            with self.lock:
+                self.running[host] -= 1
+            ok = (username, password) in self.valid
+            return ok, "Authentication successful" if ok else "Authentication failed"
+        return AuditJob(host, 'ssh', 22, iter(credentials), check, **kwargs)
+
+class TestCredentialAuditor(unittest.TestCase):
+    def test_hosts_run_in_parallel_with_spacing_per_host(self):
+        recorder = Recorder()
+        auditor = CredentialAuditor(AuditPolicy(min_spacing=0.1, jitter=0), max_workers=4)
+        jobs = [recorder.job(f"10.0.0.{i}", [('root', f"pw{n}") for n in range(3)]) for i in range(4)]
+
+        start = time.monotonic()
+        results = list(auditor.run(jobs))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sum(attempt is not None for _, attempt in results), 12)
+        self.assertEqual(sum(attempt is None for _, attempt in results), 4)
+        # Serially, the spacing alone would take 12 x 0.1 s
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(recorder.peak_per_host, 1)
+        self.assertGreater(recorder.peak, 1)
+        for host in {host for host, _ in recorder.starts}:
+            starts = [at for h, at in recorder.starts if h == host]
+            self.assertTrue(all(b - a >= 0.095 for a, b in zip(starts, starts[1:])))
+
+    def test_accounts_stop_short_of_the_lockout_threshold(self):
+        recorder = Recorder(latency=0)
+        auditor = CredentialAuditor(AuditPolicy(min_spacing=0, lockout_threshold=3))
+        job = recorder.job('10.0.0.1', [('admin', 'a'), ('admin', 'b'), ('root', 'a'), ('admin', 'c'), ('admin', 'd')])
+
+        tried = [(a.username, a.password) for _, a in auditor.run([job]) if a is not None]
+        self.assertEqual(tried, [('admin', 'a'), ('admin', 'b'), ('root', 'a')])
+        self.assertEqual(job.report_meta()['audit'], {'attempts': 3, 'skipped': 2, 'stopped': None})
+        # The failures are remembered for later runs against the same host
+        again = recorder.job('10.0.0.1', [('admin', 'e'), ('root', 'b')])
+        tried = [(a.username, a.password) for _, a in auditor.run([again]) if a is not None]
+        self.assertEqual(tried, [('root', 'b')])
+
+    def test_host_budget_and_success_end_jobs(self):
+        recorder = Recorder(latency=0, valid=[('root', 'pw1')])
+        closed = []
+        auditor = CredentialAuditor(AuditPolicy(host_budget=3, min_spacing=0))
+        found = recorder.job('10.0.0.1', [('root', f"pw{n}") for n in range(5)], close=lambda: closed.append('found'))
+        spent = recorder.job('10.0.0.2', [('admin', f"pw{n}") for n in range(5)])
+
+        results = list(auditor.run([found, spent]))
+        self.assertEqual([a.success for job, a in results if job is found and a], [False, True])
+        self.assertEqual(closed, ['found'])
+        self.assertEqual(spent.attempts, 3)
+        self.assertEqual(spent.stopped, "host budget of 3 attempts reached")
+
+if __name__ == '__main__':
+    unittest.main()
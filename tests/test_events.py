@@ -0,0 +1,38 @@
+import unittest
+from app.modules.events import LogBus
+
+class TestLogBus(unittest.TestCase):
+    def setUp(self):
+        self.emitted = []
+        self.bus = LogBus(flush_interval=60, batch_size=1000, max_queue=3,
+                          emit=lambda event, data, to=None: self.emitted.append((event, data, to)))
+
+    def test_log_lines_are_batched_per_room(self):
+        self.bus.publish('log_message', {'message': 'a'}, 'job:1')
+        self.bus.publish('log_message', {'message': 'b'}, 'job:2')
+        self.bus.publish('log_message', {'message': 'c'}, 'job:1')
+        self.bus.flush()
+
+        batches = {to: data['messages'] for event, data, to in self.emitted}
+        self.assertEqual(batches, {'job:1': ['a', 'c'], 'job:2': ['b']})
+        self.assertEqual(self.bus.stats['batches'], 2)
+
+    def test_control_events_follow_pending_logs(self):
+        self.bus.publish('log_message', {'message': 'scanning'}, 'job:1')
+        self.bus.publish('scan_complete', {'message': 'done'}, 'job:1')
+        self.bus.flush()
+
+        self.assertEqual([event for event, _, _ in self.emitted], ['log_batch', 'scan_complete'])
+
+    def test_overflow_is_dropped_and_counted(self):
+        for i in range(5):
+            self.bus.publish('log_message', {'message': str(i)}, 'job:1')
+        self.bus.flush()
+
+        event, data, to = self.emitted[0]
+        self.assertEqual(data['messages'], ['0', '1', '2'])
+        self.assertEqual(data['dropped'], 2)
+        self.assertEqual(self.bus.stats['dropped'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,57 @@
+import ftplib
+import io
 import unittest
-from app.modules.ftp_bruteforce import FTPBruteForceSimulator
+from contextlib import redirect_stdout
+from unittest import mock
+from app.modules.credential_audit import credential_auditor
+from app.modules.ftp_bruteforce import FTPBruteForceSimulator, capture_listing
+from app.modules.health import host_health
+from app.modules.report_text import render_text
+from app.modules.results import ScanReport
+
+class FakeFTP:
+    """Accepts admin:secret, hangs up after max_fails rejected logins and lists a huge directory"""
+    max_fails = 3
+    instances = []
+
+    def __init__(self):
+        self.fails = 0
+        self.closed = False
+        self.instances.append(self)
+
+    def connect(self, host, port, timeout=None):
+        return "220 ready"
+
+    def login(self, user, passwd):
+        if self.closed:
+            raise EOFError()
+        if (user, passwd) == ('admin', 'secret'):
+            return "230 Login successful."
+        self.fails += 1
+        self.closed = self.fails >= self.max_fails
+        raise ftplib.error_perm("530 Login incorrect.")
+
+    def getwelcome(self):
+        return "220 ready"
+
+    def sendcmd(self, cmd):
+        return "215 UNIX Type: L8"
+
+    def retrlines(self, cmd, callback):
+        for i in range(100000):
+            callback(f"-rw-r--r--    1 ftp      ftp          1024 Jan 01 00:00 file{i}.bin")
+        return "226 Directory send OK."
+
+    def quit(self):
+        return "221 Goodbye."
+
+    def close(self):
+        self.closed = True
 
 class TestFTPBruteForce(unittest.TestCase):
     def setUp(self):
         self.ftp_simulator = FTPBruteForceSimulator()
+        host_health.reset()
         
     def test_test_credentials(self):
         # Test with invalid credentials (should return False)
@@ -16,10 +64,17 @@ class TestFTPBruteForce(unittest.TestCase):
         self.assertIn("Failed", message)
         
     def test_simulate_bruteforce(self):
-        # Test bruteforce simulation (should return results string)
+        # Test bruteforce simulation (should return a report with one attempt per pair,
+        # unless the host cannot be reached and the remaining pairs are skipped)
         results = self.ftp_simulator.simulate_bruteforce("example.com")
-        self.assertIsInstance(results, str)
-        self.assertIn("FTP Security Test", results)
+        self.assertIsInstance(results, ScanReport)
+        stopped = results.meta['audit']['stopped']
+        if stopped:
+            self.assertIn("unreachable", stopped)
+            self.assertLess(len(results.attempts), len(self.ftp_simulator.default_wordlist))
+        else:
+            self.assertEqual(len(results.attempts), len(self.ftp_simulator.default_wordlist))
+        self.assertIn("FTP Security Test", render_text(results))
         
     def test_default_wordlist(self):
         # Test default wordlist exists
@@ -27,5 +82,29 @@ class TestFTPBruteForce(unittest.TestCase):
         # Test wordlist entries are tuples of (username, password)
         self.assertTrue(all(isinstance(x, tuple) for x in self.ftp_simulator.default_wordlist))
         
+    def test_failed_logins_share_a_control_connection(self):
+        FakeFTP.instances = []
+        credential_auditor.reset()
+        wordlist = [('admin', 'admin'), ('ftp', 'ftp'), ('test', 'test'), ('root', 'root'), ('admin', 'secret')]
+        output = io.StringIO()
+        with mock.patch.object(ftplib, 'FTP', FakeFTP), redirect_stdout(output):
+            report = self.ftp_simulator.simulate_bruteforce("lab.example", custom_wordlist=wordlist, delay=False)
+
+        self.assertEqual([a.success for a in report.attempts], [False] * 4 + [True])
+        # The server hung up after the third failure; the fourth pair went to a new connection
+        self.assertEqual(len(FakeFTP.instances), 2)
+        self.assertEqual(report.meta['connections']['handshakes'], 2)
+        self.assertEqual(report.meta['connections']['handshakes_saved'], 3)
+        message = report.attempts[-1].message
+        self.assertIn("Directory listing access confirmed (first 20 entries)", message)
+        self.assertIn("file19.bin", message)
+        self.assertNotIn("file20.bin", message)
+        self.assertEqual(output.getvalue(), "")
+
+    def test_listing_byte_cap(self):
+        entries, truncated = capture_listing(FakeFTP(), max_entries=100, max_bytes=200)
+        self.assertTrue(truncated)
+        self.assertEqual(len(entries), 3)
+
 if __name__ == '__main__':
     unittest.main()
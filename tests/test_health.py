@@ -0,0 +1,106 @@
+import socket
+import unittest
+from unittest import mock
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from app.modules.credential_audit import credential_auditor
+from app.modules.health import CLOSED, HALF_OPEN, OPEN, HealthTracker, HostUnreachable, host_health
+from app.modules.http_client import HTTPClient, connect_failed
+from app.modules.report_text import render_text
+from app.modules.sqli_simulator import SQLiSimulator
+from app.modules.ssh_bruteforce import SSHBruteForceSimulator
+
+def refused(url):
+    return requests.exceptions.ConnectionError(
+        MaxRetryError(None, url, NewConnectionError(None, "Failed to establish a new connection: refused")))
+
+class Response:
+    status_code = 200
+    text = "<html>Item 1</html>"
+    content = text.encode()
+
+class DyingSession:
+    """Answers the first request, then refuses every connection"""
+    def __init__(self):
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        if self.calls > 1:
+            raise refused(url)
+        return Response()
+
+class TestHealthTracker(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.health = HealthTracker(failure_threshold=2, cooldown=10, clock=lambda: self.now)
+
+    def test_circuit_opens_and_half_opens_after_cooldown(self):
+        for _ in range(2):
+            self.assertEqual(self.health.state('lab.example', 80), CLOSED)
+            self.health.record_failure('lab.example', 80, ConnectionRefusedError())
+        self.assertEqual(self.health.state('lab.example', 80), OPEN)
+        self.assertRaises(HostUnreachable, self.health.before_connect, 'lab.example', 80)
+        # Other ports and hosts are unaffected
+        self.health.before_connect('lab.example', 22)
+
+        self.now = 10
+        self.assertEqual(self.health.state('lab.example', 80), HALF_OPEN)
+        self.health.before_connect('lab.example', 80)
+        # Only one trial connection at a time
+        self.assertRaises(HostUnreachable, self.health.before_connect, 'lab.example', 80)
+        self.health.record_failure('lab.example', 80, socket.timeout())
+        self.assertEqual(self.health.state('lab.example', 80), OPEN)
+
+        self.now = 20
+        with self.health.guard('lab.example', 80):
+            pass
+        self.assertEqual(self.health.state('lab.example', 80), CLOSED)
+
+    def test_only_failed_connects_count(self):
+        for error in (requests.exceptions.ReadTimeout(), requests.exceptions.ConnectionError("reset by peer")):
+            self.assertFalse(connect_failed(error))
+        self.assertTrue(connect_failed(refused("http://lab.example/")))
+        self.assertTrue(connect_failed(requests.exceptions.ConnectTimeout()))
+
+        client = HTTPClient(health=self.health)
+        session = DyingSession()
+        session.calls = 1
+        with mock.patch.object(client, 'session_for', return_value=session):
+            for _ in range(2):
+                self.assertRaises(requests.exceptions.ConnectionError, client.get, "http://lab.example/")
+            self.assertRaises(HostUnreachable, client.get, "http://lab.example/")
+        self.assertEqual(session.calls, 3)
+
+    def test_sqli_stops_at_an_unreachable_target(self):
+        client = HTTPClient(health=self.health)
+        session = DyingSession()
+        simulator = SQLiSimulator(http_client=client)
+        simulator.time_payloads = []
+        with mock.patch.object(client, 'session_for', return_value=session):
+            report = simulator.test_endpoint("http://dying.example/item?id=1")
+
+        self.assertIsNone(report.error)
+        # The baseline and two refused payloads; nothing is sent once the circuit opens
+        self.assertEqual(session.calls, 3)
+        self.assertEqual(report.findings[-1].title, "Target unreachable")
+        self.assertIn("Target unreachable, remaining tests skipped", render_text(report))
+
+class TestUnreachableServices(unittest.TestCase):
+    def setUp(self):
+        host_health.reset()
+        credential_auditor.reset()
+
+    def test_ssh_audit_stops_when_the_host_is_unreachable(self):
+        simulator = SSHBruteForceSimulator()
+        passwords = [f"password{i}" for i in range(10)]
+        with mock.patch.object(socket, 'create_connection', side_effect=socket.timeout("timed out")) as connect:
+            report = simulator.simulate_bruteforce("dead.example", "root", passwords, delay=0)
+
+        self.assertEqual(connect.call_count, host_health.failure_threshold)
+        self.assertEqual(len(report.attempts), host_health.failure_threshold)
+        self.assertIn("unreachable", report.meta['audit']['stopped'])
+        self.assertIn("Stopped early: dead.example:22 unreachable", render_text(report))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from app.modules.health import HealthTracker
+from app.modules.http_client import HTTPClient
+
+class CookieHandler(BaseHTTPRequestHandler):
+    """Sets a session cookie and echoes back the Cookie header it was sent"""
+    def do_GET(self):
+        body = (self.headers.get('Cookie') or '').encode()
+        self.send_response(200)
+        self.send_header('Set-Cookie', 'session=job-a; Path=/')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestHTTPClient(unittest.TestCase):
+    def setUp(self):
+        self.client = HTTPClient(pool_maxsize=7, retries=3, timeout=4, health=HealthTracker())
+        self.addCleanup(self.client.close)
+
+    def test_one_session_per_scheme_and_host(self):
+        session = self.client.session_for("http://Lab.example/login")
+        self.assertIs(self.client.session_for("http://lab.example/search?q=1"), session)
+        self.assertIsNot(self.client.session_for("https://lab.example/"), session)
+        self.assertIsNot(self.client.session_for("http://lab.example:8080/"), session)
+        self.assertIsNot(self.client.session_for("http://other.example/"), session)
+
+    def test_pool_and_retry_policy(self):
+        adapter = self.client.session_for("https://lab.example/").get_adapter("https://lab.example/")
+        retry = adapter.max_retries
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual((retry.total, retry.connect, retry.status), (3, 3, 3))
+        self.assertFalse(retry.read)
+        self.assertEqual(tuple(retry.status_forcelist), (502, 503, 504))
+        self.assertFalse(retry.raise_on_status)
+
+    def test_default_timeout(self):
+        session = self.client.session_for("http://lab.example/")
+        with mock.patch.object(session, 'request') as request:
+            self.client.get("http://lab.example/")
+            self.client.get("http://lab.example/slow", timeout=30)
+        self.assertEqual([call.kwargs['timeout'] for call in request.call_args_list], [4, 30])
+
+    def test_cookies_do_not_persist_between_requests(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), CookieHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_port}/"
+
+        first = self.client.get(url)
+        second = self.client.get(url)
+        explicit = self.client.get(url, cookies={'session': 'job-b'})
+
+        self.assertEqual(first.cookies.get('session'), 'job-a')
+        self.assertEqual(second.text, '')
+        self.assertEqual(explicit.text, 'session=job-b')
+        self.assertEqual(len(self.client.session_for(url).cookies), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from app.modules.page_parser import BACKENDS, etree, parse_page
+
+PAGE = """<html><head><script src="/static/app.js"></script>
+<script>fetch("/api/items?id=1")</script></head><body>
+<a href="/item?id=1">Item</a><!-- <a href="/commented-out">old</a> -->
+<form action="/search"><input name="q" value="shoes"><input type="submit" name="go" value="Go"></form>
+<form action="/comment" method="POST"><textarea name="body">Hi &amp; bye</textarea>
+<select name="rating"><option value="1">1<option value="5" selected>5</select>
+<select name="lang"><option>en</option><option>de</option></select><input value="no name"></form>
+</body></html>"""
+
+class TestParsePage(unittest.TestCase):
+    def backends(self):
+        return [backend for backend in BACKENDS if backend != 'lxml' or etree is not None]
+
+    def test_backends_extract_the_same_page(self):
+        for backend in self.backends():
+            with self.subTest(backend=backend):
+                page = parse_page(PAGE, backend)
+                self.assertEqual(page.links, ["/item?id=1"])
+                self.assertEqual(page.scripts, ["/static/app.js"])
+                self.assertEqual(page.inline_scripts, ['fetch("/api/items?id=1")'])
+                search, comment = page.forms
+                self.assertEqual((search.action, search.method), ("/search", "get"))
+                self.assertEqual([(f.name, f.type, f.value) for f in search.fields],
+                                 [("q", "text", "shoes"), ("go", "submit", "Go")])
+                self.assertEqual(comment.method, "post")
+                self.assertEqual({f.name: f.value for f in comment.fields},
+                                 {"body": "Hi & bye", "rating": "5", "lang": "en"})
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            parse_page(PAGE, "regex")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+import requests
+from app.modules.payload_engine import PayloadEngine, Probe
+
+class FakeHTTPClient:
+    """Records how many requests are in flight at once"""
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.sent = 0
+        self.lock = threading.Lock()
+
+    def request(self, method, url, data=None):
+        with self.lock:
+            self.in_flight += 1
+            self.sent += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.02)
+        with self.lock:
+            self.in_flight -= 1
+        if url.endswith('fail'):
+            raise requests.exceptions.ConnectionError("refused")
+        return url
+
+class TestPayloadEngine(unittest.TestCase):
+    def probes(self, count):
+        return [Probe('GET', f"http://target/?id={i}", str(i)) for i in range(count)]
+
+    def test_sequential_is_default(self):
+        client = FakeHTTPClient()
+        results = PayloadEngine(client).run(self.probes(5))
+        self.assertEqual(client.peak, 1)
+        self.assertEqual([r.response for r in results], [f"http://target/?id={i}" for i in range(5)])
+
+    def test_async_keeps_order_and_respects_host_limit(self):
+        client = FakeHTTPClient()
+        results = PayloadEngine(client, mode='async', concurrency=3).run(self.probes(12))
+        self.assertEqual(client.peak, 3)
+        self.assertEqual([r.probe.payload for r in results], [str(i) for i in range(12)])
+
+    def test_request_errors_are_captured(self):
+        probes = [Probe('GET', "http://target/ok", 'a'), Probe('GET', "http://target/fail", 'b')]
+        results = PayloadEngine(FakeHTTPClient(), mode='async').run(probes)
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, requests.exceptions.ConnectionError)
+
+    def test_async_stops_sending_when_the_caller_stops(self):
+        client = FakeHTTPClient()
+        results = PayloadEngine(client, mode='async', concurrency=2).iter_results(self.probes(40))
+        next(results)
+        results.close()
+        time.sleep(0.1)
+        self.assertLess(client.sent, 10)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            PayloadEngine(FakeHTTPClient(), mode='turbo')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from unittest import mock
+from app.modules.registry import ScannerRegistry
+from app.modules.ssh_bruteforce import SSHBruteForceSimulator
+
+class FakePortScanner:
+    created = 0
+
+    def __init__(self):
+        FakePortScanner.created += 1
+        self._scan_result = {}
+        self._nmap_last_output = 'Nmap version 7.94'
+
+class TestScannerRegistry(unittest.TestCase):
+    def test_nmap_is_probed_once(self):
+        registry = ScannerRegistry()
+        with mock.patch('app.modules.registry.nmap.PortScanner', FakePortScanner):
+            first = registry.port_scanner()
+            first._scan_result = {'scan': {'10.0.0.1': {}}}
+            second = registry.port_scanner()
+
+        self.assertEqual(FakePortScanner.created, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(second._scan_result, {})
+        self.assertEqual(registry.stats['nmap_probes'], 1)
+        self.assertEqual(registry.stats['port_scanners'], 2)
+
+    def test_shared_modules_are_built_once(self):
+        registry = ScannerRegistry()
+        self.assertIs(registry.shared(SSHBruteForceSimulator), registry.shared(SSHBruteForceSimulator))
+
+if __name__ == '__main__':
+    unittest.main()
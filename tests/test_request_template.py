@@ -0,0 +1,50 @@
+import json
+import unittest
+from app.modules.request_template import RequestBuilder
+
+PAYLOAD = "' OR 'a'='a' -- &x=1#"
+
+class TestRequestBuilder(unittest.TestCase):
+    def test_query_keeps_other_parameters_and_encodes(self):
+        builder = RequestBuilder("http://lab.example/items?cat=2&id=7&sort=asc#top")
+        probe = builder.template('query', 'id').probe(PAYLOAD)
+        self.assertEqual(probe.url, "http://lab.example/items?cat=2&id=%27%20OR%20%27a%27%3D%27a%27%20--%20%26x%3D1%23"
+                                    "&sort=asc")
+        self.assertEqual(builder.template('query', 'new').probe("1").url,
+                         "http://lab.example/items?cat=2&id=7&sort=asc&new=1")
+        self.assertEqual(builder.template('query', 'id', 'double_url').probe("<").url,
+                         "http://lab.example/items?cat=2&id=%253C&sort=asc")
+
+    def test_form_and_json_bodies(self):
+        form = RequestBuilder("http://lab.example/comment", 'POST', data={'body': '', 'csrf': 't0k3n'})
+        probe = form.template('form', 'body').probe("a&b=c")
+        self.assertEqual((probe.method, probe.data), ('POST', "body=a%26b%3Dc&csrf=t0k3n"))
+        self.assertEqual(probe.headers['Content-Type'], 'application/x-www-form-urlencoded')
+
+        api = RequestBuilder("http://lab.example/api", 'POST', json_body={'user': {'name': 'bob'}, 'page': 1})
+        probe = api.template('json', 'user.name').probe('x" OR "1"="1')
+        self.assertEqual(json.loads(probe.data), {'user': {'name': 'x" OR "1"="1'}, 'page': 1})
+
+    def test_headers_and_cookies_cannot_be_split(self):
+        builder = RequestBuilder("http://lab.example/", cookies={'sid': 'abc', 'lang': 'en'})
+        probe = builder.template('header', 'User-Agent').probe("x\r\nX-Injected: 1")
+        self.assertEqual(probe.headers, {'User-Agent': "x%0D%0AX-Injected: 1", 'Cookie': "sid=abc; lang=en"})
+        probe = builder.template('cookie', 'sid', 'raw').probe("1; admin=true")
+        self.assertEqual(probe.headers, {'Cookie': "sid=1%3B admin=true; lang=en"})
+        self.assertEqual(builder.parameters(), [('cookie', 'sid'), ('cookie', 'lang')])
+
+    def test_original_values(self):
+        builder = RequestBuilder("http://lab.example/items?id=7", 'POST', json_body={'user': {'name': 'bob'}},
+                                 cookies={'session': 'abc'})
+        self.assertEqual(builder.value('query', 'id'), '7')
+        self.assertEqual(builder.value('json', 'user.name'), 'bob')
+        self.assertEqual(builder.value('cookie', 'session'), 'abc')
+        self.assertIsNone(builder.value('query', 'missing'))
+        self.assertIsNone(builder.value('json', 'user'))
+
+    def test_unknown_location(self):
+        with self.assertRaises(ValueError):
+            RequestBuilder("http://lab.example/").template('path', 'id')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import app.modules.attack_chain as attack_chain
+from app.modules.report_text import render_text
+from app.modules.results import ScanReport, HostResult, PortResult, Finding, AuthAttempt, HIGH
+from app.modules.store import ScanStore
+
+def discovery(target, ports):
+    report = ScanReport('vuln_scan', target)
+    report.add(HostResult(target, '10.0.0.5', ports))
+    return report
+
+def ftp_report(target, port=21, delay=True):
+    report = ScanReport('ftp_brute', target, meta={'port': port})
+    report.add(AuthAttempt('ftp', 'admin', 'admin', True, "Success", port))
+    return report
+
+def sqli_report(target):
+    report = ScanReport('sqli', target)
+    report.add(Finding("SQL Error detected", HIGH, payload="'", location='id'))
+    return report
+
+class TestIncrementalChain(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = ScanStore(os.path.join(tmp.name, 'scans.db'))
+        self.addCleanup(self.store.close)
+
+    def run_chain(self, ports, incremental, stealth_mode=False):
+        with mock.patch.object(attack_chain, 'VulnerabilityScanner'):
+            chain = attack_chain.ChainedAttackSimulator(store=self.store)
+        chain.vuln_scanner.scan_target.side_effect = lambda target: discovery(target, ports)
+        chain.ftp_simulator = mock.Mock()
+        chain.ftp_simulator.simulate_bruteforce.side_effect = ftp_report
+        chain.ssh_simulator = mock.Mock()
+        chain.ssh_simulator.simulate_bruteforce.side_effect = lambda target, user, delay=None: ScanReport('ssh_brute', target)
+        chain.sqli_simulator = mock.Mock()
+        chain.sqli_simulator.test_endpoint.side_effect = sqli_report
+        chain.xss_simulator = mock.Mock()
+        chain.xss_simulator.test_xss.side_effect = lambda target: ScanReport('xss', target)
+
+        report = chain.run_chain('lab.example', stealth_mode=stealth_mode, incremental=incremental, retest_ttl=3600)
+        self.store.save(report)
+        return chain, report
+
+    def test_only_changed_services_are_retested(self):
+        self.run_chain([PortResult(21, 'open', 'ftp', 'vsftpd', '3.0.3'),
+                        PortResult(22, 'open', 'ssh', 'OpenSSH', '8.9')], incremental=False)
+
+        chain, report = self.run_chain([PortResult(21, 'open', 'ftp', 'vsftpd', '3.0.3'),
+                                        PortResult(22, 'open', 'ssh', 'OpenSSH', '9.6'),
+                                        PortResult(80, 'open', 'http', 'nginx')], incremental=True)
+
+        chain.ftp_simulator.simulate_bruteforce.assert_not_called()
+        self.assertEqual(chain.ssh_simulator.simulate_bruteforce.call_count, 3)
+        chain.sqli_simulator.test_endpoint.assert_called_once_with('lab.example')
+
+        diff = report.meta['diff']
+        self.assertEqual(diff['new_ports'], [80])
+        self.assertEqual(diff['changed_ports'], [22])
+        self.assertEqual(diff['closed_ports'], [])
+        self.assertEqual(diff['reused_ports'], [21])
+        self.assertEqual([f['title'] for f in diff['new_findings']], ["SQL Error detected"])
+        self.assertEqual(diff['resolved_findings'], [])
+        reused = [child for child in report.children if 'reused_from' in child.meta]
+        self.assertEqual([child.scan_type for child in reused], ['ftp_brute'])
+        self.assertIn("Changes Since Previous Run", render_text(report))
+
+    def test_closed_ports_resolve_their_findings(self):
+        self.run_chain([PortResult(21, 'open', 'ftp', 'vsftpd', '3.0.3')], incremental=False)
+        chain, report = self.run_chain([], incremental=True)
+
+        diff = report.meta['diff']
+        self.assertEqual(diff['closed_ports'], [21])
+        self.assertEqual([f['title'] for f in diff['resolved_findings']], ["Weak FTP credentials"])
+
+    def test_first_incremental_run_tests_everything(self):
+        chain, report = self.run_chain([PortResult(21, 'open', 'ftp', 'vsftpd', '3.0.3')], incremental=True)
+        chain.ftp_simulator.simulate_bruteforce.assert_called_once()
+        self.assertNotIn('diff', report.meta)
+
+    def test_stealth_mode_spaces_credential_attempts(self):
+        ports = [PortResult(21, 'open', 'ftp', 'vsftpd', '3.0.3'), PortResult(22, 'open', 'ssh', 'OpenSSH', '9.6')]
+        chain, _ = self.run_chain(ports, incremental=False)
+        self.assertEqual(chain.ftp_simulator.simulate_bruteforce.call_args.kwargs['delay'], True)
+        self.assertIsNone(chain.ssh_simulator.simulate_bruteforce.call_args.kwargs['delay'])
+
+        chain, _ = self.run_chain(ports, incremental=False, stealth_mode=True)
+        delay = chain.stealth.delay_between_requests
+        self.assertGreaterEqual(delay, 1.0)
+        self.assertEqual(chain.ftp_simulator.simulate_bruteforce.call_args.kwargs['delay'], delay)
+        self.assertEqual([call.kwargs['delay'] for call in chain.ssh_simulator.simulate_bruteforce.call_args_list],
+                         [delay] * 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from urllib.parse import unquote
+from app.modules.response_diff import ResponseComparer, find_errors, fingerprint, similarity
+from app.modules.sqli_simulator import SQLiSimulator
+
+PAGE = """<html><body><h1>Products</h1>
+<input type="hidden" name="csrf" value="{token}">
+<p>Rendered at {time} for request {request}</p>
+<ul>{items}</ul></body></html>"""
+
+def page(token="a3f9c2e1d4b5a6c7e8f90123456789ab", time="2024-05-01T10:00:00Z", request="1714557600",
+         items=10, extra=""):
+    rows = "".join(f"<li>Product {i} - in stock</li>" for i in range(items))
+    return PAGE.format(token=token, time=time, request=request, items=rows) + extra
+
+class Response:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+        self.content = text.encode()
+
+class BooleanTarget:
+    """Lists every product unless the injected condition is false"""
+    def get(self, url, **kwargs):
+        url = unquote(url)
+        return Response(page(items=0 if "1'='2" in url or "1=2" in url else 10, extra=url))
+
+    def request(self, method, url, **kwargs):
+        return self.get(url)
+
+class FormTarget:
+    """A safe POST endpoint; a GET gets an unrelated page"""
+    def __init__(self):
+        self.sent = []
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def request(self, method, url, data=None, headers=None, **kwargs):
+        self.sent.append((method, data, headers))
+        if method != 'POST':
+            return Response("<html><h1>405 Method Not Allowed</h1></html>")
+        return Response(page(extra=f"<p>You searched for {unquote(data or '')}</p>"))
+
+class TestResponseDiff(unittest.TestCase):
+    def test_dynamic_tokens_and_reflections_are_ignored(self):
+        base = fingerprint(page())
+        other = fingerprint(page(token="ffee00112233445566778899aabbccdd", time="2024-05-02T11:30:12Z",
+                                 request="1714649412", extra="<p>' OR '1'='1</p>"), "' OR '1'='1")
+        self.assertGreater(similarity(base, other), SQLiSimulator.SIMILARITY_THRESHOLD)
+        self.assertLess(similarity(base, fingerprint(page(items=1))), SQLiSimulator.SIMILARITY_THRESHOLD)
+
+    def test_error_signatures_found_in_one_pass(self):
+        text = "ok " * 1000 + "You have an error in your SQL syntax near ''' ... ORA-01756: quoted string"
+        self.assertEqual([(m.label, m.offset >= 3000) for m in find_errors(text)],
+                         [('MySQL', True), ('Oracle', True)])
+
+    def test_errors_already_on_the_baseline_are_ignored(self):
+        comparer = ResponseComparer(page(extra="Warning: mysql_connect() deprecated"))
+        comparison = comparer.compare(page(extra="Warning: mysql_connect() deprecated"))
+        self.assertEqual(comparison.errors, [])
+        self.assertEqual(comparison.similarity, 1.0)
+
+class TestBooleanSQLi(unittest.TestCase):
+    def test_boolean_pair_is_reported(self):
+        simulator = SQLiSimulator(http_client=BooleanTarget())
+        simulator.time_payloads = []
+        report = simulator.test_endpoint("http://boolean.lab/")
+
+        titles = {f.payload: f.title for f in report.findings}
+        self.assertIn("Potential boolean-based SQLi", titles["' AND '1'='2"])
+        self.assertIn("Potential boolean-based SQLi", titles["1 AND 1=2"])
+        # Payloads that only get reflected do not count as a change
+        self.assertNotIn("' OR '1'='1", titles)
+
+    def test_form_baseline_uses_the_payload_request(self):
+        target = FormTarget()
+        simulator = SQLiSimulator(http_client=target)
+        simulator.time_payloads = []
+        report = simulator.test_endpoint("http://form.lab/search", "id", location="form")
+
+        self.assertIsNone(report.error)
+        self.assertEqual(report.findings, [])
+        # The baseline was POSTed like every payload, with a harmless value
+        method, data, headers = target.sent[0]
+        self.assertEqual((method, data), ('POST', 'id=1'))
+        self.assertEqual(headers['Content-Type'], 'application/x-www-form-urlencoded')
+        self.assertTrue(all(method == 'POST' for method, _, _ in target.sent))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+import app.modules.attack_chain as attack_chain
+from app.modules.report_text import render_text
+from app.modules.results import ScanReport, HostResult, PortResult, Finding, AuthAttempt, HIGH
+
+def discovery_report(target):
+    report = ScanReport('vuln_scan', target)
+    host = report.add(HostResult(target, '10.0.0.5'))
+    host.ports.extend([
+        PortResult(21, 'open', 'ftp', 'vsftpd', '3.0.3'),
+        PortResult(22, 'open', 'ssh', 'OpenSSH', '8.9'),
+        PortResult(80, 'open', 'http', 'nginx'),
+        PortResult(3306, 'open', 'mysql'),
+        PortResult(8080, 'filtered', 'http-proxy')
+    ])
+    report.add(Finding("Check for anonymous FTP access", port=21))
+    return report
+
+class TestScanReport(unittest.TestCase):
+    def test_records_are_slotted(self):
+        port = PortResult(80, 'open', 'http')
+        with self.assertRaises(AttributeError):
+            port.banner = 'nginx'
+
+    def test_add_files_records_by_type(self):
+        report = ScanReport('sqli', 'http://target')
+        report.add(Finding("SQL Error detected", HIGH, payload="'"))
+        report.add(AuthAttempt('ftp', 'admin', 'admin', False, "Failed"))
+        report.add("Resolved target")
+        self.assertEqual(len(report.findings), 1)
+        self.assertEqual(len(report.attempts), 1)
+        self.assertEqual(report.notes, ["Resolved target"])
+        self.assertEqual(report.to_dict()['findings'][0]['payload'], "'")
+        with self.assertRaises(TypeError):
+            report.add(42)
+
+    def test_render_vuln_scan(self):
+        text = render_text(discovery_report('example.com'))
+        self.assertIn("Scan report for example.com (10.0.0.5)", text)
+        self.assertIn("21       open   ftp        vsftpd 3.0.3\n    ! Check for anonymous FTP access", text)
+
+    def test_render_error(self):
+        report = ScanReport('xss', 'target').fail("Error during XSS testing: boom")
+        self.assertEqual(render_text(report), "Error during XSS testing: boom")
+
+class TestChainServiceParsing(unittest.TestCase):
+    def test_chain_classifies_open_ports_from_records(self):
+        with mock.patch.object(attack_chain, 'VulnerabilityScanner'):
+            chain = attack_chain.ChainedAttackSimulator()
+        chain._parse_services(discovery_report('example.com'))
+        self.assertEqual(chain.services, {'web': [80], 'ssh': [22], 'db': [3306], 'ftp': [21], 'other': []})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from app import create_app, job_queue, socketio
+from app.modules.events import emit_event, log_bus
+from app.modules.job_queue import Job
+from app.modules.results import Finding
+from app.modules.xss_simulator import XSSSimulator
+
+def isolated_app(case):
+    """App whose scan history goes to a temporary database, never the instance folder"""
+    tmp = tempfile.TemporaryDirectory()
+    case.addCleanup(tmp.cleanup)
+    return create_app({'TESTING': True, 'SCAN_DB_PATH': os.path.join(tmp.name, 'scans.db')})
+
+class TestScanRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app = isolated_app(self)
+        self.client = self.app.test_client()
+
+    def wait_for(self, job_id, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.client.get(f"/jobs/{job_id}").get_json()
+            if job['status'] in (Job.FINISHED, Job.FAILED):
+                return job
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_scan_returns_job_immediately(self):
+        response = self.client.post(
+            "/scan",
+            data={'scan_type': 'community', 'target': 'example.com'},
+            headers={'Accept': 'application/json'}
+        )
+        self.assertEqual(response.status_code, 202)
+        data = response.get_json()
+        self.assertIn('job_id', data)
+        self.assertEqual(data['status_url'], f"/jobs/{data['job_id']}")
+
+        job = self.wait_for(data['job_id'])
+        self.assertEqual(job['status'], Job.FINISHED)
+        self.assertIn("Custom payload required", job['result'])
+
+    def test_scan_renders_results_page(self):
+        response = self.client.post("/scan", data={'scan_type': 'community', 'target': 'example.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"/jobs/", response.data)
+
+    def test_stream_emits_ndjson_lines(self):
+        def fake_scan(simulator, report, target):
+            report.meta['inputs'] = 1
+            yield Finding("Potential XSS", location='q')
+
+        with patch.object(XSSSimulator, 'iter_xss', fake_scan):
+            response = self.client.post("/scan/stream", data={'scan_type': 'xss', 'target': 'example.com'})
+            lines = [json.loads(line) for line in response.data.decode().splitlines()]
+
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual([line['type'] for line in lines], ['start', 'finding', 'summary'])
+        self.assertEqual(lines[1]['data']['location'], 'q')
+        self.assertEqual(lines[2]['meta'], {'inputs': 1})
+        self.assertEqual(job_queue.get(lines[0]['job_id']).status, Job.FINISHED)
+
+    def test_unknown_job(self):
+        response = self.client.get("/jobs/does-not-exist")
+        self.assertEqual(response.status_code, 404)
+
+    def test_failed_job_reports_error(self):
+        def boom():
+            raise RuntimeError("worker crashed")
+        job = job_queue.submit('test', 'localhost', boom)
+        data = self.wait_for(job.id)
+        self.assertEqual(data['status'], Job.FAILED)
+        self.assertEqual(data['error'], "worker crashed")
+
+class TestJobRooms(unittest.TestCase):
+    def setUp(self):
+        self.app = isolated_app(self)
+
+    def test_events_only_reach_the_jobs_room(self):
+        release = threading.Event()
+        def scan():
+            release.wait(5)
+            emit_event('log_message', {'message': 'job log'})
+        job = job_queue.submit('test', 'localhost', scan)
+
+        watcher = socketio.test_client(self.app)
+        bystander = socketio.test_client(self.app)
+        self.assertTrue(watcher.emit('join_job', {'job_id': job.id}, callback=True))
+        self.assertFalse(bystander.emit('join_job', {'job_id': 'unknown'}, callback=True))
+
+        release.set()
+        deadline = time.time() + 5
+        while not job.done and time.time() < deadline:
+            time.sleep(0.05)
+
+        log_bus.flush()
+
+        received = [e['args'][0]['messages'] for e in watcher.get_received() if e['name'] == 'log_batch']
+        self.assertEqual(received, [['job log']])
+        self.assertEqual(bystander.get_received(), [])
+
+if __name__ == '__main__':
+    unittest.main()
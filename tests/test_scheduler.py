@@ -0,0 +1,67 @@
+import threading
+import time
+import unittest
+from app.modules.scheduler import PhaseScheduler
+
+class TestPhaseScheduler(unittest.TestCase):
+    def test_dependent_phases_run_concurrently_after_discovery(self):
+        found = []
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def work(label):
+            with lock:
+                running.append(label)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(label)
+            return label
+
+        scheduler = PhaseScheduler(max_workers=4)
+        scheduler.add_phase('discovery', lambda: [lambda: found.extend([80, 8080]) or 'scan'])
+        scheduler.add_phase('web', lambda: [lambda p=p: work(f"web:{p}") for p in found], depends_on=['discovery'])
+        scheduler.add_phase('ssh', lambda: [lambda: work('ssh:22')], depends_on=['discovery'])
+        results = scheduler.run()
+
+        self.assertEqual(results['discovery'], ['scan'])
+        self.assertEqual(results['web'], ['web:80', 'web:8080'])
+        self.assertEqual(results['ssh'], ['ssh:22'])
+        self.assertEqual(max(peak), 3)
+
+    def test_progress_and_failures(self):
+        progress = []
+        def boom():
+            raise RuntimeError("unreachable")
+        scheduler = PhaseScheduler(max_workers=2, on_progress=lambda done, total: progress.append((done, total)))
+        scheduler.add_phase('discovery', lambda: [lambda: 'scan'])
+        scheduler.add_phase('ftp', lambda: [boom, lambda: 'ok'], depends_on=['discovery'])
+        results = scheduler.run()
+
+        self.assertIsInstance(results['ftp'][0], RuntimeError)
+        self.assertEqual(results['ftp'][1], 'ok')
+        self.assertEqual(progress[-1], (3, 3))
+        self.assertEqual([done for done, _ in progress], sorted(done for done, _ in progress))
+
+    def test_stop_cancels_queued_tasks_and_later_phases(self):
+        stop = threading.Event()
+        ran = []
+        def work(label):
+            ran.append(label)
+            stop.set()
+            return label
+        scheduler = PhaseScheduler(max_workers=1)
+        scheduler.add_phase('discovery', lambda: [lambda: 'scan'])
+        scheduler.add_phase('web', lambda: [lambda i=i: work(i) for i in range(5)], depends_on=['discovery'])
+        scheduler.add_phase('report', lambda: [lambda: ran.append('report')], depends_on=['web'])
+        scheduler.run(stop)
+
+        self.assertEqual(ran, [0])
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ValueError):
+            PhaseScheduler().add_phase('web', list, depends_on=['discovery'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from app.modules.signatures import SignatureMatcher
+
+PAYLOADS = [
+    "<script>alert('XSS')</script>",
+    "'\"><script>alert('XSS')</script>",
+    "javascript:alert('XSS')",
+]
+
+class TestSignatureMatcher(unittest.TestCase):
+    def test_matches_are_case_insensitive_with_offsets(self):
+        matcher = SignatureMatcher.from_strings(PAYLOADS)
+        text = "<p>x</p><SCRIPT>alert('XSS')</SCRIPT>"
+        [match] = matcher.find_all(text)
+        self.assertEqual((match.label, match.offset), (PAYLOADS[0], 8))
+        self.assertEqual(match.text, "<SCRIPT>alert('XSS')</SCRIPT>")
+
+    def test_overlapping_payloads_are_all_reported(self):
+        matcher = SignatureMatcher.from_strings(PAYLOADS)
+        text = "<input value=\"'\"><script>alert('XSS')</script>\">"
+        labels = [(m.label, m.offset) for m in matcher.find_all(text)]
+        self.assertEqual(labels, [(PAYLOADS[1], 14), (PAYLOADS[0], 17)])
+
+    def test_html_context(self):
+        matcher = SignatureMatcher.from_strings(PAYLOADS)
+        text = ("<a href=\"javascript:alert('XSS')\">x</a>"
+                "<script>var q = \"<script>alert('XSS')</script>\";</script>"
+                "<!-- javascript:alert('XSS') --><p>javascript:alert('XSS')</p>")
+        contexts = [(m.label, m.context) for m in matcher.find_all(text, html_context=True)]
+        self.assertEqual(contexts, [
+            (PAYLOADS[2], 'attribute'),
+            (PAYLOADS[0], 'script'),
+            (PAYLOADS[2], 'comment'),
+            (PAYLOADS[2], 'text'),
+        ])
+
+    def test_search_returns_the_first_match_with_its_context(self):
+        matcher = SignatureMatcher.from_strings([PAYLOADS[2]])
+        text = "<!-- javascript:alert('XSS') --><A HREF=\"JavaScript:alert('XSS')\">x</A>"
+        match = matcher.search(text, html_context=True)
+        self.assertEqual((match.offset, match.context), (5, 'comment'))
+        self.assertIsNone(matcher.search("<p>safe</p>", html_context=True))
+
+    def test_regex_signatures(self):
+        matcher = SignatureMatcher([('MySQL', r"mysql_fetch|sql syntax"), ('Oracle', r"ora-\d{5}")], regex=True)
+        match = matcher.search("Warning: ORA-00933 and SQL syntax")
+        self.assertEqual((match.label, match.text), ('Oracle', "ORA-00933"))
+        self.assertEqual(len(matcher.find_all("Warning: ORA-00933 and SQL syntax")), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest import mock
+import paramiko
+import app.modules.ssh_bruteforce as ssh_bruteforce
+from app.modules.credential_audit import credential_auditor
+from app.modules.report_text import render_text
+from app.modules.ssh_bruteforce import SSHAuthSession, SSHBruteForceSimulator, split_target
+
+class FakeTransport:
+    """A session that drops after max_tries failures, like sshd's MaxAuthTries"""
+    max_tries = 3
+    password = 'letmein'
+    instances = []
+
+    def __init__(self, sock):
+        self.active = True
+        self.failures = 0
+        self.instances.append(self)
+
+    def start_client(self, timeout=None):
+        pass
+
+    def is_active(self):
+        return self.active
+
+    def auth_password(self, username, password):
+        if password == self.password:
+            return []
+        self.failures += 1
+        if self.failures >= self.max_tries:
+            self.active = False
+        raise paramiko.AuthenticationException("Authentication failed.")
+
+    def close(self):
+        self.active = False
+
+class TestSSHBruteForce(unittest.TestCase):
+    def setUp(self):
+        FakeTransport.instances = []
+        credential_auditor.reset()
+        for patcher in (mock.patch.object(ssh_bruteforce.paramiko, 'Transport', FakeTransport),
+                        mock.patch.object(ssh_bruteforce.socket, 'create_connection')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_split_target(self):
+        self.assertEqual(split_target("lab.example:2222"), ("lab.example", 2222))
+        self.assertEqual(split_target("lab.example"), ("lab.example", 22))
+        self.assertEqual(split_target("::1"), ("::1", 22))
+
+    def test_attempts_share_a_transport_until_the_server_drops_it(self):
+        passwords = ['a', 'b', 'c', 'd', 'letmein']
+        report = SSHBruteForceSimulator().simulate_bruteforce("lab.example:2222", "root", passwords, delay=0)
+
+        self.assertEqual([a.success for a in report.attempts], [False] * 4 + [True])
+        self.assertEqual(len(FakeTransport.instances), 2)
+        # 'c' closed the first session, so it is tried again on the second
+        self.assertEqual(report.meta['connections'], {
+            'attempts': 5, 'handshakes': 2, 'attempts_per_connection': 3.0, 'handshakes_saved': 3})
+        ssh_bruteforce.socket.create_connection.assert_called_with(("lab.example", 2222), timeout=3)
+        self.assertIn("5 attempts over 2 connections", render_text(report))
+
+    def test_dropped_session_is_retried_on_a_new_connection(self):
+        session = SSHAuthSession("lab.example")
+        self.assertFalse(session.try_password("root", "a")[0])
+        # The server went away between attempts without telling the transport
+        FakeTransport.instances[0].auth_password = mock.Mock(side_effect=EOFError())
+        self.assertEqual(session.try_password("root", "letmein"), (True, "Authentication successful"))
+        self.assertEqual(session.stats()['handshakes'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import time
+import unittest
+from app import create_app, job_queue
+from app.modules.results import ScanReport, HostResult, PortResult, Finding, HIGH
+from app.modules.store import ScanStore
+
+def chain_report(target, product='OpenSSH', version='8.9'):
+    report = ScanReport('attack_chain', target)
+    discovery = report.add(ScanReport('vuln_scan', target, phase='discovery'))
+    host = discovery.add(HostResult(target, '10.0.0.5'))
+    host.ports.extend([PortResult(22, 'open', 'ssh', product, version), PortResult(80, 'closed', 'http')])
+    web = report.add(ScanReport('sqli', f"http://{target}", phase='web'))
+    web.add(Finding("SQL Error detected", HIGH, payload="'", location='id'))
+    return report
+
+class TestScanStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = ScanStore(os.path.join(self.tmp.name, 'scans.db'))
+        self.addCleanup(self.store.close)
+
+    def test_report_round_trips(self):
+        report = chain_report('example.com')
+        scan_id = self.store.save(report, job_id='abc')
+        self.assertEqual(self.store.get(scan_id), report)
+        self.assertIsNone(self.store.get(scan_id + 1))
+
+    def test_history_and_indexed_queries(self):
+        self.store.save(chain_report('a.example'), finished_at=100)
+        self.store.save(chain_report('b.example', version='9.6'), finished_at=200)
+        self.store.save(ScanReport('xss', 'a.example'), finished_at=300)
+
+        self.assertEqual([scan['target'] for scan in self.store.history()], ['a.example', 'b.example', 'a.example'])
+        self.assertEqual(len(self.store.history(target='a.example', scan_type='attack_chain')), 1)
+        self.assertEqual(len(self.store.history(since=150)), 2)
+
+        ssh = self.store.ports(service='ssh')
+        self.assertEqual([row['version'] for row in ssh], ['9.6', '8.9'])
+        self.assertEqual(self.store.ports(port=80), [])
+        self.assertEqual(len(self.store.findings(severity=HIGH)), 2)
+
+        scan, report = self.store.latest('a.example', 'attack_chain')
+        self.assertEqual(scan['finished_at'], 100)
+        self.assertEqual(report.children[0].hosts[0].ports[0].version, '8.9')
+
+    def test_database_uses_wal(self):
+        self.store.history()
+        mode = self.store._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+class TestHistoryRoutes(unittest.TestCase):
+    def test_finished_jobs_are_listed(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        app = create_app({'TESTING': True, 'SCAN_DB_PATH': os.path.join(tmp.name, 'scans.db')})
+        client = app.test_client()
+
+        job = job_queue.submit('xss', 'history.example', lambda: ScanReport('xss', 'history.example'))
+        deadline = time.time() + 5
+        scans = []
+        while not scans and time.time() < deadline:
+            time.sleep(0.05)
+            scans = client.get("/history?target=history.example").get_json()
+
+        self.assertEqual(len(scans), 1)
+        self.assertEqual(scans[0]['job_id'], job.id)
+        detail = client.get(scans[0]['url']).get_json()
+        self.assertEqual(detail['report']['target'], 'history.example')
+        self.assertEqual(client.get("/history/999999").status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
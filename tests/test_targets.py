@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+import app.modules.vulnerability_scanner as vulnerability_scanner
+from app.modules.registry import scanner_registry
+from app.modules.targets import is_batch, parse_targets, shard
+
+class FakePortScanner:
+    """Reports port 22 open on every host except those ending in .9"""
+    def scan(self, hosts, ports, arguments):
+        return {'scan': {
+            host: {'tcp': {22: {'state': 'open', 'name': 'ssh', 'product': 'OpenSSH', 'version': '9.6'}}}
+            for host in hosts.split() if not host.endswith('.9')
+        }}
+
+class TestTargetParsing(unittest.TestCase):
+    def test_expands_cidr_ranges_and_lists(self):
+        spec = "10.0.0.0/30, 10.0.1.5-7\n# lab hosts\nhttp://Example.com/login 10.0.0.1"
+        self.assertEqual(parse_targets(spec), [
+            '10.0.0.1', '10.0.0.2', '10.0.1.5', '10.0.1.6', '10.0.1.7', 'example.com'
+        ])
+
+    def test_single_host_is_not_a_batch(self):
+        self.assertFalse(is_batch("http://my-host.example.com/path"))
+        self.assertTrue(is_batch("192.168.1.0/24"))
+        self.assertTrue(is_batch("10.0.0.1-10.0.0.3"))
+
+    def test_rejects_oversized_specs(self):
+        with self.assertRaises(ValueError):
+            parse_targets("10.0.0.0/8")
+        with self.assertRaises(ValueError):
+            parse_targets("10.0.0.9-10.0.0.1")
+
+    def test_shard(self):
+        self.assertEqual(shard(['a', 'b', 'c'], 2), [['a', 'b'], ['c']])
+
+class TestBatchScan(unittest.TestCase):
+    def setUp(self):
+        scanner_registry.reset()
+        self.addCleanup(scanner_registry.reset)
+
+    def test_batch_merges_shards_into_one_report(self):
+        with mock.patch.object(vulnerability_scanner.nmap, 'PortScanner', FakePortScanner):
+            scanner = vulnerability_scanner.VulnerabilityScanner(shard_size=3, parallel_shards=2)
+            report = scanner.scan_batch(parse_targets("10.0.0.1-10.0.0.9"))
+
+        self.assertEqual(report.meta, {'targets': 9, 'shards': 3})
+        self.assertEqual(sorted(host.ip for host in report.hosts), [f"10.0.0.{i}" for i in range(1, 9)])
+        self.assertEqual(len(report.findings), 8)
+        self.assertEqual(report.notes, ["No results: Host 10.0.0.9 appears to be down or blocking our scans"])
+
+if __name__ == '__main__':
+    unittest.main()
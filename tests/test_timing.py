@@ -0,0 +1,116 @@
+import re
+import unittest
+from urllib.parse import unquote
+import requests
+from app.modules.results import ERROR
+from app.modules.sqli_simulator import SQLiSimulator
+from app.modules.timing import TimingEngine
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class Response:
+    status_code = 200
+    text = "<html>ok</html>"
+    content = b"<html>ok</html>"
+
+class SlowTarget:
+    """Answers in ~100 ms, sleeping for real when a MySQL SLEEP() is injected"""
+    def __init__(self, clock, vulnerable=True):
+        self.clock = clock
+        self.vulnerable = vulnerable
+        self.jitter = iter([0.0, 0.02, -0.01, 0.01, -0.02] * 20)
+
+    def get(self, url, timeout=None, **kwargs):
+        latency = 0.1 + next(self.jitter)
+        url = unquote(url)
+        sleep = re.search(r"SLEEP\((\d+)\)", url)
+        if self.vulnerable and sleep and 'PG_SLEEP' not in url:
+            latency += int(sleep.group(1))
+        self.clock.now += min(latency, timeout or latency)
+        return Response()
+
+    def request(self, method, url, **kwargs):
+        return self.get(url, **kwargs)
+
+class DroppingTarget(SlowTarget):
+    """Resets the connection whenever a delay is injected"""
+    def get(self, url, timeout=None, **kwargs):
+        if 'SLEEP' in unquote(url):
+            raise requests.exceptions.ConnectionError("Connection reset by peer")
+        return super().get(url, timeout=timeout, **kwargs)
+
+class TestTimingEngine(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def engine(self, vulnerable):
+        return TimingEngine(SlowTarget(self.clock, vulnerable), clock=self.clock)
+
+    def test_delay_is_confirmed_in_two_requests(self):
+        engine = self.engine(vulnerable=True)
+        baseline = engine.measure_baseline("http://lab/?id=1")
+        delay = engine.calibrate_delay(baseline)
+        verdict = engine.evaluate(lambda p: f"http://lab/?id={p}", "' AND SLEEP({delay}) --", baseline, delay)
+
+        self.assertEqual(delay, 1)
+        self.assertTrue(verdict.vulnerable)
+        self.assertEqual(verdict.requests, 2)
+        self.assertGreaterEqual(verdict.confidence, 0.99)
+
+    def test_prompt_responses_are_rejected_in_one_request(self):
+        engine = self.engine(vulnerable=False)
+        baseline = engine.measure_baseline("http://lab/?id=1")
+        verdict = engine.evaluate(lambda p: f"http://lab/?id={p}", "' AND SLEEP({delay}) --", baseline, 1)
+
+        self.assertFalse(verdict.vulnerable)
+        self.assertTrue(verdict.decided)
+        self.assertEqual(verdict.requests, 1)
+
+class TestSQLiTiming(unittest.TestCase):
+    def test_only_the_delaying_payload_is_reported(self):
+        clock = FakeClock()
+        target = SlowTarget(clock)
+        simulator = SQLiSimulator(http_client=target, timing=TimingEngine(target, clock=clock))
+        simulator.payloads = []
+
+        report = simulator.test_endpoint("http://lab/")
+
+        self.assertIsNone(report.error)
+        self.assertEqual([f.payload for f in report.findings], ["' AND SLEEP(1) --"])
+        timing = report.meta['timing']
+        self.assertEqual(timing['delay'], 1)
+        self.assertEqual([v['requests'] for v in timing['verdicts']], [2, 1, 1])
+        self.assertEqual(timing['requests'], 9)
+
+    def test_a_second_scan_reports_only_its_own_requests(self):
+        clock = FakeClock()
+        target = SlowTarget(clock)
+        simulator = SQLiSimulator(http_client=target, timing=TimingEngine(target, clock=clock))
+        simulator.payloads = []
+
+        simulator.test_endpoint("http://lab/")
+        report = simulator.test_endpoint("http://lab/")
+
+        self.assertEqual(report.meta['timing']['requests'], 9)
+        self.assertLess(report.meta['timing']['total_time'], 5)
+
+    def test_connection_errors_are_recorded_without_failing_the_scan(self):
+        clock = FakeClock()
+        target = DroppingTarget(clock)
+        simulator = SQLiSimulator(http_client=target, timing=TimingEngine(target, clock=clock))
+        simulator.payloads = []
+
+        report = simulator.test_endpoint("http://lab/")
+
+        self.assertIsNone(report.error)
+        self.assertEqual([f.severity for f in report.findings], [ERROR, ERROR])
+        self.assertEqual(len(report.meta['timing']['verdicts']), 1)
+        self.assertEqual(report.meta['timing']['requests'], 6)
+
+if __name__ == '__main__':
+    unittest.main()